@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description: compare the memory and latency of the GraphData backends.
+
+    python benchmarks/graph_storage.py --nodes 100000 --relations 1000000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from kgdt.models.graph import GraphData
+
+RELATION_TYPES = ["belong to", "has method", "call", "extend", "implement", "depend on"]
+
+
+def build_graph(backend, node_num, relation_triples):
+    graph_data = GraphData(backend=backend)
+    for index in range(node_num):
+        graph_data.add_node({"entity"}, {"name": "node %d" % index})
+    for start_id, relation_type, end_id in relation_triples:
+        graph_data.add_relation(start_id, relation_type, end_id)
+    return graph_data
+
+
+def measure_memory(backend, node_num, relation_triples):
+    gc.collect()
+    tracemalloc.start()
+    graph_data = build_graph(backend, node_num, relation_triples)
+    if backend == GraphData.BACKEND_COMPACT:
+        graph_data.storage.flush()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+def measure_latency(graph_data, relation_triples, query_num):
+    result = {}
+    samples = random.sample(relation_triples, min(query_num, len(relation_triples)))
+    node_ids = [r[0] for r in samples]
+
+    start = time.perf_counter()
+    for start_id, relation_type, end_id in samples:
+        graph_data.exist_relation(start_id, relation_type, end_id)
+    result["exist_relation"] = (time.perf_counter() - start) / len(samples)
+
+    start = time.perf_counter()
+    for node_id in node_ids:
+        graph_data.get_all_out_relations(node_id)
+    result["get_all_out_relations"] = (time.perf_counter() - start) / len(node_ids)
+
+    start = time.perf_counter()
+    for node_id in node_ids:
+        graph_data.get_all_in_relations(node_id)
+    result["get_all_in_relations"] = (time.perf_counter() - start) / len(node_ids)
+
+    start = time.perf_counter()
+    for node_id in node_ids:
+        graph_data.get_relations(start_id=node_id, relation_type=RELATION_TYPES[0])
+    result["get_relations(start,type)"] = (time.perf_counter() - start) / len(node_ids)
+
+    start = time.perf_counter()
+    graph_data.get_relations(relation_type=RELATION_TYPES[0])
+    result["get_relations(type) whole graph"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--relations", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    relation_triples = list({(random.randint(1, args.nodes), random.choice(RELATION_TYPES),
+                              random.randint(1, args.nodes)) for _ in range(args.relations)})
+    print("nodes=%d relations=%d" % (args.nodes, len(relation_triples)))
+
+    for backend in (GraphData.BACKEND_MULTI_DI_GRAPH, GraphData.BACKEND_COMPACT):
+        current, peak = measure_memory(backend, args.nodes, relation_triples)
+        print("[%s] memory: resident %.1f MB, peak while building %.1f MB"
+              % (backend, current / 2 ** 20, peak / 2 ** 20))
+        start = time.perf_counter()
+        graph_data = build_graph(backend, args.nodes, relation_triples)
+        print("[%s] build: %.2f s" % (backend, time.perf_counter() - start))
+        for name, seconds in measure_latency(graph_data, relation_triples, args.queries).items():
+            print("[%s] %s: %.2f us" % (backend, name, seconds * 1e6))
+        del graph_data
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the analytics on the whole graph data, computed by the sparse matrix operations on GraphData.to_sparse_adjacency()
+instead of converting the graph data into networkx.
+"""
+import numpy as np
+import scipy.sparse
+from networkx import PowerIterationFailedConvergence
+from scipy.sparse.csgraph import connected_components
+
+from kgdt.models.adjacency import GraphAdjacency
+
+
+class GraphAnalytics:
+    """
+    the PageRank, the degree centrality, the connected components and the degree histograms of a graph data,
+    on the relations of the given types. The results are given as numpy arrays aligned with node_ids, the sorted
+    ids of all nodes.
+
+    The matrices are taken from the graph data on every call, so the results are always on the current graph data,
+    and the matrices are built again only after some nodes or relations are added or removed.
+    >>>
+        analytics = GraphAnalytics(graph_data, relation_types=["call", "extends"])
+        node_ids, scores = analytics.personalized_pagerank([1, 2])
+        top_node_ids = node_ids[np.argsort(-scores)[:10]]
+        node_ids, component_ids = analytics.connected_components(strong=True)
+    >>>
+    """
+
+    def __init__(self, graph_data, relation_types=None, weight=None):
+        """
+        :param graph_data: a GraphData
+        :param relation_types: None for all relations, or a relation type or a list of relation types
+        :param weight: None to count each relation as 1, or the name of a relation property as the weight of each
+        relation in PageRank, the relation without the property counts as 1
+        """
+        self.graph_data = graph_data
+        self.relation_types = relation_types
+        self.weight = weight
+        # the transposed transition matrix of PageRank and the adjacency matrix it is built from
+        self.__transition_source = None
+        self.__transition = None
+        self.__dangling_indexes = None
+
+    @property
+    def node_ids(self):
+        """
+        the sorted int64 numpy array of all node ids, the results of the analytics are aligned with it.
+        """
+        return self.graph_data.get_adjacency().node_ids
+
+    def __adjacency_matrix(self):
+        return self.graph_data.to_sparse_adjacency(self.relation_types, directed=True, weight=self.weight)
+
+    def __prepare_transition(self):
+        """
+        the transition matrix of the random walk is the adjacency matrix with each row divided by its sum, it is kept
+        transposed in CSR, so a step of the walk is a sparse matrix-vector product.
+        """
+        matrix, node_ids = self.__adjacency_matrix()
+        if self.__transition_source is not matrix:
+            out_weights = np.asarray(matrix.sum(axis=1)).ravel()
+            is_dangling = out_weights == 0
+            scales = np.divide(1.0, out_weights, out=np.zeros_like(out_weights), where=~is_dangling)
+            self.__transition = scipy.sparse.csr_matrix(matrix.T.multiply(scales[np.newaxis, :]))
+            self.__dangling_indexes = np.flatnonzero(is_dangling)
+            self.__transition_source = matrix
+        return self.__transition, self.__dangling_indexes, node_ids
+
+    def pagerank(self, alpha=0.85, max_iter=100, tol=1.0e-6):
+        """
+        the PageRank of all nodes, the same as networkx.pagerank() on the relations.
+        :param alpha: the damping factor
+        :param max_iter: the max number of the power iterations
+        :param tol: the error tolerance to check the convergence, the iteration stops when the l1 norm of the change
+        of the scores is less than the number of nodes * tol.
+        :return: (node_ids, scores), two aligned numpy arrays, the scores sum to 1
+        :raise PowerIterationFailedConvergence: the scores don't converge in max_iter iterations
+        """
+        return self.__pagerank(None, alpha, max_iter, tol)
+
+    def personalized_pagerank(self, personalization, alpha=0.85, max_iter=100, tol=1.0e-6):
+        """
+        the PageRank of all nodes with the random walk restarting from the given nodes, it ranks the nodes by the
+        relevance to them.
+        :param personalization: a iterable of node ids to restart from evenly, or a dict from node id to a
+        non-negative restart weight. The ids not in the graph are ignored.
+        :param alpha: the damping factor
+        :param max_iter: the max number of the power iterations
+        :param tol: the error tolerance to check the convergence, see pagerank()
+        :return: (node_ids, scores), two aligned numpy arrays, the scores sum to 1
+        :raise ValueError: no restart weight is on a node in the graph
+        :raise PowerIterationFailedConvergence: the scores don't converge in max_iter iterations
+        """
+        if isinstance(personalization, dict):
+            restart_ids, restart_weights = list(personalization.keys()), list(personalization.values())
+        else:
+            restart_ids = list(personalization)
+            restart_weights = np.ones(len(restart_ids))
+        adjacency = self.graph_data.get_adjacency()
+        indexes = adjacency.indexes_of(restart_ids)
+        restart_weights = np.asarray(restart_weights, dtype=np.float64)
+        if (restart_weights < 0).any():
+            raise ValueError("the restart weight must be non-negative")
+        is_found = indexes >= 0
+        restart = np.bincount(indexes[is_found], weights=restart_weights[is_found], minlength=adjacency.node_num())
+        if restart.sum() <= 0:
+            raise ValueError("no restart weight is on a node in the graph")
+        return self.__pagerank(restart / restart.sum(), alpha, max_iter, tol)
+
+    def __pagerank(self, restart, alpha, max_iter, tol):
+        transition, dangling_indexes, node_ids = self.__prepare_transition()
+        node_num = len(node_ids)
+        if not node_num:
+            return node_ids, np.empty(0)
+        if restart is None:
+            restart = np.full(node_num, 1.0 / node_num)
+        # the walk leaving a node without out relations restarts, as in networkx
+        scores = restart
+        for _ in range(max_iter):
+            last_scores = scores
+            scores = alpha * (transition @ last_scores + last_scores[dangling_indexes].sum() * restart) + \
+                (1 - alpha) * restart
+            if np.abs(scores - last_scores).sum() < node_num * tol:
+                return node_ids, scores
+        raise PowerIterationFailedConvergence(max_iter)
+
+    def degree_centrality(self, direction=GraphAdjacency.DIRECTION_BOTH):
+        """
+        the degree of each node divided by the number of other nodes, the same as networkx.degree_centrality(),
+        in_degree_centrality() and out_degree_centrality() on the relations. As networkx, the only node of a graph
+        with one node has the centrality 1.
+        :param direction: "out" for the out degree, "in" for the in degree, "both" for the sum of them
+        :return: (node_ids, centralities), two aligned numpy arrays
+        """
+        adjacency = self.graph_data.get_adjacency()
+        degrees = adjacency.degrees(direction, self.graph_data.relation_type_table.get_codes(self.relation_types))
+        if adjacency.node_num() <= 1:
+            return adjacency.node_ids, np.ones(adjacency.node_num())
+        return adjacency.node_ids, degrees * (1.0 / (adjacency.node_num() - 1))
+
+    def connected_components(self, strong=False):
+        """
+        :param strong: False for the weakly connected components, the relations are followed in both directions.
+        True for the strongly connected components, the nodes reaching each other by the relations.
+        :return: (node_ids, component_ids), two aligned int64 numpy arrays. The component ids are numbered from 0,
+        in the descending order of the size of the component, the tie is broken by the smallest node id in it.
+        """
+        matrix, node_ids = self.__adjacency_matrix()
+        if not len(node_ids):
+            return node_ids, np.empty(0, dtype=np.int64)
+        component_num, labels = connected_components(matrix, directed=True,
+                                                     connection="strong" if strong else "weak")
+        sizes = np.bincount(labels, minlength=component_num)
+        first_indexes = np.full(component_num, len(node_ids), dtype=np.int64)
+        np.minimum.at(first_indexes, labels, np.arange(len(node_ids)))
+        component_ids = np.empty(component_num, dtype=np.int64)
+        component_ids[np.lexsort((first_indexes, -sizes))] = np.arange(component_num)
+        return node_ids, component_ids[labels]
+
+    def degree_histograms(self, direction=GraphAdjacency.DIRECTION_OUT):
+        """
+        the degree histogram of each relation type, the same as networkx.degree_histogram() on the relations of
+        one type, every node is counted, including the nodes without the relations of the type.
+        :param direction: "out" for the out degree, "in" for the in degree, "both" for the sum of them
+        :return: a dict from relation type to a int64 numpy array, the number of nodes with degree d is on index d.
+        Only the relation types with some relations are in the dict.
+        """
+        adjacency = self.graph_data.get_adjacency()
+        if direction not in GraphAdjacency.DIRECTIONS:
+            raise ValueError("unknown direction %r" % direction)
+        node_num = adjacency.node_num()
+        rows, codes = [], []
+        for csr_direction in (GraphAdjacency.DIRECTION_OUT, GraphAdjacency.DIRECTION_IN):
+            if direction in (csr_direction, GraphAdjacency.DIRECTION_BOTH):
+                indptr = adjacency.out_indptr if csr_direction == GraphAdjacency.DIRECTION_OUT else adjacency.in_indptr
+                rows.append(np.repeat(np.arange(node_num, dtype=np.int64), np.diff(indptr)))
+                types = adjacency.out_types if csr_direction == GraphAdjacency.DIRECTION_OUT else adjacency.in_types
+                codes.append(types.astype(np.int64))
+        rows, codes = np.concatenate(rows), np.concatenate(codes)
+        relation_type_codes = self.graph_data.relation_type_table.get_codes(self.relation_types)
+        if relation_type_codes is not None:
+            is_kept = np.isin(codes, relation_type_codes)
+            rows, codes = rows[is_kept], codes[is_kept]
+        # the degree of each (relation type, node) with any relation, then the number of nodes of each (type, degree)
+        node_keys, degrees = np.unique(codes * node_num + rows, return_counts=True)
+        degree_num = int(degrees.max()) + 1 if len(degrees) else 1
+        degree_keys, node_counts = np.unique(node_keys // node_num * degree_num + degrees, return_counts=True)
+        key_codes, key_degrees = np.divmod(degree_keys, degree_num)
+        histograms = {}
+        for code in np.unique(key_codes).tolist():
+            is_of_code = key_codes == code
+            histogram = np.zeros(int(key_degrees[is_of_code].max()) + 1, dtype=np.int64)
+            histogram[key_degrees[is_of_code]] = node_counts[is_of_code]
+            histogram[0] = node_num - histogram.sum()
+            histograms[self.graph_data.relation_type_table.get_type(code)] = histogram
+        return histograms
+
+    def __repr__(self):
+        return "<GraphAnalytics relationTypes=%r weight=%r>" % (self.relation_types, self.weight)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the read-only snapshot of the relations in CSR arrays, for the vectorized traversal and analytics.
+see GraphData.get_adjacency().
+"""
+import numpy as np
+import scipy.sparse
+
+from kgdt.utils import SaveLoad
+
+
+class GraphAdjacency(SaveLoad):
+    """
+    a read-only snapshot of all nodes and relations of a graph. Each node is given a dense index by the order of the
+    node ids, and the relations are kept in two CSR structures on the indexes, one grouped by the start node (out) and
+    one grouped by the end node (in), together with the relation type codes.
+
+    The node ids must be int. The snapshot doesn't change with the graph, GraphData.get_adjacency() gives a new one
+    after the nodes or the relations of the graph are changed.
+    >>>
+        adjacency = graph_data.get_adjacency()
+        indexes = adjacency.indexes_of([1, 2])
+        neighbor_indexes, source_positions = adjacency.gather(indexes, adjacency.DIRECTION_OUT)
+        adjacency.node_ids[neighbor_indexes]
+    >>>
+    """
+    DIRECTION_OUT = "out"
+    DIRECTION_IN = "in"
+    DIRECTION_BOTH = "both"
+    DIRECTIONS = (DIRECTION_OUT, DIRECTION_IN, DIRECTION_BOTH)
+
+    def __init__(self, node_ids, start_indexes, relation_type_codes, end_indexes):
+        """
+        :param node_ids: a sorted int64 numpy array of all node ids
+        :param start_indexes: a int64 numpy array of the index of the start node of each relation
+        :param relation_type_codes: a numpy array of the relation type code of each relation
+        :param end_indexes: a int64 numpy array of the index of the end node of each relation
+        """
+        self.node_ids = node_ids
+        self.out_indptr, self.out_neighbors, self.out_types = self.__build_csr(
+            start_indexes, relation_type_codes, end_indexes, len(node_ids))
+        self.in_indptr, self.in_neighbors, self.in_types = self.__build_csr(
+            end_indexes, relation_type_codes, start_indexes, len(node_ids))
+
+    @classmethod
+    def from_storage(cls, storage):
+        """
+        :param storage: a GraphStorage
+        :return: a GraphAdjacency of all nodes and relations in the storage
+        """
+        node_ids = np.sort(np.fromiter(storage.node_ids(), dtype=np.int64, count=storage.node_num()))
+        start_ids, codes, end_ids = storage.relation_arrays()
+        return cls(node_ids, node_ids.searchsorted(np.asarray(start_ids, dtype=np.int64)), np.asarray(codes),
+                   node_ids.searchsorted(np.asarray(end_ids, dtype=np.int64)))
+
+    @staticmethod
+    def __build_csr(first_indexes, codes, second_indexes, node_num):
+        order = np.lexsort((second_indexes, codes, first_indexes))
+        indptr = np.zeros(node_num + 1, dtype=np.int64)
+        np.cumsum(np.bincount(first_indexes, minlength=node_num), out=indptr[1:])
+        return indptr, second_indexes[order], codes[order]
+
+    def node_num(self):
+        return len(self.node_ids)
+
+    def relation_num(self):
+        return len(self.out_neighbors)
+
+    def indexes_of(self, node_ids):
+        """
+        :param node_ids: a iterable of node ids
+        :return: a int64 numpy array of the indexes of the nodes, -1 for the node not in the graph
+        """
+        node_ids = np.asarray(node_ids if isinstance(node_ids, np.ndarray) else list(node_ids))
+        if not len(node_ids) or not len(self.node_ids) or node_ids.dtype.kind not in "iu":
+            return np.array([self.index_of(node_id) for node_id in node_ids.tolist()], dtype=np.int64)
+        positions = np.minimum(self.node_ids.searchsorted(node_ids), len(self.node_ids) - 1)
+        return np.where(self.node_ids[positions] == node_ids, positions, -1)
+
+    def index_of(self, node_id):
+        """
+        :return: the index of the node, -1 for the node not in the graph
+        """
+        position = int(self.node_ids.searchsorted(node_id)) if len(self.node_ids) else 0
+        if position < len(self.node_ids) and self.node_ids[position] == node_id:
+            return position
+        return -1
+
+    def __csr_of(self, direction):
+        if direction == self.DIRECTION_OUT:
+            return self.out_indptr, self.out_neighbors, self.out_types
+        return self.in_indptr, self.in_neighbors, self.in_types
+
+    def gather(self, indexes, direction=DIRECTION_OUT, relation_type_codes=None):
+        """
+        get the neighbors of many nodes at once, without a python loop on the nodes.
+        :param indexes: a int64 numpy array of node indexes
+        :param direction: DIRECTION_OUT for the end nodes of the out relations, DIRECTION_IN for the start nodes of the
+        in relations, DIRECTION_BOTH for both.
+        :param relation_type_codes: None for all relations, or a list of relation type codes to follow
+        :return: (neighbor indexes, source positions), two aligned int64 numpy arrays, a neighbor is reached from
+        indexes[source position]. A neighbor appears once for each relation.
+        """
+        neighbors, sources, codes = self.gather_relations(indexes, direction, relation_type_codes)
+        return neighbors, sources
+
+    def gather_relations(self, indexes, direction=DIRECTION_OUT, relation_type_codes=None):
+        """
+        the same as gather(), together with the relation type code of each relation.
+        :return: (neighbor indexes, source positions, relation type codes), three aligned numpy arrays
+        """
+        if direction not in self.DIRECTIONS:
+            raise ValueError("unknown direction %r" % direction)
+        if direction == self.DIRECTION_BOTH:
+            out_relations = self.gather_relations(indexes, self.DIRECTION_OUT, relation_type_codes)
+            in_relations = self.gather_relations(indexes, self.DIRECTION_IN, relation_type_codes)
+            return tuple(np.concatenate([out_array, in_array])
+                         for out_array, in_array in zip(out_relations, in_relations))
+        indptr, neighbors, types = self.__csr_of(direction)
+        positions, sources = self.gather_positions(indptr, indexes)
+        codes = types[positions]
+        if relation_type_codes is not None:
+            is_followed = np.isin(codes, relation_type_codes)
+            positions = positions[is_followed]
+            sources = sources[is_followed]
+            codes = codes[is_followed]
+        return neighbors[positions].astype(np.int64, copy=False), sources, codes
+
+    @staticmethod
+    def gather_positions(indptr, indexes):
+        """
+        :return: (positions, source positions), the positions of the CSR rows of all indexes concatenated, and the
+        position in indexes of the row of each position.
+        """
+        starts = indptr[indexes]
+        counts = indptr[indexes + 1] - starts
+        total = int(counts.sum())
+        sources = np.repeat(np.arange(len(indexes)), counts)
+        if not total:
+            return np.empty(0, dtype=np.int64), sources
+        row_offsets = np.cumsum(counts) - counts
+        positions = np.arange(total, dtype=np.int64) + np.repeat(starts - row_offsets, counts)
+        return positions, sources
+
+    def degrees(self, direction=DIRECTION_OUT, relation_type_codes=None):
+        """
+        :return: a int64 numpy array of the degree of each node, counting the followed relations
+        """
+        if direction not in self.DIRECTIONS:
+            raise ValueError("unknown direction %r" % direction)
+        if direction == self.DIRECTION_BOTH:
+            return self.degrees(self.DIRECTION_OUT, relation_type_codes) + \
+                   self.degrees(self.DIRECTION_IN, relation_type_codes)
+        indptr, neighbors, types = self.__csr_of(direction)
+        if relation_type_codes is None:
+            return np.diff(indptr)
+        rows = np.repeat(np.arange(self.node_num()), np.diff(indptr))
+        return np.bincount(rows[np.isin(types, relation_type_codes)], minlength=self.node_num())
+
+    def to_csr_matrix(self, relation_type_codes=None, directed=True, weights=None):
+        """
+        :param relation_type_codes: None for all relations, or a list of relation type codes to keep
+        :param directed: True for the entry (i, j) of the relations from the index i to the index j, False for a
+        symmetric matrix of the relations in both directions, the relation from a node to itself is counted once
+        :param weights: None to count each relation as 1, or a float64 numpy array of the weight of each relation in
+        the order of out_neighbors
+        :return: a square scipy.sparse.csr_matrix of float64 on the node indexes, the relations of the same pair of
+        nodes are summed into one entry
+        """
+        node_num = self.node_num()
+        rows = np.repeat(np.arange(node_num, dtype=np.int64), np.diff(self.out_indptr))
+        columns = self.out_neighbors.astype(np.int64, copy=False)
+        data = np.ones(len(columns)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if relation_type_codes is not None:
+            is_kept = np.isin(self.out_types, relation_type_codes)
+            rows, columns, data = rows[is_kept], columns[is_kept], data[is_kept]
+        if not directed:
+            is_loop = rows == columns
+            rows, columns = np.concatenate([rows, columns[~is_loop]]), np.concatenate([columns, rows[~is_loop]])
+            data = np.concatenate([data, data[~is_loop]])
+        matrix = scipy.sparse.csr_matrix((data, (rows, columns)), shape=(node_num, node_num))
+        matrix.sum_duplicates()
+        return matrix
+
+    def __repr__(self):
+        return "<GraphAdjacency nodeNum=%d relNum=%d>" % (self.node_num(), self.relation_num())
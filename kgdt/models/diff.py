@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the difference between two versions of a graph data, see GraphData.diff().
+"""
+import json
+from operator import itemgetter
+
+import numpy as np
+
+from kgdt.utils import SaveLoad
+
+
+def _json_default(value):
+    # the order of a set depends on how it is built, so it is sorted to give the same json for the equal sets
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def node_content_hash(node_json):
+    """
+    the hash of the labels and the properties of a node json. The nodes equal (==) on the labels and the properties
+    have the same hash in a process. The properties with unhashable values, e.g., a list, are hashed by the json.
+    """
+    labels = node_json["labels"]
+    properties = node_json["properties"]
+    try:
+        property_hash = hash(frozenset(properties.items()))
+    except TypeError:
+        property_hash = hash(json.dumps(dict(properties), sort_keys=True, default=_json_default))
+    return hash((labels if type(labels) == frozenset else frozenset(labels), property_hash))
+
+
+class GraphDiff(SaveLoad):
+    """
+    the nodes and relations added, removed and changed from a old graph data to a new one. The node ids are sorted
+    int64 numpy arrays, the relations are given as (start_ids, relation_types, end_ids), three aligned numpy arrays
+    sorted by the start id.
+    >>>
+        graph_diff = old_graph_data.diff(new_graph_data)
+        graph_diff.changed_node_ids
+        start_ids, relation_types, end_ids = graph_diff.added_relations
+    >>>
+    """
+
+    def __init__(self, added_node_ids, removed_node_ids, changed_node_ids, added_relations, removed_relations):
+        self.added_node_ids = added_node_ids
+        self.removed_node_ids = removed_node_ids
+        self.changed_node_ids = changed_node_ids
+        self.added_relations = added_relations
+        self.removed_relations = removed_relations
+
+    @classmethod
+    def between(cls, old_graph_data, new_graph_data):
+        """
+        compare two graph datas by the node ids and the relations. The nodes are matched by the id, a node in both
+        is changed if the content hash of its labels and properties is different, see node_content_hash().
+        """
+        old_ids, old_hashes = cls.__content_hashes(old_graph_data)
+        new_ids, new_hashes = cls.__content_hashes(new_graph_data)
+        common_ids, old_positions, new_positions = np.intersect1d(old_ids, new_ids, assume_unique=True,
+                                                                  return_indices=True)
+        added_relations, removed_relations = cls.__diff_relations(old_graph_data, new_graph_data)
+        return cls(added_node_ids=np.setdiff1d(new_ids, old_ids, assume_unique=True),
+                   removed_node_ids=np.setdiff1d(old_ids, new_ids, assume_unique=True),
+                   changed_node_ids=common_ids[old_hashes[old_positions] != new_hashes[new_positions]],
+                   added_relations=added_relations,
+                   removed_relations=removed_relations)
+
+    @staticmethod
+    def __content_hashes(graph_data):
+        """
+        :return: (node_ids, hashes), the sorted ids of all nodes and the content hash of each node
+        """
+        storage = graph_data.storage
+        node_num = storage.node_num()
+        node_ids = np.fromiter(storage.node_ids(), dtype=np.int64, count=node_num)
+        # the nodes are iterated in the order of the node ids, without looking up each node by id
+        hashes = np.fromiter(map(node_content_hash, map(itemgetter(1), storage.nodes())), dtype=np.int64,
+                             count=node_num)
+        order = np.argsort(node_ids)
+        return node_ids[order], hashes[order]
+
+    @classmethod
+    def __diff_relations(cls, old_graph_data, new_graph_data):
+        """
+        the relation types are matched by the type string, the codes of the new graph data are changed into the codes
+        of the old one, the types only in the new graph data are given new codes. Then each relation is packed into a
+        int64 key, and the sorted keys of both graph datas are compared.
+        :return: (added relations, removed relations)
+        """
+        relation_types = list(old_graph_data.relation_type_table.types)
+        type_to_code_map = {relation_type: code for code, relation_type in enumerate(relation_types)}
+        new_to_old_codes = []
+        for relation_type in new_graph_data.relation_type_table.types:
+            if relation_type not in type_to_code_map:
+                type_to_code_map[relation_type] = len(relation_types)
+                relation_types.append(relation_type)
+            new_to_old_codes.append(type_to_code_map[relation_type])
+        old_relations = [array.astype(np.int64, copy=False) for array in old_graph_data.storage.relation_arrays()]
+        new_relations = [array.astype(np.int64, copy=False) for array in new_graph_data.storage.relation_arrays()]
+        new_relations[1] = np.array(new_to_old_codes, dtype=np.int64)[new_relations[1]]
+
+        relation_types = np.array(relation_types, dtype=object)
+        old_start_ids, old_codes, old_end_ids = old_relations
+        new_start_ids, new_codes, new_end_ids = new_relations
+        ids = np.concatenate([old_start_ids, old_end_ids, new_start_ids, new_end_ids])
+        if not len(ids):
+            return [(ids, relation_types[ids], ids)] * 2
+        min_id = int(ids.min())
+        id_num = int(ids.max()) - min_id + 1
+        code_num = max(len(relation_types), 1)
+        if id_num * id_num * code_num >= 2 ** 63:
+            return cls.__diff_relations_by_lexsort(old_relations, new_relations, relation_types)
+
+        def pack(start_ids, codes, end_ids):
+            return np.sort(((start_ids - min_id) * code_num + codes) * id_num + (end_ids - min_id))
+
+        def unpack(keys):
+            start_keys, end_ids = np.divmod(keys, id_num)
+            start_ids, codes = np.divmod(start_keys, code_num)
+            return start_ids + min_id, relation_types[codes], end_ids + min_id
+
+        # the relations of a graph data are unique, so the sorted keys are unique
+        old_keys = pack(*old_relations)
+        new_keys = pack(*new_relations)
+        return [unpack(np.setdiff1d(new_keys, old_keys, assume_unique=True)),
+                unpack(np.setdiff1d(old_keys, new_keys, assume_unique=True))]
+
+    @staticmethod
+    def __diff_relations_by_lexsort(old_relations, new_relations, relation_types):
+        """
+        the relations of both graph datas are sorted together when the ids are too large to be packed, a relation in
+        both is next to its copy, the others are added or removed.
+        """
+        start_ids, codes, end_ids = [np.concatenate([old_array, new_array])
+                                     for old_array, new_array in zip(old_relations, new_relations)]
+        is_new = np.arange(len(start_ids)) >= len(old_relations[0])
+        order = np.lexsort((end_ids, codes, start_ids))
+        start_ids, codes, end_ids, is_new = start_ids[order], codes[order], end_ids[order], is_new[order]
+        is_same_as_next = (start_ids[1:] == start_ids[:-1]) & (codes[1:] == codes[:-1]) & (end_ids[1:] == end_ids[:-1])
+        is_in_both = np.zeros(len(start_ids), dtype=bool)
+        is_in_both[:-1] |= is_same_as_next
+        is_in_both[1:] |= is_same_as_next
+        return [(start_ids[is_kept], relation_types[codes[is_kept]], end_ids[is_kept])
+                for is_kept in (~is_in_both & is_new, ~is_in_both & ~is_new)]
+
+    def is_empty(self):
+        return not (len(self.added_node_ids) or len(self.removed_node_ids) or len(self.changed_node_ids) or
+                    len(self.added_relations[0]) or len(self.removed_relations[0]))
+
+    def __repr__(self):
+        return "<GraphDiff addedNodes=%d removedNodes=%d changedNodes=%d addedRelations=%d removedRelations=%d>" % (
+            len(self.added_node_ids), len(self.removed_node_ids), len(self.changed_node_ids),
+            len(self.added_relations[0]), len(self.removed_relations[0]))
@@ -12,8 +12,9 @@
 """
 
 import random
+import sys
 
-from kgdt.utils import SaveLoad
+from kgdt.utils import SaveLoad, estimate_size, sample_evenly
 
 
 class MultiFieldDocument(SaveLoad):
@@ -245,6 +246,40 @@ class MultiFieldDocumentCollection(SaveLoad):
                 doc_id_set.add(doc_id)
         return doc_id_set
 
+    def memory_report(self, sample_size=None):
+        """
+        estimate the bytes used by the documents and each field.
+        :param sample_size: None to measure every document, or the number of documents to measure,
+        the others are estimated from them.
+        :return: a dict of bytes, e.g.,
+        {
+            "documents": 1024, # the document objects, their ids and names
+            "fields": {"title": 2048, "body": 8192}, # the field values of all documents
+            "indexes": 512, # the maps from the document id
+            "total": 11776
+        }
+        """
+        seen = set()
+        documents, scale = sample_evenly(self.documents, len(self.documents), sample_size)
+        document_size = 0
+        field_to_size = {}
+        for document in documents:
+            document_size += (sys.getsizeof(document) + sys.getsizeof(document.__dict__)
+                              + sys.getsizeof(document.field_to_field_doc_map)
+                              + estimate_size(document.id, sample_size, seen)
+                              + estimate_size(document.name, sample_size, seen))
+            for field_name, field_document in document.field_to_field_doc_map.items():
+                field_to_size[field_name] = (field_to_size.get(field_name, 0)
+                                             + estimate_size(field_document, sample_size, seen))
+        report = {
+            "documents": sys.getsizeof(self.documents) + int(document_size * scale),
+            "fields": {field_name: int(size * scale) for field_name, size in field_to_size.items()},
+            "indexes": (sys.getsizeof(self.doc_id_2_documents_map)
+                        + estimate_size(self.doc_id_2_doc_index_map, sample_size, seen)),
+        }
+        report["total"] = report["documents"] + sum(report["fields"].values()) + report["indexes"]
+        return report
+
     def sub_document_collection(self, doc_id_set):
         collection = MultiFieldDocumentCollection()
         for doc_id in doc_id_set:
@@ -10,13 +10,28 @@
 ------------------------------------------
 @Description:
 """
+import heapq
 import json
+from bisect import bisect_left
+from collections import Counter
 from copy import deepcopy
+from operator import itemgetter
+from types import MappingProxyType
 
-from networkx import MultiDiGraph
-from networkx import all_shortest_paths, shortest_path
+import numpy as np
+from networkx import NetworkXNoPath, NodeNotFound
 
-from kgdt.utils import SaveLoad
+from kgdt.models.adjacency import GraphAdjacency
+from kgdt.models.diff import GraphDiff
+from kgdt.models.journal import GraphJournal
+from kgdt.models.label import LabelPool, NodeIdSet
+from kgdt.models.normalizer import PropertyValueNormalizer
+from kgdt.models.property_store import ColumnarPropertyStore, NodeProperties
+from kgdt.models.query import PropertyQueryPlan
+from kgdt.models.storage import MultiDiGraphStorage, CompactGraphStorage, first_occurrence_mask
+from kgdt.models.traversal import GraphTraversal
+from kgdt.models.view import NodeIdView, LabelView, NetworkxView
+from kgdt.utils import SaveLoad, estimate_size
 
 
 class NodePropertyIndexer(SaveLoad):
@@ -90,6 +105,30 @@ class NodePropertyIndexer(SaveLoad):
             self.add_index_on_value(node_id=node_id, property_value=t_value)
         return True
 
+    def index_new_node(self, node_id, node_properties):
+        """
+        add a node to this indexer without comparing with the values indexed before. It is used on bulk loading,
+        if the node is already indexed, it falls back to index_node().
+        :param node_id: the node_id of the node need to be indexed.
+        :param node_properties: a dict. Key is the property name and value is the corresponding property values.
+        :return: True, create index on this node successfully; False, the node doesn't have the property.
+        """
+        if node_id in self.id_2_property_values_map:
+            return self.index_node(node_id, node_properties)
+        if self.index_property_name not in node_properties:
+            return False
+        property_value = node_properties[self.index_property_name]
+        if type(property_value) == list or type(property_value) == set:
+            property_values = set(property_value)
+        else:
+            property_values = {property_value}
+        self.id_2_property_values_map[node_id] = property_values
+        for t_value in property_values:
+            if t_value not in self.property_value_to_ids_map:
+                self.property_value_to_ids_map[t_value] = set([])
+            self.property_value_to_ids_map[t_value].add(node_id)
+        return True
+
     def get_indexed_property_values(self, node_id):
         """
         get all property values of the given node in a set.
@@ -157,32 +196,607 @@ class NodePropertyIndexer(SaveLoad):
             self.id_2_property_values_map.pop(node_id)
 
 
+class PrefixPropertyIndexer(NodePropertyIndexer):
+    """
+    a NodePropertyIndexer which also keeps the distinct str values in a sorted list, so the nodes whose value starts
+    with a prefix are found by a binary search in O(log N + k), instead of checking every node.
+
+    The new values are kept in a small pending set first, and merged into the sorted list on the query once the set is
+    large enough, so adding many nodes doesn't move the list on every value. The values without any node are left in
+    the list and dropped on the next merge.
+    >>>
+        indexer = PrefixPropertyIndexer("qualified_name")
+        indexer.index_node(3, {"qualified_name": "java.util.List"})
+        indexer.index_node(4, {"qualified_name": "java.lang.String"})
+        indexer.find_node_ids_by_prefix("java.util.")  # [3]
+    >>>
+    """
+    MIN_PENDING_SIZE = 64
+
+    def __init__(self, index_property_name):
+        super().__init__(index_property_name)
+        self.sorted_values = []
+        self.pending_values = set()
+
+    @classmethod
+    def from_indexer(cls, indexer):
+        """
+        create a PrefixPropertyIndexer taking over the maps of a NodePropertyIndexer on the same property.
+        """
+        prefix_indexer = cls(indexer.index_property_name)
+        prefix_indexer.property_value_to_ids_map = indexer.property_value_to_ids_map
+        prefix_indexer.id_2_property_values_map = indexer.id_2_property_values_map
+        prefix_indexer.pending_values = {value for value, node_ids in indexer.property_value_to_ids_map.items()
+                                         if node_ids and type(value) == str}
+        prefix_indexer.merge_pending_values()
+        return prefix_indexer
+
+    def index_new_node(self, node_id, node_properties):
+        if node_id not in self.id_2_property_values_map and self.index_property_name in node_properties:
+            property_value = node_properties[self.index_property_name]
+            if type(property_value) != list and type(property_value) != set:
+                property_value = (property_value,)
+            value_to_ids_map = self.property_value_to_ids_map
+            self.pending_values.update(value for value in property_value
+                                       if type(value) == str and not value_to_ids_map.get(value, None))
+        return super().index_new_node(node_id, node_properties)
+
+    def add_index_on_value(self, node_id, property_value):
+        if type(property_value) == str and not self.property_value_to_ids_map.get(property_value, None):
+            self.pending_values.add(property_value)
+        super().add_index_on_value(node_id, property_value)
+
+    def merge_pending_values(self):
+        """
+        merge the pending values into the sorted list, and drop the values without any node.
+        """
+        value_to_ids_map = self.property_value_to_ids_map
+        # sorted() merges the two sorted runs in linear time
+        values = sorted([value for value in self.sorted_values if value_to_ids_map.get(value, None)] +
+                        sorted(self.pending_values))
+        # a pending value may be still in the list, if all its nodes were removed and it is added again
+        self.sorted_values = [value for i, value in enumerate(values) if i == 0 or values[i - 1] != value]
+        self.pending_values = set()
+
+    def iter_values_by_prefix(self, prefix):
+        """
+        :param prefix: a str
+        :return: a iterator of the indexed str values starting with the prefix in order
+        """
+        if len(self.pending_values) > max(self.MIN_PENDING_SIZE, int(len(self.sorted_values) ** 0.5)):
+            self.merge_pending_values()
+        return heapq.merge(self.__iter_sorted_values_by_prefix(prefix),
+                           sorted(value for value in self.pending_values if value.startswith(prefix)))
+
+    def __iter_sorted_values_by_prefix(self, prefix):
+        sorted_values = self.sorted_values
+        position = bisect_left(sorted_values, prefix)
+        while position < len(sorted_values) and sorted_values[position].startswith(prefix):
+            yield sorted_values[position]
+            position += 1
+
+    def find_node_ids_by_prefix(self, prefix):
+        """
+        find all nodes with a str property value starting with the prefix.
+        :param prefix: a str
+        :return: a list of node ids without duplicates, in the order of their values
+        """
+        node_ids = {}
+        for value in self.iter_values_by_prefix(prefix):
+            node_ids.update(dict.fromkeys(self.property_value_to_ids_map.get(value, ())))
+        return list(node_ids)
+
+
+class NormalizedPropertyIndexer(NodePropertyIndexer):
+    """
+    a NodePropertyIndexer on the normalized str values, e.g., the lowercase values for the case-insensitive lookup,
+    or the words of the camel case values. The values are normalized once on indexing, only the normalized values are
+    kept. The query value is normalized by the same normalizer, and the nodes with all the normalized query values are
+    returned. The values that are not str are not indexed.
+    >>>
+        indexer = NormalizedPropertyIndexer("name", PropertyValueNormalizer(["camel_case_split", "lowercase"]))
+        indexer.index_node(3, {"name": "StringBuffer"})
+        indexer.index_node(4, {"name": "StringBuilder"})
+        indexer.find_node_ids_by_value("string")  # {3, 4}
+        indexer.find_node_ids_by_value("stringBuffer")  # {3}
+    >>>
+    """
+
+    def __init__(self, index_property_name, normalizer):
+        """
+        :param index_property_name: the property name
+        :param normalizer: a PropertyValueNormalizer
+        """
+        super().__init__(index_property_name)
+        self.normalizer = normalizer
+
+    def normalize(self, property_value):
+        """
+        :param property_value: a str, or a list or set of str
+        :return: a set of the normalized values
+        """
+        if type(property_value) != list and type(property_value) != set:
+            property_value = (property_value,)
+        normalized_values = set()
+        for value in property_value:
+            if type(value) == str:
+                normalized_values.update(self.normalizer(value))
+        return normalized_values
+
+    def index_node_with_value(self, node_id, index_property_value):
+        return super().index_node_with_value(node_id, self.normalize(index_property_value))
+
+    def index_new_node(self, node_id, node_properties):
+        if node_id in self.id_2_property_values_map or self.index_property_name not in node_properties:
+            return super().index_new_node(node_id, node_properties)
+        return super().index_new_node(
+            node_id, {self.index_property_name: self.normalize(node_properties[self.index_property_name])})
+
+    def find_node_ids_by_value(self, value):
+        """
+        find all nodes with all the normalized values of the given value.
+        :param value: a str, not normalized
+        :return: a set of node ids
+        """
+        postings = sorted((super(NormalizedPropertyIndexer, self).find_node_ids_by_value(normalized_value)
+                           for normalized_value in self.normalize(value)), key=len)
+        if not postings:
+            return set()
+        if len(postings) == 1:
+            return postings[0]
+        return postings[0].intersection(*postings[1:])
+
+
+class RangePropertyIndexer(SaveLoad):
+    """
+    a ordered index on a property with number values, e.g., "sourcerank", or str values compared as str, e.g., the
+    timestamps like "2015-01-11 23:56:18 UTC". The nodes with a value in a range, or with the largest values, are found
+    by a binary search in O(log N + k).
+
+    The values and the node ids are kept in two numpy arrays sorted by the value. The changes are kept in a insert
+    buffer and a set of removed node ids first, and merged into the arrays on the query once they are large enough.
+
+    The kind of the values is decided by the first indexed value, the values of other kinds are not indexed.
+    The number values are kept as float64, so a int larger than 2**53 is compared approximately.
+    >>>
+        indexer = RangePropertyIndexer("sourcerank")
+        indexer.index_node(3, {"sourcerank": 12})
+        indexer.index_node(4, {"sourcerank": 3})
+        indexer.find_node_ids_by_range(low=10)  # array([3])
+        indexer.find_top_k_node_ids(1, largest=False)  # array([4])
+    >>>
+    """
+    KIND_NUMBER = "number"
+    KIND_STR = "str"
+    MIN_PENDING_SIZE = 1024
+
+    def __init__(self, index_property_name):
+        self.index_property_name = index_property_name
+        self.value_kind = None
+        self.sorted_values = np.empty(0, dtype=np.float64)
+        self.sorted_ids = np.empty(0, dtype=np.int64)
+        # the node ids whose entry in the arrays is out of date
+        self.removed_ids = set()
+        # the node id to value map of the entries not in the arrays yet
+        self.added_id_to_value_map = {}
+        self.id_2_value_map = {}
+
+    @classmethod
+    def kind_of(cls, value):
+        """
+        :return: KIND_NUMBER or KIND_STR, None for the value that could not be ranked, e.g., a list, a bool or nan
+        """
+        # bool is a int, but it is not a number to rank
+        if type(value) in (int, float) or isinstance(value, (np.integer, np.floating)):
+            return cls.KIND_NUMBER if value == value else None
+        if type(value) == str:
+            return cls.KIND_STR
+        return None
+
+    def __accept(self, value):
+        value_kind = self.kind_of(value)
+        if self.value_kind is None and value_kind is not None:
+            self.value_kind = value_kind
+            if value_kind == self.KIND_STR:
+                self.sorted_values = np.empty(0, dtype=object)
+        return value_kind is not None and value_kind == self.value_kind
+
+    def index_node(self, node_id, node_properties):
+        """
+        index a node, or update the index of a indexed node.
+        :return: True, the index of the node is changed. False, nothing changed.
+        """
+        value = node_properties.get(self.index_property_name, None)
+        if value is None or not self.__accept(value):
+            if node_id not in self.id_2_value_map:
+                return False
+            self.remove_index_on_node(node_id)
+            return True
+        if node_id in self.id_2_value_map:
+            if self.id_2_value_map[node_id] == value:
+                return False
+            self.remove_index_on_node(node_id)
+        self.id_2_value_map[node_id] = value
+        self.added_id_to_value_map[node_id] = value
+        return True
+
+    def index_new_node(self, node_id, node_properties):
+        return self.index_node(node_id, node_properties)
+
+    def remove_index_on_node(self, node_id):
+        if self.id_2_value_map.pop(node_id, None) is None:
+            return
+        if self.added_id_to_value_map.pop(node_id, None) is None:
+            self.removed_ids.add(node_id)
+
+    def __len__(self):
+        return len(self.id_2_value_map)
+
+    def __pending_size(self):
+        return len(self.added_id_to_value_map) + len(self.removed_ids)
+
+    def __merge_pending_if_needed(self):
+        if self.__pending_size() > max(self.MIN_PENDING_SIZE, int(len(self.sorted_values) ** 0.5)):
+            self.merge_pending()
+
+    def __pending_arrays(self):
+        added_ids = np.fromiter(self.added_id_to_value_map.keys(), dtype=np.int64,
+                                count=len(self.added_id_to_value_map))
+        added_values = np.array(list(self.added_id_to_value_map.values()), dtype=self.sorted_values.dtype)
+        order = np.argsort(added_values, kind="stable")
+        return added_values[order], added_ids[order]
+
+    def merge_pending(self):
+        """
+        merge the insert buffer and the removed node ids into the sorted arrays.
+        """
+        if not self.__pending_size():
+            return
+        sorted_values = self.sorted_values
+        sorted_ids = self.sorted_ids
+        kept = self.__alive_mask(sorted_ids)
+        if kept is not None:
+            sorted_values = sorted_values[kept]
+            sorted_ids = sorted_ids[kept]
+        if self.added_id_to_value_map:
+            added_values, added_ids = self.__pending_arrays()
+            positions = sorted_values.searchsorted(added_values, side="right")
+            sorted_values = np.insert(sorted_values, positions, added_values)
+            sorted_ids = np.insert(sorted_ids, positions, added_ids)
+        self.sorted_values = sorted_values
+        self.sorted_ids = sorted_ids
+        self.removed_ids = set()
+        self.added_id_to_value_map = {}
+
+    def __alive_mask(self, node_ids):
+        """
+        :return: a bool array marking the node ids not removed, None if no node id is removed
+        """
+        if not self.removed_ids:
+            return None
+        return ~np.isin(node_ids, np.fromiter(self.removed_ids, dtype=np.int64, count=len(self.removed_ids)))
+
+    def find_node_ids_by_range(self, low=None, high=None):
+        """
+        find all nodes with a value in [low, high].
+        :param low: the smallest value, None for no lower bound
+        :param high: the largest value, None for no upper bound
+        :return: a int64 numpy array of node ids, sorted by the value
+        """
+        self.__merge_pending_if_needed()
+        start = 0 if low is None else self.sorted_values.searchsorted(low, side="left")
+        end = len(self.sorted_values) if high is None else self.sorted_values.searchsorted(high, side="right")
+        values = self.sorted_values[start:end]
+        node_ids = self.sorted_ids[start:end]
+        alive = self.__alive_mask(node_ids)
+        if alive is not None:
+            values = values[alive]
+            node_ids = node_ids[alive]
+        if not self.added_id_to_value_map:
+            return node_ids
+        added_values, added_ids = self.__pending_arrays()
+        in_range = np.ones(len(added_values), dtype=bool)
+        if low is not None:
+            in_range &= added_values >= low
+        if high is not None:
+            in_range &= added_values <= high
+        return self.__merge_by_value(values, node_ids, added_values[in_range], added_ids[in_range])
+
+    def find_top_k_node_ids(self, k, largest=True):
+        """
+        find the k nodes with the largest values, or the smallest values.
+        :param k: the number of nodes
+        :param largest: True for the largest values in descending order, False for the smallest values in ascending
+        order.
+        :return: a int64 numpy array of node ids
+        """
+        self.__merge_pending_if_needed()
+        # the removed entries are skipped, so take more entries from the arrays to get k alive ones
+        take_num = min(len(self.sorted_ids), k + len(self.removed_ids))
+        if largest:
+            positions = np.arange(len(self.sorted_ids) - take_num, len(self.sorted_ids))
+        else:
+            positions = np.arange(take_num)
+        values = self.sorted_values[positions]
+        node_ids = self.sorted_ids[positions]
+        alive = self.__alive_mask(node_ids)
+        if alive is not None:
+            values = values[alive]
+            node_ids = node_ids[alive]
+        if self.added_id_to_value_map:
+            node_ids = self.__merge_by_value(values, node_ids, *self.__pending_arrays())
+        if largest:
+            return node_ids[::-1][:k]
+        return node_ids[:k]
+
+    @staticmethod
+    def __merge_by_value(values, node_ids, other_values, other_node_ids):
+        positions = values.searchsorted(other_values, side="right")
+        return np.insert(node_ids, positions, other_node_ids)
+
+
+class CompositePropertyIndexer(SaveLoad):
+    """
+    a index on the value tuple of several properties, e.g., ("group_id", "artifact_id", "version"), so a node is found
+    by the values of all these properties in O(1), without intersecting the large posting sets of each property.
+
+    A node is indexed only if it has all the properties. Unlike NodePropertyIndexer, a list value is indexed as a
+    whole, it is kept as a tuple in the key, and a set value is kept as a frozenset.
+    >>>
+        indexer = CompositePropertyIndexer(("group_id", "artifact_id"))
+        indexer.index_node(3, {"group_id": "junit", "artifact_id": "junit", "version": "4.12"})
+        indexer.find_node_ids_by_key(("junit", "junit"))  # {3}
+    >>>
+    """
+
+    def __init__(self, index_property_names):
+        """
+        :param index_property_names: a tuple of property names, the order of the names is the order in the key.
+        """
+        self.index_property_names = tuple(index_property_names)
+        self.key_to_ids_map = {}
+        self.id_2_key_map = {}
+
+    def make_key(self, node_properties):
+        """
+        :param node_properties: a dict of node properties
+        :return: the tuple of the property values, None if some property is missing or the value is not hashable
+        """
+        key = []
+        for property_name in self.index_property_names:
+            if property_name not in node_properties:
+                return None
+            value = node_properties[property_name]
+            if type(value) == list:
+                value = tuple(value)
+            elif type(value) == set:
+                value = frozenset(value)
+            key.append(value)
+        key = tuple(key)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def index_node(self, node_id, node_properties):
+        """
+        index a node, or update the index of a indexed node.
+        :return: True, the index of the node is changed. False, nothing changed.
+        """
+        key = self.make_key(node_properties)
+        old_key = self.id_2_key_map.get(node_id, None)
+        if old_key == key:
+            return False
+        if old_key is not None:
+            self.remove_index_on_node(node_id)
+        if key is None:
+            return True
+        self.id_2_key_map[node_id] = key
+        node_ids = self.key_to_ids_map.get(key, None)
+        if node_ids is None:
+            node_ids = self.key_to_ids_map[key] = set()
+        node_ids.add(node_id)
+        return True
+
+    def find_node_ids_by_key(self, key):
+        """
+        :param key: the tuple of the property values, in the order of index_property_names
+        :return: a set of node ids
+        """
+        return self.key_to_ids_map.get(key, set())
+
+    def find_node_ids(self, node_properties):
+        """
+        :param node_properties: a dict with all the indexed properties
+        :return: a set of node ids
+        """
+        key = self.make_key(node_properties)
+        if key is None:
+            return set()
+        return self.find_node_ids_by_key(key)
+
+    def remove_index_on_node(self, node_id):
+        key = self.id_2_key_map.pop(node_id, None)
+        if key is None:
+            return
+        node_ids = self.key_to_ids_map[key]
+        node_ids.discard(node_id)
+        if not node_ids:
+            self.key_to_ids_map.pop(key)
+
+
 class GraphIndexCollection(SaveLoad):
     """
-    a collection of NodePropertyIndex
+    a collection of NodePropertyIndex, CompositePropertyIndexer, RangePropertyIndexer and NormalizedPropertyIndexer
     """
 
     def __init__(self):
         self.property_to_indexer_map = {}
+        self.composite_indexer_map = {}
+        self.range_indexer_map = {}
+        # (property name, normalizer name) -> NormalizedPropertyIndexer
+        self.normalized_indexer_map = {}
+
+    def __setstate__(self, state):
+        # the collection saved before the composite, range and normalized indexes were added
+        state.setdefault("composite_indexer_map", {})
+        state.setdefault("range_indexer_map", {})
+        state.setdefault("normalized_indexer_map", {})
+        self.__dict__.update(state)
+
+    def create_composite_index(self, property_names):
+        """
+        create a composite index on the value tuple of the properties.
+        :param property_names: a tuple of property names
+        :return: the CompositePropertyIndexer, a new one or the existing one on the same properties
+        """
+        property_names = tuple(property_names)
+        if property_names not in self.composite_indexer_map:
+            self.composite_indexer_map[property_names] = CompositePropertyIndexer(property_names)
+        return self.composite_indexer_map[property_names]
+
+    def get_composite_index(self, property_names):
+        """
+        :return: the CompositePropertyIndexer on exactly the properties in this order, None if not exist
+        """
+        return self.composite_indexer_map.get(tuple(property_names), None)
+
+    def find_covering_composite_indexes(self, property_names):
+        """
+        :param property_names: a iterable of property names
+        :return: a list of the CompositePropertyIndexer whose properties are all in the given property names
+        """
+        property_names = set(property_names)
+        return [indexer for index_property_names, indexer in self.composite_indexer_map.items()
+                if property_names.issuperset(index_property_names)]
+
+    def create_range_index_on_property(self, *property_name_list):
+        """
+        create a RangePropertyIndexer on each property.
+        :return: the list of the new RangePropertyIndexer
+        """
+        new_indexers = []
+        for name in property_name_list:
+            if name not in self.range_indexer_map:
+                self.range_indexer_map[name] = RangePropertyIndexer(name)
+                new_indexers.append(self.range_indexer_map[name])
+        return new_indexers
+
+    def get_range_index(self, property_name):
+        """
+        :return: the RangePropertyIndexer on the property, None if not exist
+        """
+        return self.range_indexer_map.get(property_name, None)
+
+    def create_normalized_index_on_property(self, property_name, normalizer):
+        """
+        create a NormalizedPropertyIndexer on the property.
+        :param normalizer: a PropertyValueNormalizer
+        :return: the NormalizedPropertyIndexer, None if it exists already
+        """
+        key = (property_name, normalizer.name)
+        if key in self.normalized_indexer_map:
+            return None
+        indexer = self.normalized_indexer_map[key] = NormalizedPropertyIndexer(property_name, normalizer)
+        return indexer
+
+    def get_normalized_index(self, property_name, normalizer_name):
+        """
+        :return: the NormalizedPropertyIndexer on the property with the normalizer name, None if not exist
+        """
+        return self.normalized_indexer_map.get((property_name, normalizer_name), None)
 
     def create_index_on_property(self, *property_name_list):
         for name in property_name_list:
             if name not in self.property_to_indexer_map:
                 self.property_to_indexer_map[name] = NodePropertyIndexer(index_property_name=name)
 
+    def create_prefix_index_on_property(self, *property_name_list):
+        """
+        create a PrefixPropertyIndexer on each property, a existing NodePropertyIndexer on the property is replaced by
+        a PrefixPropertyIndexer with the same entries.
+        """
+        for name in property_name_list:
+            indexer = self.property_to_indexer_map.get(name, None)
+            if indexer is None:
+                self.property_to_indexer_map[name] = PrefixPropertyIndexer(index_property_name=name)
+            elif not isinstance(indexer, PrefixPropertyIndexer):
+                self.property_to_indexer_map[name] = PrefixPropertyIndexer.from_indexer(indexer)
+
+    def is_property_prefix_indexed(self, property_name):
+        return isinstance(self.property_to_indexer_map.get(property_name, None), PrefixPropertyIndexer)
+
+    def get_prefix_index_property(self):
+        """
+        get all property names with a PrefixPropertyIndexer
+        """
+        return [property_name for property_name, indexer in self.property_to_indexer_map.items()
+                if isinstance(indexer, PrefixPropertyIndexer)]
+
+    def create_empty_copy(self):
+        """
+        :return: a new GraphIndexCollection with the same kinds of indexes on the same properties, but no node indexed
+        """
+        index_collection = GraphIndexCollection()
+        index_collection.create_index_on_property(*self.get_index_property())
+        index_collection.create_prefix_index_on_property(*self.get_prefix_index_property())
+        for property_names in self.composite_indexer_map.keys():
+            index_collection.create_composite_index(property_names)
+        index_collection.create_range_index_on_property(*self.range_indexer_map.keys())
+        for indexer in self.normalized_indexer_map.values():
+            index_collection.create_normalized_index_on_property(indexer.index_property_name, indexer.normalizer)
+        return index_collection
+
     def add_node(self, node_id, node_properties):
         for property_name, indexer in self.property_to_indexer_map.items():
             indexer.index_node(node_id, node_properties)
+        for indexer in self.composite_indexer_map.values():
+            indexer.index_node(node_id, node_properties)
+        for indexer in self.range_indexer_map.values():
+            indexer.index_node(node_id, node_properties)
+        for indexer in self.normalized_indexer_map.values():
+            indexer.index_node(node_id, node_properties)
+
+    def add_nodes(self, node_id_properties_pairs):
+        """
+        index many nodes in one pass.
+        :param node_id_properties_pairs: a iterable of (node_id, node_properties)
+        :return:
+        """
+        indexers = (list(self.property_to_indexer_map.values()) + list(self.range_indexer_map.values())
+                    + list(self.normalized_indexer_map.values()))
+        composite_indexers = list(self.composite_indexer_map.values())
+        if not indexers and not composite_indexers:
+            return
+        for node_id, node_properties in node_id_properties_pairs:
+            for indexer in indexers:
+                indexer.index_new_node(node_id, node_properties)
+            for indexer in composite_indexers:
+                indexer.index_node(node_id, node_properties)
 
     def remove_node(self, node_id):
         for property_name, indexer in self.property_to_indexer_map.items():
             indexer.remove_index_on_node(node_id)
+        for indexer in self.composite_indexer_map.values():
+            indexer.remove_index_on_node(node_id)
+        for indexer in self.range_indexer_map.values():
+            indexer.remove_index_on_node(node_id)
+        for indexer in self.normalized_indexer_map.values():
+            indexer.remove_index_on_node(node_id)
 
     def find_ids(self, property_name, property_value):
         if not self.is_property_indexed(property_name):
             return set([])
         return self.property_to_indexer_map[property_name].find_node_ids_by_value(property_value)
 
+    def find_ids_by_prefix(self, property_name, prefix):
+        """
+        :return: a list of the node ids with a str value of the property starting with the prefix, the property must
+        have a PrefixPropertyIndexer
+        """
+        return self.property_to_indexer_map[property_name].find_node_ids_by_prefix(prefix)
+
     def is_property_indexed(self, property_name):
         """
         check if one property indexed
@@ -193,6 +807,13 @@ class GraphIndexCollection(SaveLoad):
             return True
         return False
 
+    def has_index(self):
+        """
+        :return: True if there is any kind of index in the collection
+        """
+        return bool(self.property_to_indexer_map or self.composite_indexer_map or self.range_indexer_map or
+                    self.normalized_indexer_map)
+
     def get_index_property(self):
         """
         get all indexed property name
@@ -201,6 +822,60 @@ class GraphIndexCollection(SaveLoad):
         return self.property_to_indexer_map.keys()
 
 
+class RelationTypeTable(SaveLoad):
+    """
+    the symbol table of the relation types in one GraphData. Each relation type string is given a small int code,
+    the storage engine only keeps the code on each relation.
+    >>>
+        table = RelationTypeTable()
+        table.add("belong to")  # 0
+        table.get_code("belong to")  # 0
+        table.get_type(0)  # "belong to"
+    >>>
+    """
+
+    def __init__(self):
+        self.types = []
+        self.type_to_code_map = {}
+
+    def add(self, relation_type):
+        """
+        get the code of a relation type, a new code will be given if the relation type is new.
+        :param relation_type: the relation type string
+        :return: the int code
+        """
+        code = self.type_to_code_map.get(relation_type, None)
+        if code is None:
+            code = len(self.types)
+            self.types.append(relation_type)
+            self.type_to_code_map[relation_type] = code
+        return code
+
+    def get_code(self, relation_type):
+        """
+        :param relation_type: the relation type string
+        :return: the int code, None if the relation type never exists in the graph
+        """
+        return self.type_to_code_map.get(relation_type, None)
+
+    def get_codes(self, relation_types):
+        """
+        :param relation_types: None, a relation type string or a list of relation type strings
+        :return: None for None, otherwise the list of the int codes of the relation types existing in the graph
+        """
+        if relation_types is None:
+            return None
+        if isinstance(relation_types, str):
+            relation_types = [relation_types]
+        return [code for code in map(self.get_code, relation_types) if code is not None]
+
+    def get_type(self, code):
+        return self.types[code]
+
+    def __len__(self):
+        return len(self.types)
+
+
 class GraphData(SaveLoad):
     """
     the store of a graph data.
@@ -223,6 +898,9 @@ class GraphData(SaveLoad):
 
     # load a graphdata from disk
     graphdata=Graphdata.load("test.v1.graph")
+
+    # keep the nodes and relations in numpy arrays instead of a networkx MultiDiGraph, for large graph
+    graphdata=GraphData(backend=GraphData.BACKEND_COMPACT)
     >>>
     """
 
@@ -237,19 +915,221 @@ class GraphData(SaveLoad):
     DEFAULT_KEY_RELATION_TYPE = "relationType"
     DEFAULT_KEY_RELATION_END_ID = "endId"
 
-    def __init__(self):
-        # two map for
+    ID_POLICY_KEEP = "keep"  # use the id in the node json, a new id is given if the node json doesn't have one
+    ID_POLICY_NEW = "new"  # always give a new id, the id in the node json is ignored
+
+    ID_STRATEGY_REMAP = "remap"  # give the merged nodes new ids one by one after the max node id
+    ID_STRATEGY_OFFSET = "offset"  # shift the ids of each merged graph data by a offset, the gaps between ids are kept
+
+    BACKEND_MULTI_DI_GRAPH = "multidigraph"  # store the graph in a networkx MultiDiGraph, the default backend
+    BACKEND_COMPACT = "compact"  # store the relations in CSR/CSC numpy arrays, see CompactGraphStorage
+    BACKEND_TO_STORAGE_CLASS = {
+        BACKEND_MULTI_DI_GRAPH: MultiDiGraphStorage,
+        BACKEND_COMPACT: CompactGraphStorage,
+    }
+
+    PROPERTY_STORE_DICT = "dict"  # each node keeps its own properties dict, the default property store
+    PROPERTY_STORE_COLUMNAR = "columnar"  # the properties are kept by columns, see ColumnarPropertyStore
+    PROPERTY_STORES = (PROPERTY_STORE_DICT, PROPERTY_STORE_COLUMNAR)
+
+    def __init__(self, backend=BACKEND_MULTI_DI_GRAPH, property_store=PROPERTY_STORE_DICT):
+        """
+        :param backend: the storage engine to keep nodes and relations, GraphData.BACKEND_MULTI_DI_GRAPH or
+        GraphData.BACKEND_COMPACT.
+        :param property_store: how to keep the node properties, GraphData.PROPERTY_STORE_DICT or
+        GraphData.PROPERTY_STORE_COLUMNAR. With the columnar store, the properties of a node is a NodeProperties
+        mapping on the columns instead of a dict, it saves a lot of memory when many nodes share the same property
+        names, and the query on the unindexed properties is a vectorized scan of the column.
+        The properties dict given on adding a node is copied into the columns, so changing that dict later doesn't
+        change the node.
+        """
+        if backend not in self.BACKEND_TO_STORAGE_CLASS:
+            raise ValueError("unknown GraphData backend %r" % backend)
+        if property_store not in self.PROPERTY_STORES:
+            raise ValueError("unknown GraphData property store %r" % property_store)
+        self.backend = backend
+        self.property_store_type = property_store
+        # a read-only sub graph shares the node properties with its parent graph data, see subgraph()
+        self.read_only = False
         self.__init_graph()
 
+    def __setstate__(self, state):
+        # the GraphData saved before the storage engine existed keeps a MultiDiGraph in 'graph',
+        # and the key of each edge is the relation type string.
+        if "storage" not in state:
+            graph = state.pop("graph")
+            relation_type_table = RelationTypeTable()
+            edges = list(graph.edges(keys=True, data=True))
+            graph.remove_edges_from([(start_id, end_id, key) for start_id, end_id, key, data in edges])
+            for start_id, end_id, key, data in edges:
+                graph.add_edge(start_id, end_id, relation_type_table.add(key), **data)
+            state["storage"] = MultiDiGraphStorage(graph)
+            state["relation_type_table"] = relation_type_table
+            state["backend"] = self.BACKEND_MULTI_DI_GRAPH
+        state.setdefault("cached_adjacency", None)
+        state.setdefault("cached_networkx_graph", None)
+        state.setdefault("cached_sparse_adjacency", None)
+        state.setdefault("cached_sparse_adjacency_key", None)
+        state.setdefault("journal", None)
+        state.setdefault("read_only", False)
+        if "property_store_type" not in state:
+            state["property_store_type"] = self.PROPERTY_STORE_DICT
+            state["property_store"] = None
+        self.__dict__.update(state)
+        if "label_pool" not in state:
+            # the labels were kept in a set for each node and each label
+            self.label_pool = LabelPool()
+            for node_id, node_json in self.storage.nodes():
+                labels = node_json[self.DEFAULT_KEY_NODE_LABELS]
+                node_json[self.DEFAULT_KEY_NODE_LABELS] = self.label_pool.intern(labels)
+            self.label_to_ids_map = {label: NodeIdSet(node_ids) for label, node_ids in self.label_to_ids_map.items()}
+
+    @property
+    def graph(self):
+        """
+        the networkx MultiDiGraph view of the graph data, the key of each edge is the relation type string.
+        It is a live NetworkxView, nothing is copied and it always shows the current content. Adding or removing
+        nodes and edges on it raises networkx.NetworkXError, the graph data should be changed by its own methods.
+        """
+        if self.cached_networkx_graph is None:
+            self.cached_networkx_graph = NetworkxView(self)
+        return self.cached_networkx_graph
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the networkx view refers to the graph data, it is created again after loading
+        state["cached_networkx_graph"] = None
+        return state
+
     def clear(self):
+        self.__check_writable()
+        journal = self.journal
+        relation_type_table = self.relation_type_table
         self.__init_graph()
+        if journal is not None:
+            # the relation type codes in the journal are decoded by the table, the codes only increase
+            self.journal = journal
+            self.relation_type_table = relation_type_table
+        self.__record_change(GraphJournal.OP_CLEAR, GraphJournal.NO_ID)
 
     def __init_graph(self):
-        self.graph = MultiDiGraph()
+        self.storage = self.BACKEND_TO_STORAGE_CLASS[self.backend]()
         self.max_node_id = 0
         self.label_to_ids_map = {}
+        self.label_pool = LabelPool()
         self.index_collection = GraphIndexCollection()
         self.relation_type_to_num_map = {}
+        self.relation_type_table = RelationTypeTable()
+        self.property_store = None
+        if self.property_store_type == self.PROPERTY_STORE_COLUMNAR:
+            self.property_store = ColumnarPropertyStore()
+        self.cached_adjacency = None
+        self.cached_networkx_graph = None
+        # the last matrix given by to_sparse_adjacency() and its arguments, kept as a attribute so it is saved in
+        # separate files together with the graph data and could be loaded by mmap
+        self.cached_sparse_adjacency = None
+        self.cached_sparse_adjacency_key = None
+        self.journal = None
+
+    def __check_writable(self):
+        if self.read_only:
+            raise ValueError("the graph data is a read-only sub graph, it can't be changed")
+
+    def __on_structure_changed(self):
+        """
+        called when some nodes or relations are added or removed, the snapshots of the structure are out of date.
+        """
+        self.cached_adjacency = None
+        self.cached_sparse_adjacency = None
+        self.cached_sparse_adjacency_key = None
+
+    def enable_journal(self, max_size=GraphJournal.DEFAULT_MAX_SIZE):
+        """
+        start recording the changes of the nodes and the relations in a journal, so a consumer could get what is
+        changed by changes_since() instead of scanning the whole graph data. The journal is saved together with
+        the graph data.
+        Only the changes made by the methods of GraphData are recorded, changing a node json or its properties dict
+        directly is not.
+        >>>
+            seq = graph_data.enable_journal(max_size=100000)
+            graph_data.add_node({"entity"}, {"name": "bob"})
+            seqs, ops, start_ids, relation_types, end_ids = graph_data.changes_since(seq)
+        >>>
+        :param max_size: the max number of the kept changes, the older ones are dropped, None for no limit.
+        If the journal is enabled, only max_size is changed.
+        :return: the seq of the last recorded change, to pass to changes_since() later
+        """
+        if self.journal is None:
+            self.journal = GraphJournal(max_size)
+        else:
+            self.journal.set_max_size(max_size)
+            self.journal.resume()
+        return self.journal.last_seq
+
+    def disable_journal(self):
+        """
+        stop recording the changes and drop the recorded ones. The seq goes on if the journal is enabled again,
+        the changes since a seq before are not available.
+        """
+        if self.journal is not None:
+            self.journal.pause()
+
+    def is_journal_enabled(self):
+        return self.journal is not None and self.journal.recording
+
+    def changes_since(self, seq):
+        """
+        get the changes recorded after a seq, in order. See GraphJournal for the op codes.
+        :param seq: the seq given by enable_journal() or the last one of a earlier call, 0 for all recorded changes
+        :return: (seqs, ops, start_ids, relation_types, end_ids), five aligned numpy arrays. For a node change,
+        start_ids is the node id, relation_types is None and end_ids is -1. The properties and labels are not
+        recorded, the current ones are read from the graph data.
+        :raise ValueError: the journal is not enabled, or some changes after seq are dropped because of the max size,
+        then the whole graph data should be scanned again.
+        """
+        if not self.is_journal_enabled():
+            raise ValueError("the journal is not enabled, call enable_journal() first")
+        seqs, ops, start_ids, codes, end_ids = self.journal.changes_since(seq)
+        # the code -1 of the node changes picks the None at last
+        relation_types = np.array(self.relation_type_table.types + [None], dtype=object)[codes]
+        return seqs, ops, start_ids, relation_types, end_ids
+
+    def __record_change(self, op, start_id, code=GraphJournal.NO_CODE, end_id=GraphJournal.NO_ID):
+        if self.journal is not None and self.journal.recording:
+            self.journal.record(op, start_id, code, end_id)
+
+    def __record_changes(self, op, start_ids, codes=None, end_ids=None):
+        if self.journal is not None and self.journal.recording:
+            self.journal.record_many(op, start_ids, codes, end_ids)
+
+    def __record_removed_relations(self, relations):
+        """
+        :param relations: a collection of relations in (startId, relation type code, endId)
+        """
+        if self.is_journal_enabled() and relations:
+            start_ids, codes, end_ids = zip(*relations)
+            self.journal.record_many(GraphJournal.OP_REMOVE_RELATION, start_ids, codes, end_ids)
+
+    def __store_node_properties(self, node_id, node_properties):
+        """
+        put the properties of a node into the property store.
+        :return: the properties to keep in the node json, the dict itself for the dict property store, a
+        NodeProperties for the columnar property store.
+        """
+        if self.property_store is None:
+            return node_properties
+        if isinstance(node_properties, NodeProperties) and node_properties.store is self.property_store:
+            return node_properties
+        node_json = self.storage.get_node(node_id)
+        if node_json is not None:
+            exist_properties = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
+            if isinstance(exist_properties, NodeProperties) and exist_properties.store is self.property_store:
+                return self.property_store.reset_row(exist_properties.row, dict(node_properties))
+        return self.property_store.add_row(node_id, node_properties)
+
+    def __find_node_ids_in_property_store(self, rows):
+        # the store of a read-only sub graph is shared with its parent graph, so the ids are checked in the storage
+        return [node_id for node_id in self.property_store.get_node_ids(rows) if self.storage.has_node(node_id)]
 
     def create_index_on_property(self, *property_name_list):
         """
@@ -259,44 +1139,389 @@ class GraphData(SaveLoad):
         """
         self.index_collection.create_index_on_property(*property_name_list)
 
-    def find_all_shortest_paths(self, startId, endId):
+    def get_adjacency(self):
+        """
+        get the snapshot of all nodes and relations in CSR arrays, for the vectorized traversal and analytics.
+        It is built once and cached until some nodes or relations are added or removed.
+        :return: a GraphAdjacency
+        """
+        if self.cached_adjacency is None:
+            self.cached_adjacency = GraphAdjacency.from_storage(self.storage)
+        return self.cached_adjacency
+
+    def to_sparse_adjacency(self, relation_types=None, directed=True, weight=None):
+        """
+        get the relations as a sparse matrix on the node indexes of get_adjacency(), for the sparse matrix computation
+        on the whole graph, e.g., kgdt.analytics. The matrix is built from the cached adjacency without a python loop
+        on the relations (except for the weight), and it is cached until some nodes or relations are added or removed.
+        The last built matrix is saved together with the graph data, a large one in separate files that could be
+        loaded by mmap.
+        >>>
+            matrix, node_ids = graph_data.to_sparse_adjacency(relation_types=["call"])
+            index = graph_data.get_adjacency().index_of(1)
+            node_ids[matrix[index].indices]  # the ids of the end nodes of the "call" relations from the node 1
+        >>>
+        :param relation_types: None for all relations, or a relation type or a list of relation types
+        :param directed: True for the entry (i, j) of the relations from the node on index i to the node on index j,
+        False for a symmetric matrix of the relations in both directions.
+        :param weight: None to count each relation as 1, or the name of a relation property as the weight of each
+        relation, the relation without the property counts as 1.
+        The matrix doesn't change if the property of a relation is changed in place later.
+        :return: (matrix, node_ids). matrix is a square scipy.sparse.csr_matrix of float64, the relations of the same
+        pair of nodes are summed into one entry. node_ids is the sorted int64 numpy array of the node id on each
+        index, the index of a node id is given by get_adjacency().indexes_of() or node_ids.searchsorted().
+        The matrix is shared by the later calls with the same arguments, it should be read only.
+        """
+        adjacency = self.get_adjacency()
+        relation_type_codes = self.relation_type_table.get_codes(relation_types)
+        key = (None if relation_type_codes is None else tuple(sorted(set(relation_type_codes))), bool(directed), weight)
+        if self.cached_sparse_adjacency is None or self.cached_sparse_adjacency_key != key:
+            weights = None if weight is None else self.__relation_weights(adjacency, weight)
+            self.cached_sparse_adjacency = adjacency.to_csr_matrix(relation_type_codes, directed, weights)
+            self.cached_sparse_adjacency_key = key
+        return self.cached_sparse_adjacency, adjacency.node_ids
+
+    def __relation_weights(self, adjacency, weight):
+        """
+        :return: a float64 numpy array of the value of the relation property of each relation in the order of
+        adjacency.out_neighbors, 1 for the relation without the property
+        """
+        weights = np.ones(adjacency.relation_num())
+        weighted_relations = [(start_id, code, end_id, properties[weight])
+                              for start_id, code, end_id, properties in self.storage.relations_with_properties()
+                              if weight in properties]
+        if not weighted_relations:
+            return weights
+        start_ids, codes, end_ids, values = zip(*weighted_relations)
+        start_indexes = adjacency.indexes_of(np.array(start_ids, dtype=np.int64))
+        end_indexes = adjacency.indexes_of(np.array(end_ids, dtype=np.int64))
+        codes = np.array(codes, dtype=np.int64)
+
+        # each row of adjacency.out_* is sorted by (type, neighbor), so the relations are sorted by the packed key of
+        # (start, type, neighbor), and the position of a relation is found by a binary search on the keys
+        node_num = adjacency.node_num()
+        type_num = max(int(adjacency.out_types.max()), int(codes.max())) + 1
+        if node_num * type_num * node_num < 2 ** 63:
+            start_of_positions = np.repeat(np.arange(node_num, dtype=np.int64), np.diff(adjacency.out_indptr))
+            keys = (start_of_positions * type_num + adjacency.out_types) * node_num + adjacency.out_neighbors
+            positions = keys.searchsorted((start_indexes * type_num + codes) * node_num + end_indexes)
+        else:
+            positions = np.array([self.__relation_position(adjacency, start_index, code, end_index)
+                                  for start_index, code, end_index in
+                                  zip(start_indexes.tolist(), codes.tolist(), end_indexes.tolist())], dtype=np.int64)
+        weights[positions] = values
+        return weights
+
+    @staticmethod
+    def __relation_position(adjacency, start_index, code, end_index):
+        """
+        :return: the position of the relation in adjacency.out_*, found by a binary search in the row of the start node
+        """
+        row_start, row_end = adjacency.out_indptr[start_index], adjacency.out_indptr[start_index + 1]
+        row_types = adjacency.out_types[row_start:row_end]
+        type_start = row_start + int(row_types.searchsorted(code, "left"))
+        type_end = row_start + int(row_types.searchsorted(code, "right"))
+        return type_start + int(adjacency.out_neighbors[type_start:type_end].searchsorted(end_index))
+
+    def __new_traversal(self, relation_types, direction, max_depth):
+        return GraphTraversal(self.get_adjacency(), self.relation_type_table.get_codes(relation_types), direction,
+                              max_depth)
+
+    def expand(self, seed_ids, hops=1, relation_types=None, direction=GraphAdjacency.DIRECTION_OUT, label_filter=None,
+               limit_per_hop=None, as_subgraph=False):
+        """
+        get the k-hop neighbourhood of some nodes. Each hop gathers the neighbors of the whole frontier from the
+        cached adjacency at once, see get_adjacency().
+        >>>
+            node_ids, node_hops, (start_ids, relation_types, end_ids) = graph_data.expand(
+                [1, 2], hops=2, relation_types=["call"], direction="both", label_filter="method", limit_per_hop=100)
+        >>>
+        :param seed_ids: a iterable of node ids, the ids not in the graph are ignored
+        :param hops: the max number of relations from the seeds
+        :param relation_types: None to follow all relations, or a relation type or a list of relation types to follow
+        :param direction: "out" to follow the relations from start to end, "in" from end to start, "both" for both.
+        :param label_filter: None for all nodes, or a label or a list of labels, only the nodes with one of the
+        labels are reached. The seeds are always kept.
+        :param limit_per_hop: None for no limit, or the max number of new nodes on each hop. The new nodes reached by
+        more relations from the frontier are kept first, the tie is broken by the node id.
+        :param as_subgraph: True to return the sub graph of the neighbourhood, see subgraph()
+        :return: (node_ids, node_hops, (start_ids, relation_types, end_ids)). node_ids is a int64 numpy array of the
+        seeds and the reached nodes, ordered by the hop, and node_hops is the hop of each node.
+        The followed relations between these nodes are given in three aligned numpy arrays, each relation only once.
+        A GraphData if as_subgraph is True, it has all relations between the nodes.
+        """
+        adjacency = self.get_adjacency()
+        relation_type_codes = self.relation_type_table.get_codes(relation_types)
+        seeds = adjacency.indexes_of(seed_ids)
+        frontier = np.unique(seeds[seeds >= 0])
+        # only the reached nodes are touched, so a small neighbourhood doesn't cost O(N),
+        # a bool array on all nodes is used instead of the sorted array once many nodes are reached
+        hop_frontiers = [frontier]
+        visited = frontier
+        is_visited = None
+        label_id_arrays = None
+        if label_filter is not None:
+            label_id_arrays = [self.label_to_ids_map[label].to_array()
+                               for label in ([label_filter] if isinstance(label_filter, str) else label_filter)
+                               if label in self.label_to_ids_map]
+
+        directions = [direction]
+        if direction == GraphAdjacency.DIRECTION_BOTH:
+            directions = [GraphAdjacency.DIRECTION_OUT, GraphAdjacency.DIRECTION_IN]
+        relation_chunks = []
+        for hop in range(1, hops + 1):
+            if not len(frontier):
+                break
+            neighbor_chunks = []
+            for t_direction in directions:
+                neighbors, sources, codes = adjacency.gather_relations(frontier, t_direction, relation_type_codes)
+                if label_id_arrays is not None:
+                    is_kept = self.__has_any_label(adjacency.node_ids[neighbors], label_id_arrays)
+                    neighbors, sources, codes = neighbors[is_kept], sources[is_kept], codes[is_kept]
+                if t_direction == GraphAdjacency.DIRECTION_OUT:
+                    relation_chunks.append((frontier[sources], codes, neighbors))
+                else:
+                    relation_chunks.append((neighbors, codes, frontier[sources]))
+                neighbor_chunks.append(neighbors)
+            neighbors = np.concatenate(neighbor_chunks)
+            if is_visited is None and len(visited) + len(neighbors) > adjacency.node_num() >> 6:
+                is_visited = np.zeros(adjacency.node_num(), dtype=bool)
+                is_visited[visited] = True
+            is_new = ~is_visited[neighbors] if is_visited is not None else ~self.__is_in_sorted(neighbors, visited)
+            new_nodes, relation_nums = np.unique(neighbors[is_new], return_counts=True)
+            if limit_per_hop is not None and len(new_nodes) > limit_per_hop:
+                new_nodes = np.sort(new_nodes[np.lexsort((new_nodes, -relation_nums))[:limit_per_hop]])
+            hop_frontiers.append(new_nodes)
+            if is_visited is not None:
+                is_visited[new_nodes] = True
+            else:
+                visited = np.union1d(visited, new_nodes)
+            frontier = new_nodes
+
+        reached = np.concatenate(hop_frontiers)
+        node_ids = adjacency.node_ids[reached]
+        if as_subgraph:
+            return self.subgraph(node_ids.tolist())
+        node_hops = np.repeat(np.arange(len(hop_frontiers)), [len(indexes) for indexes in hop_frontiers])
+
+        if relation_chunks:
+            start_indexes, codes, end_indexes = (np.concatenate(arrays) for arrays in zip(*relation_chunks))
+        else:
+            start_indexes, codes, end_indexes = np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64)
+        # the relations to the nodes dropped by the limit or the hops are not kept
+        if limit_per_hop is not None or len(directions) > 1:
+            if is_visited is None:
+                is_kept = self.__is_in_sorted(start_indexes, visited) & self.__is_in_sorted(end_indexes, visited)
+            else:
+                is_kept = is_visited[start_indexes] & is_visited[end_indexes]
+            start_indexes, codes, end_indexes = start_indexes[is_kept], codes[is_kept], end_indexes[is_kept]
+        is_kept = np.ones(len(codes), dtype=bool)
+        if len(directions) > 1:
+            # a relation between two reached nodes may be followed from both of them
+            is_kept = first_occurrence_mask(start_indexes, codes, end_indexes)
+        relation_types = np.array(self.relation_type_table.types, dtype=object)[codes[is_kept]]
+        return node_ids, node_hops, (adjacency.node_ids[start_indexes[is_kept]], relation_types,
+                                     adjacency.node_ids[end_indexes[is_kept]])
+
+    @staticmethod
+    def __is_in_sorted(values, sorted_values):
+        """
+        :return: a bool numpy array, True for each value in the sorted numpy array
+        """
+        if not len(sorted_values):
+            return np.zeros(len(values), dtype=bool)
+        positions = np.minimum(sorted_values.searchsorted(values), len(sorted_values) - 1)
+        return sorted_values[positions] == values
+
+    def __has_any_label(self, node_ids, label_id_arrays):
+        has_label = np.zeros(len(node_ids), dtype=bool)
+        for label_ids in label_id_arrays:
+            if label_ids.dtype == object:
+                label_ids = set(label_ids.tolist())
+                has_label |= np.array([node_id in label_ids for node_id in node_ids.tolist()], dtype=bool)
+            else:
+                has_label |= self.__is_in_sorted(node_ids, label_ids)
+        return has_label
+
+    def bfs_distances(self, source_ids, relation_types=None, direction=GraphAdjacency.DIRECTION_OUT, max_depth=None):
+        """
+        the breadth first search from many sources at once, on the cached adjacency of the graph.
+        >>>
+            node_ids, distances = graph_data.bfs_distances([1, 2], relation_types=["extends"], direction="both",
+                                                           max_depth=3)
+        >>>
+        :param source_ids: a iterable of node ids, the ids not in the graph are ignored
+        :param relation_types: None to follow all relations, or a relation type or a list of relation types to follow
+        :param direction: "out" to follow the relations from start to end, "in" from end to start, "both" for both.
+        :param max_depth: None for no limit, or the max number of relations from the sources
+        :return: (node_ids, distances), two int64 numpy arrays of the reached nodes (including the sources) and their
+        distances from the nearest source, sorted by the distance
+        """
+        traversal = self.__new_traversal(relation_types, direction, max_depth)
+        adjacency = traversal.adjacency
+        distances = traversal.distances(adjacency.indexes_of(source_ids))
+        reached = np.flatnonzero(distances >= 0)
+        reached = reached[np.argsort(distances[reached], kind="stable")]
+        return adjacency.node_ids[reached], distances[reached]
+
+    def shortest_path_lengths(self, source_ids, target_ids, relation_types=None,
+                              direction=GraphAdjacency.DIRECTION_OUT, max_depth=None):
+        """
+        the length of the shortest path from each source to each target. The sources are searched in batches of 64,
+        each batch is one breadth first search, so it is much faster than finding the paths pair by pair.
+        :param source_ids: a list of node ids
+        :param target_ids: a list of node ids
+        :param relation_types: None to follow all relations, or a relation type or a list of relation types to follow
+        :param direction: "out", "in" or "both", see bfs_distances()
+        :param max_depth: None for no limit, or the max length of a path
+        :return: a int64 numpy array in the shape of (len(source_ids), len(target_ids)), -1 for no path
+        """
+        traversal = self.__new_traversal(relation_types, direction, max_depth)
+        adjacency = traversal.adjacency
+        return traversal.distance_matrix(adjacency.indexes_of(source_ids), adjacency.indexes_of(target_ids))
+
+    def __path_indexes_of(self, traversal, startId, endId):
+        source_index = traversal.adjacency.index_of(startId)
+        if source_index < 0:
+            raise NodeNotFound("Source %s is not in G" % (startId,))
+        target_index = traversal.adjacency.index_of(endId)
+        if target_index < 0:
+            raise NodeNotFound("Target %s is not in G" % (endId,))
+        return source_index, target_index
+
+    def find_all_shortest_paths(self, startId, endId, relation_types=None, direction=GraphAdjacency.DIRECTION_OUT,
+                                max_depth=None):
         """
         找到所有的最短路
         :param startId:
         :param endId:
-        :return:
+        :param relation_types: None to follow all relations, or a relation type or a list of relation types to follow
+        :param direction: "out", "in" or "both", see bfs_distances()
+        :param max_depth: None for no limit, or the max length of a path
+        :return: a list of paths, each path is a list of node ids. networkx.NetworkXNoPath is raised if there is no
+        path, networkx.NodeNotFound is raised if a node is not in the graph.
         """
-        shortest_paths = all_shortest_paths(self.graph, startId, endId)
-        return shortest_paths
-
-    def find_shortest_path(self, startId, endId):
+        traversal = self.__new_traversal(relation_types, direction, max_depth)
+        source_index, target_index = self.__path_indexes_of(traversal, startId, endId)
+        paths = traversal.all_shortest_paths(source_index, target_index)
+        if not paths:
+            raise NetworkXNoPath("Target %s cannot be reached from given sources" % (endId,))
+        node_ids = traversal.adjacency.node_ids
+        return [node_ids[path].tolist() for path in paths]
+
+    def find_shortest_path(self, startId, endId, relation_types=None, direction=GraphAdjacency.DIRECTION_OUT,
+                           max_depth=None):
         """
         找到一个最短路
         :param startId:
         :param endId:
-        :return:
+        :param relation_types: None to follow all relations, or a relation type or a list of relation types to follow
+        :param direction: "out", "in" or "both", see bfs_distances()
+        :param max_depth: None for no limit, or the max length of a path
+        :return: a list of node ids. networkx.NetworkXNoPath is raised if there is no path, networkx.NodeNotFound is
+        raised if a node is not in the graph.
         """
-        shortest_paths = shortest_path(self.graph, startId, endId)
-        return shortest_paths
+        traversal = self.__new_traversal(relation_types, direction, max_depth)
+        source_index, target_index = self.__path_indexes_of(traversal, startId, endId)
+        path = traversal.shortest_path(source_index, target_index)
+        if path is None:
+            raise NetworkXNoPath("No path between %s and %s." % (startId, endId))
+        return traversal.adjacency.node_ids[path].tolist()
 
     def set_nodes(self, nodes):
+        self.__check_writable()
         for n in nodes:
             self.add_node(node_id=n[self.DEFAULT_KEY_NODE_ID],
                           node_properties=n[self.DEFAULT_KEY_NODE_PROPERTIES],
                           node_labels=n[self.DEFAULT_KEY_NODE_LABELS])
 
+    def add_nodes_bulk(self, nodes, id_policy=ID_POLICY_KEEP):
+        """
+        add many node jsons to the graph in one pass. The labels and the property indexes are updated once after
+        all nodes are inserted, which is much faster than calling add_node() for each node.
+        The nodes could be a generator, they are consumed one by one.
+        :param nodes: a iterable of node json, e.g., {"id": 1, "properties": {"name": "bob"}, "labels": ["entity"]}.
+        "id" and "labels" could be missing.
+        :param id_policy: GraphData.ID_POLICY_KEEP, keep the id in the node json, GraphData.ID_POLICY_NEW,
+        always give a new id. If a kept id already exists, the node will be updated like add_node().
+        :return: a numpy array of the ids of the added nodes, in the same order of the input.
+        """
+        self.__check_writable()
+        if id_policy not in (self.ID_POLICY_KEEP, self.ID_POLICY_NEW):
+            raise ValueError("unknown id_policy %r" % id_policy)
+
+        node_ids = []
+        label_to_new_ids_map = {}
+        # only keep the references of the properties dict, for building the indexes at last
+        node_properties_list = [] if self.index_collection.has_index() else None
+        # the op code of each node for the journal, a kept id may be a exist node or repeated in the nodes
+        journal_ops = [] if self.is_journal_enabled() else None
+        new_node_ids = set()
+
+        def node_id_json_pairs():
+            for node in nodes:
+                node_id = self.UNASSIGNED_NODE_ID
+                if id_policy == self.ID_POLICY_KEEP:
+                    node_id = node.get(self.DEFAULT_KEY_NODE_ID, self.UNASSIGNED_NODE_ID)
+                if node_id == self.UNASSIGNED_NODE_ID:
+                    node_id = self.max_node_id + 1
+                if journal_ops is not None:
+                    # a id larger than all ids before is new, only the others are looked up
+                    if node_id <= self.max_node_id and (node_id in new_node_ids or self.storage.has_node(node_id)):
+                        journal_ops.append(GraphJournal.OP_UPDATE_NODE)
+                    else:
+                        new_node_ids.add(node_id)
+                        journal_ops.append(GraphJournal.OP_ADD_NODE)
+                if self.max_node_id < node_id:
+                    self.max_node_id = node_id
+
+                node_labels = self.label_pool.intern(node.get(self.DEFAULT_KEY_NODE_LABELS, []))
+                for label in node_labels:
+                    if label:
+                        label_to_new_ids_map.setdefault(label, []).append(node_id)
+                node_properties = self.__store_node_properties(node_id, node.get(self.DEFAULT_KEY_NODE_PROPERTIES, {}))
+                node_ids.append(node_id)
+                if node_properties_list is not None:
+                    node_properties_list.append(node_properties)
+                yield node_id, {
+                    self.DEFAULT_KEY_NODE_ID: node_id,
+                    self.DEFAULT_KEY_NODE_PROPERTIES: node_properties,
+                    self.DEFAULT_KEY_NODE_LABELS: node_labels
+                }
+
+        self.storage.add_nodes(node_id_json_pairs())
+        self.__on_structure_changed()
+
+        for label, label_node_ids in label_to_new_ids_map.items():
+            self.add_labels(label)
+            self.label_to_ids_map[label].update(label_node_ids)
+        if node_properties_list is not None:
+            self.index_collection.add_nodes(zip(node_ids, node_properties_list))
+        if journal_ops is not None:
+            self.__record_node_changes(node_ids, journal_ops)
+        return np.array(node_ids)
+
+    def __record_node_changes(self, node_ids, ops):
+        # the changes are recorded in runs of the same op code, so the order is kept
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        ops = np.asarray(ops, dtype=np.int8)
+        run_starts = np.flatnonzero(np.diff(ops, prepend=-1))
+        for run_start, run_end in zip(run_starts.tolist(), run_starts[1:].tolist() + [len(ops)]):
+            self.__record_changes(int(ops[run_start]), node_ids[run_start:run_end])
+
     def add_labels(self, *labels):
         """
         add a list of label to the graph
         :param labels:
         :return:
         """
+        self.__check_writable()
 
         for label in labels:
             if not label:
                 return
             if label not in self.label_to_ids_map.keys():
-                self.label_to_ids_map[label] = set([])
+                self.label_to_ids_map[label] = NodeIdSet()
 
     def add_label_by_node_id(self, node_id, label):
         """
@@ -305,20 +1530,76 @@ class GraphData(SaveLoad):
         :param label: the label that need to added
         :return: True, add successful.False, add fail.
         """
+        self.__check_writable()
         if not label:
             return False
         node_json = self.get_node_info_dict(node_id)
         if not node_json:
             return False
-        node_json[GraphData.DEFAULT_KEY_NODE_LABELS].add(label)
+        node_json[GraphData.DEFAULT_KEY_NODE_LABELS] = self.label_pool.add(node_json[GraphData.DEFAULT_KEY_NODE_LABELS],
+                                                                           label)
+        self.add_labels(label)
         self.label_to_ids_map[label].add(node_id)
+        self.__record_change(GraphJournal.OP_UPDATE_NODE, node_id)
         return True
 
     def get_node_ids_by_label(self, label):
+        """
+        get the ids of the nodes with the label.
+        :param label: the label
+        :return: a NodeIdSet, it works like a set, and it changes with the graph. A empty NodeIdSet for the label
+        not exist, it doesn't change with the graph.
+        """
         if label not in self.label_to_ids_map.keys():
-            return set([])
+            return NodeIdSet()
         return self.label_to_ids_map[label]
 
+    def get_node_id_array_by_label(self, label):
+        """
+        get the ids of the nodes with the label as a sorted read-only numpy array, for vectorized operations.
+        :param label: the label
+        :return: a int64 numpy array, or a object numpy array if some node ids are not int.
+        """
+        if label not in self.label_to_ids_map.keys():
+            return np.empty(0, dtype=np.int64)
+        return self.label_to_ids_map[label].to_array()
+
+    def find_node_ids_by_labels(self, *labels):
+        """
+        find the ids of the nodes with all the given labels. The sorted id arrays of the labels are intersected,
+        starting from the smallest one.
+        :param labels: one or more labels
+        :return: a sorted int64 numpy array, or a object numpy array if some node ids are not int.
+        """
+        if not labels:
+            return np.empty(0, dtype=np.int64)
+        arrays = sorted((self.get_node_id_array_by_label(label) for label in labels), key=len)
+        if any(array.dtype == object for array in arrays):
+            node_ids = set(arrays[0].tolist())
+            for array in arrays[1:]:
+                node_ids.intersection_update(array.tolist())
+            return np.array(list(node_ids), dtype=object)
+        result = arrays[0]
+        for array in arrays[1:]:
+            result = NodeIdSet.intersect_sorted_arrays(result, array)
+        return result
+
+    def get_label_view(self, label):
+        """
+        get a read-only live view of the ids of the nodes with the label.
+        :return: a LabelView
+        """
+        return LabelView(self, label)
+
+    def iter_node_ids_by_label(self, label):
+        """
+        iterate the ids of the nodes with the label lazily, the labels must not be changed during the iteration.
+        """
+        return iter(self.label_to_ids_map.get(label, ()))
+
+    def get_node_num_by_label(self, label):
+        return len(self.label_to_ids_map.get(label, ()))
+
     def add_label_by_label(self, label, new_label):
         """
         add a label to node in graph, the node must has the specific label
@@ -326,6 +1607,7 @@ class GraphData(SaveLoad):
         :param label: the node must has the label
         :return:
         """
+        self.__check_writable()
 
         for node_id in self.get_node_ids_by_label(label):
             self.add_label_by_node_id(node_id, new_label)
@@ -336,10 +1618,11 @@ class GraphData(SaveLoad):
         :param label:
         :return:
         """
+        self.__check_writable()
         if not label:
             return
         self.add_labels(label)
-        for node_id in self.get_node_ids():
+        for node_id in self.iter_node_ids():
             self.add_label_by_node_id(node_id, label)
 
     def add_node(self, node_labels, node_properties, node_id=UNASSIGNED_NODE_ID, primary_property_name=""):
@@ -353,6 +1636,7 @@ class GraphData(SaveLoad):
         with unique property value ( property value is got by primary_property_name ) will be added to the GraphData.
                 :return:-1, means that adding node json fail. otherwise, return the id of the newly added node
         """
+        self.__check_writable()
         if primary_property_name:
             if primary_property_name not in node_properties:
                 print("node json must have a primary_property_name ( %r ) in properties " % primary_property_name)
@@ -370,11 +1654,14 @@ class GraphData(SaveLoad):
 
         new_node_json = {
             self.DEFAULT_KEY_NODE_ID: node_id,
-            self.DEFAULT_KEY_NODE_PROPERTIES: node_properties,
-            self.DEFAULT_KEY_NODE_LABELS: set(node_labels)
+            self.DEFAULT_KEY_NODE_PROPERTIES: self.__store_node_properties(node_id, node_properties),
+            self.DEFAULT_KEY_NODE_LABELS: self.label_pool.intern(node_labels)
         }
 
-        self.graph.add_node(node_id, **new_node_json)
+        is_new_node = not self.storage.has_node(node_id)
+        self.storage.add_node(node_id, new_node_json)
+        self.__on_structure_changed()
+        self.__record_change(GraphJournal.OP_ADD_NODE if is_new_node else GraphJournal.OP_UPDATE_NODE, node_id)
 
         if self.max_node_id < node_id:
             self.max_node_id = node_id
@@ -387,7 +1674,8 @@ class GraphData(SaveLoad):
         return node_id
 
     def update_node_property_by_node_id(self, node_id, node_properties):
-        if not node_id in list(self.get_node_ids()):
+        self.__check_writable()
+        if node_id not in self.get_node_id_view():
             return self.UNASSIGNED_NODE_ID
 
         node_json = self.get_node_info_dict(node_id)
@@ -401,13 +1689,15 @@ class GraphData(SaveLoad):
             self.DEFAULT_KEY_NODE_PROPERTIES: update_node_properties,
             self.DEFAULT_KEY_NODE_LABELS: update_node_labels
         }
-        self.graph.add_node(update_node_id, **update_node_json)
+        self.storage.add_node(update_node_id, update_node_json)
+        self.__record_change(GraphJournal.OP_UPDATE_NODE, update_node_id)
         self.index_collection.add_node(node_id=update_node_id,
                                        node_properties=update_node_properties)
         return update_node_id
 
     def update_node_by_node_id(self, node_id, node_labels, node_properties):
-        if not node_id in list(self.get_node_ids()):
+        self.__check_writable()
+        if node_id not in self.get_node_id_view():
             return self.UNASSIGNED_NODE_ID
 
         node_json = self.get_node_info_dict(node_id)
@@ -416,14 +1706,14 @@ class GraphData(SaveLoad):
         update_node_labels = node_json[self.DEFAULT_KEY_NODE_LABELS]
         for k, v in node_properties.items():
             update_node_properties[k] = v
-        for label in node_labels:
-            update_node_labels.add(label)
+        update_node_labels = self.label_pool.add(update_node_labels, *node_labels)
         update_node_json = {
             self.DEFAULT_KEY_NODE_ID: update_node_id,
             self.DEFAULT_KEY_NODE_PROPERTIES: update_node_properties,
             self.DEFAULT_KEY_NODE_LABELS: update_node_labels
         }
-        self.graph.add_node(update_node_id, **update_node_json)
+        self.storage.add_node(update_node_id, update_node_json)
+        self.__record_change(GraphJournal.OP_UPDATE_NODE, update_node_id)
         self.add_labels(*update_node_labels)
         for label in update_node_labels:
             self.label_to_ids_map[label].add(node_id)
@@ -433,7 +1723,8 @@ class GraphData(SaveLoad):
 
 
     def update_node_property_value_by_node_id(self, node_id, node_property_name, node_proprty_value):
-        if not node_id in list(self.get_node_ids()):
+        self.__check_writable()
+        if node_id not in self.get_node_id_view():
             return self.UNASSIGNED_NODE_ID
         if node_property_name == "":
             return node_id
@@ -442,28 +1733,79 @@ class GraphData(SaveLoad):
 
 
     def remove_node(self, node_id):
-        if node_id not in self.graph.nodes:
+        self.__check_writable()
+        result = self.storage.remove_node(node_id)
+        if result is None:
             return None
-        # print(type(self.graph.nodes))
-        node_json = self.graph.nodes[node_id]
-        in_relations = set(self.graph.in_edges(node_id, keys=True))
-        out_relations = set(self.graph.out_edges(node_id, keys=True))
-        self.graph.remove_node(node_id)
-
-        for label in node_json[self.DEFAULT_KEY_NODE_LABELS]:
-            self.label_to_ids_map[label].remove(node_id)
+        node_json, out_relations, in_relations = result
+        self.__forget_removed_nodes([(node_id, node_json)])
+        self.__remove_relation_counts(out_relations | in_relations)
+        self.__record_removed_relations(out_relations | in_relations)
+        self.__record_change(GraphJournal.OP_REMOVE_NODE, node_id)
+        return node_json, self.__decode_removed_relations(out_relations), self.__decode_removed_relations(in_relations)
+
+    def remove_nodes(self, node_ids):
+        """
+        remove many nodes and all relations on them. The labels, the indexes and the relation count are updated once
+        for all nodes, it is much faster than calling remove_node() for each node.
+        :param node_ids: a iterable of node ids, the ids not exist are ignored
+        :return: (a list of the removed node jsons, a set of the removed relations in (startId, endId, relationType))
+        """
+        self.__check_writable()
+        removed_nodes, removed_relations = self.storage.remove_nodes(node_ids)
+        self.__forget_removed_nodes(removed_nodes)
+        self.__remove_relation_counts(removed_relations)
+        self.__record_removed_relations(removed_relations)
+        self.__record_changes(GraphJournal.OP_REMOVE_NODE, [node_id for node_id, node_json in removed_nodes])
+        return [node_json for node_id, node_json in removed_nodes], self.__decode_removed_relations(removed_relations)
+
+    def remove_nodes_by_label(self, label):
+        """
+        remove all nodes with the label, and all relations on them. see remove_nodes().
+        :param label: the label
+        :return: (a list of the removed node jsons, a set of the removed relations in (startId, endId, relationType))
+        """
+        self.__check_writable()
+        return self.remove_nodes(list(self.get_node_ids_by_label(label)))
 
-        self.index_collection.remove_node(node_id)
+    def __forget_removed_nodes(self, removed_nodes):
+        """
+        update the property store, the labels and the indexes for the nodes removed from the storage.
+        :param removed_nodes: a list of (node_id, node_json)
+        """
+        self.__on_structure_changed()
+        label_to_removed_ids_map = {}
+        for node_id, node_json in removed_nodes:
+            node_properties = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
+            if isinstance(node_properties, NodeProperties) and node_properties.store is self.property_store:
+                node_json[self.DEFAULT_KEY_NODE_PROPERTIES] = dict(node_properties)
+                self.property_store.remove_row(node_properties.row)
+            for label in node_json[self.DEFAULT_KEY_NODE_LABELS]:
+                label_to_removed_ids_map.setdefault(label, []).append(node_id)
+            self.index_collection.remove_node(node_id)
+        for label, removed_ids in label_to_removed_ids_map.items():
+            self.label_to_ids_map[label].difference_update(removed_ids)
+
+    def __remove_relation_counts(self, relations):
+        """
+        :param relations: a iterable of relations in (startId, relation type code, endId)
+        """
+        self.__on_structure_changed()
+        relation_type_to_num_map = self.get_relation_type_to_num_map()
+        for code, num in Counter(code for start_id, code, end_id in relations).items():
+            relation_type = self.relation_type_table.get_type(code)
+            relation_type_to_num_map[relation_type] = max(0, relation_type_to_num_map.get(relation_type, 0) - num)
 
-        return node_json, out_relations, in_relations
+    def __decode_removed_relations(self, relations):
+        # keep the (startId, endId, relationType) format of the removed relations
+        relation_types = self.relation_type_table.types
+        return {(r[0], r[2], relation_types[r[1]]) for r in relations}
 
     def remove_all_nodes(self):
-        ids = self.get_node_ids()
-        for id in ids:
-            self.remove_node(id)
+        self.__check_writable()
+        self.remove_nodes(list(self.get_node_ids()))
         return True
 
-
     def merge_node(self, node_labels, node_properties, primary_property_name):
         """
         merge a node json to the graph, that is if we can't not find the node with primary_property_value match the given node.
@@ -475,6 +1817,7 @@ class GraphData(SaveLoad):
         :param primary_property_name: The name of the property to check, the merged node and the new node are the same on this property.
         :return:-1, means that adding node json fail. otherwise, return the id of the newly added(merged) node.If it already exists, the id of this merged node will not change.
         """
+        self.__check_writable()
 
         if not primary_property_name:
             print("primary_property_name must given on merge")
@@ -515,6 +1858,7 @@ class GraphData(SaveLoad):
         with unique property value ( property value is got by primary_property_name ) will be added to the GraphData.
                 :return:-1, means that adding node json fail. otherwise, return the id of the newly added node
         """
+        self.__check_writable()
 
         if primary_property_names is None:
             primary_property_names = []
@@ -536,11 +1880,14 @@ class GraphData(SaveLoad):
 
         new_node_json = {
             self.DEFAULT_KEY_NODE_ID: node_id,
-            self.DEFAULT_KEY_NODE_PROPERTIES: node_properties,
-            self.DEFAULT_KEY_NODE_LABELS: set(node_labels)
+            self.DEFAULT_KEY_NODE_PROPERTIES: self.__store_node_properties(node_id, node_properties),
+            self.DEFAULT_KEY_NODE_LABELS: self.label_pool.intern(node_labels)
         }
 
-        self.graph.add_node(node_id, **new_node_json)
+        is_new_node = not self.storage.has_node(node_id)
+        self.storage.add_node(node_id, new_node_json)
+        self.__on_structure_changed()
+        self.__record_change(GraphJournal.OP_ADD_NODE if is_new_node else GraphJournal.OP_UPDATE_NODE, node_id)
         if self.max_node_id < node_id:
             self.max_node_id = node_id
 
@@ -563,6 +1910,7 @@ class GraphData(SaveLoad):
         :param primary_property_names: The list of name of the property to check, the merged node and the new node are the same on this property.
         :return:-1, means that adding node json fail. otherwise, return the id of the newly added(merged) node.If it already exists, the id of this merged node will not change.
         """
+        self.__check_writable()
 
         if not primary_property_names:
             print("primary_property_names must given on merge")
@@ -591,18 +1939,384 @@ class GraphData(SaveLoad):
 
         return self.add_node(node_labels=merge_labels, node_properties=merge_properties, node_id=merge_node_id)
 
+    def merge_nodes_bulk(self, nodes, primary_property_names, id_policy=ID_POLICY_NEW):
+        """
+        merge many node jsons to the graph in one pass, the result is the same as calling merge_node() (or
+        merge_node_with_multi_primary_property()) for each node in order. Instead of looking up every node, it joins
+        all nodes with a hash table on the primary property values. If only one primary property is given and it is
+        indexed, the index is used as the hash table, otherwise the hash table is built by one scan of the graph.
+        The new nodes are added with add_nodes_bulk() at last. If several exist nodes share the same primary property
+        values, any one of them could be merged into, the same as merge_node().
+        :param nodes: a iterable of node json, e.g., {"properties": {"name": "bob"}, "labels": ["entity"]}.
+        :param primary_property_names: a property name or a list of property names, the merged node and the new node
+        are the same on these properties.
+        :param id_policy: the id policy of the new nodes, see add_nodes_bulk(). With GraphData.ID_POLICY_KEEP, the
+        new node keeps the id in the first node json of its primary property values.
+        :return: (node_ids, inserted_num, merged_num). node_ids is a numpy array of the ids of the added(merged) nodes,
+        in the same order of the input, -1 for the node missing primary properties.
+        """
+        self.__check_writable()
+        if isinstance(primary_property_names, str):
+            primary_property_names = [primary_property_names]
+        primary_property_names = list(primary_property_names)
+        if not primary_property_names:
+            print("primary_property_names must given on merge")
+            return np.array([], dtype=np.int64), 0, 0
+
+        # the existing nodes are found by the composite index, or the single property index, or a key map built here
+        composite_indexer = self.index_collection.get_composite_index(primary_property_names)
+        primary_key = (composite_indexer or CompositePropertyIndexer(primary_property_names)).make_key
+        if composite_indexer is not None:
+            find_exist_ids = composite_indexer.find_node_ids_by_key
+        elif len(primary_property_names) == 1 and self.index_collection.is_property_indexed(primary_property_names[0]):
+            indexer = self.index_collection.property_to_indexer_map[primary_property_names[0]]
+
+            def find_exist_ids(key):
+                return indexer.find_node_ids_by_value(key[0])
+        else:
+            key_to_exist_id_map = {}
+            for node_id, node_json in self.storage.nodes():
+                key = primary_key(node_json[self.DEFAULT_KEY_NODE_PROPERTIES])
+                if key is not None and key not in key_to_exist_id_map:
+                    key_to_exist_id_map[key] = (node_id,)
+            find_exist_ids = key_to_exist_id_map.get
+
+        # the result of each input node, a node id (>= 0) for merged node, or -2 - i for the i-th new node
+        results = []
+        new_node_jsons = []
+        key_to_new_node_index_map = {}
+        merged_node_ids = set()
+        missing_num = 0
+        merged_num = 0
+        for node in nodes:
+            node_properties = node.get(self.DEFAULT_KEY_NODE_PROPERTIES, {})
+            node_labels = node.get(self.DEFAULT_KEY_NODE_LABELS, [])
+            key = primary_key(node_properties)
+            if key is None:
+                missing_num += 1
+                results.append(self.UNASSIGNED_NODE_ID)
+                continue
+
+            if key in key_to_new_node_index_map:
+                new_node_json = new_node_jsons[key_to_new_node_index_map[key]]
+                new_node_json[self.DEFAULT_KEY_NODE_PROPERTIES].update(node_properties)
+                new_node_json[self.DEFAULT_KEY_NODE_LABELS].update(node_labels)
+                results.append(-2 - key_to_new_node_index_map[key])
+                merged_num += 1
+                continue
+
+            exist_ids = find_exist_ids(key)
+            merge_node_id = next(iter(exist_ids)) if exist_ids else None
+
+            if merge_node_id is None:
+                key_to_new_node_index_map[key] = len(new_node_jsons)
+                results.append(-2 - len(new_node_jsons))
+                new_node_jsons.append({
+                    self.DEFAULT_KEY_NODE_ID: node.get(self.DEFAULT_KEY_NODE_ID, self.UNASSIGNED_NODE_ID),
+                    # copied, the later node jsons with the same key are merged into them
+                    self.DEFAULT_KEY_NODE_PROPERTIES: dict(node_properties),
+                    self.DEFAULT_KEY_NODE_LABELS: set(node_labels)
+                })
+                continue
+
+            node_json = self.get_node_info_dict(merge_node_id)
+            node_json[self.DEFAULT_KEY_NODE_PROPERTIES].update(node_properties)
+            node_json[self.DEFAULT_KEY_NODE_LABELS] = self.label_pool.add(node_json[self.DEFAULT_KEY_NODE_LABELS],
+                                                                          *node_labels)
+            for label in node_labels:
+                self.add_labels(label)
+                if label:
+                    self.label_to_ids_map[label].add(merge_node_id)
+            merged_node_ids.add(merge_node_id)
+            self.__record_change(GraphJournal.OP_UPDATE_NODE, merge_node_id)
+            results.append(merge_node_id)
+            merged_num += 1
+
+        if missing_num:
+            print("%d node json miss the primary properties ( %r ), skip them" % (missing_num, primary_property_names))
+
+        for merge_node_id in merged_node_ids:
+            self.index_collection.add_node(node_id=merge_node_id,
+                                           node_properties=self.get_properties_for_node(merge_node_id))
+
+        new_node_ids = self.add_nodes_bulk(new_node_jsons, id_policy=id_policy)
+        node_ids = np.array(results, dtype=np.int64)
+        is_new = node_ids <= -2
+        node_ids[is_new] = new_node_ids[-2 - node_ids[is_new]]
+        return node_ids, len(new_node_jsons), merged_num
+
+    def merge_from(self, others, id_strategy=ID_STRATEGY_REMAP, primary_property_names=None):
+        """
+        merge the nodes and the relations of other graph datas into this one, e.g., the shards built in several
+        processes. The nodes of all other graph datas are added in one add_nodes_bulk() (or merge_nodes_bulk()), and
+        the relations are added in one add_relations_bulk() with the start/end ids changed into the new ids, so the
+        labels and the property indexes are updated once. The other graph datas are not changed, the properties dict
+        of each node and relation is copied, but the property values are shared.
+        >>>
+            id_maps = graph_data.merge_from([shard_1, shard_2], primary_property_names=["qualified_name"])
+            old_ids, new_ids = id_maps[0]  # the new id of each node in shard_1
+        >>>
+        :param others: a GraphData or a list of GraphData
+        :param id_strategy: GraphData.ID_STRATEGY_REMAP, the nodes are given new ids after the max node id, in the
+        order of the other graph datas. GraphData.ID_STRATEGY_OFFSET, the ids of each other graph data are shifted by
+        the same offset, so the new ids keep the order and the gaps of the old ones.
+        :param primary_property_names: None to add all nodes as new nodes, or a property name or a list of property
+        names, the nodes with the same values on them are merged into one node as merge_nodes_bulk(), including the
+        exist nodes of this graph data. The nodes missing some of them are added as new nodes.
+        :return: a list of (old_ids, new_ids) for each other graph data, two aligned int64 numpy arrays sorted by the
+        old id, the id of each node in the other graph data and its id in this graph data.
+        """
+        self.__check_writable()
+        if isinstance(others, GraphData):
+            others = [others]
+        others = list(others)
+        if id_strategy not in (self.ID_STRATEGY_REMAP, self.ID_STRATEGY_OFFSET):
+            raise ValueError("unknown id_strategy %r" % id_strategy)
+        if any(other is self for other in others):
+            raise ValueError("can't merge a graph data into itself")
+        if isinstance(primary_property_names, str):
+            primary_property_names = [primary_property_names]
+        id_policy = self.ID_POLICY_KEEP if id_strategy == self.ID_STRATEGY_OFFSET else self.ID_POLICY_NEW
+
+        # the node jsons of all other graph datas in order, the ids are shifted if the offset strategy is used
+        old_id_arrays = []
+        node_jsons = []
+        next_node_id = self.max_node_id + 1
+        for other in others:
+            node_num = other.storage.node_num()
+            old_ids = np.fromiter(other.storage.node_ids(), dtype=np.int64, count=node_num)
+            old_id_arrays.append(old_ids)
+            if not node_num:
+                continue
+            offset = next_node_id - int(old_ids.min())
+            next_node_id = int(old_ids.max()) + offset + 1
+            for node_id, (_, node_json) in zip(old_ids.tolist(), other.storage.nodes()):
+                node_jsons.append({
+                    self.DEFAULT_KEY_NODE_ID: node_id + offset,
+                    self.DEFAULT_KEY_NODE_PROPERTIES: dict(node_json[self.DEFAULT_KEY_NODE_PROPERTIES]),
+                    self.DEFAULT_KEY_NODE_LABELS: node_json[self.DEFAULT_KEY_NODE_LABELS]
+                })
+
+        if primary_property_names:
+            primary_key = CompositePropertyIndexer(primary_property_names).make_key
+            has_key = np.fromiter((primary_key(node_json[self.DEFAULT_KEY_NODE_PROPERTIES]) is not None
+                                   for node_json in node_jsons), dtype=bool, count=len(node_jsons))
+            new_ids = np.empty(len(node_jsons), dtype=np.int64)
+            keyed_indexes = np.flatnonzero(has_key)
+            new_ids[keyed_indexes] = self.merge_nodes_bulk([node_jsons[i] for i in keyed_indexes.tolist()],
+                                                           primary_property_names, id_policy=id_policy)[0]
+            unkeyed_indexes = np.flatnonzero(~has_key)
+            new_ids[unkeyed_indexes] = self.add_nodes_bulk([node_jsons[i] for i in unkeyed_indexes.tolist()],
+                                                           id_policy=id_policy)
+        else:
+            new_ids = self.add_nodes_bulk(node_jsons, id_policy=id_policy).astype(np.int64, copy=False)
+
+        id_maps = []
+        start_id_chunks, code_chunks, end_id_chunks = [], [], []
+        position = 0
+        for other, old_ids in zip(others, old_id_arrays):
+            order = np.argsort(old_ids)
+            old_ids = old_ids[order]
+            other_new_ids = new_ids[position:position + len(old_ids)][order]
+            position += len(old_ids)
+            id_maps.append((old_ids, other_new_ids))
+
+            # the codes of the other graph data are changed into the codes of this one by the type string
+            other_types = other.relation_type_table.types
+            to_codes = np.array([self.relation_type_table.add(t) for t in other_types],
+                                dtype=MultiDiGraphStorage.TYPE_DTYPE)
+            for start_id, code, end_id, properties in other.storage.relations_with_properties():
+                self.add_relation_with_property(int(other_new_ids[old_ids.searchsorted(start_id)]), other_types[code],
+                                                int(other_new_ids[old_ids.searchsorted(end_id)]), **properties)
+            start_ids, codes, end_ids = other.storage.relation_arrays()
+            start_id_chunks.append(other_new_ids[old_ids.searchsorted(start_ids)])
+            code_chunks.append(to_codes[codes])
+            end_id_chunks.append(other_new_ids[old_ids.searchsorted(end_ids)])
+
+        # the relations with properties are added above, and they are dropped here as exist relations
+        if start_id_chunks:
+            self.__add_relation_codes_bulk(np.concatenate(start_id_chunks), np.concatenate(code_chunks),
+                                           np.concatenate(end_id_chunks))
+        return id_maps
+
+    def create_composite_index(self, property_names):
+        """
+        create a composite index on the value tuple of several properties, e.g.,
+        create_composite_index(("group_id", "artifact_id", "version")). Unlike create_index_on_property(), the existing
+        nodes are indexed at once. A lookup on all these properties, e.g., find_one_node_by_properties() and
+        merge_node_with_multi_primary_property(), uses it to find the node in O(1).
+        :param property_names: a tuple of property names
+        :return:
+        """
+        indexer = self.index_collection.get_composite_index(property_names)
+        if indexer is not None:
+            return
+        indexer = self.index_collection.create_composite_index(property_names)
+        for node_id, node_json in self.storage.nodes():
+            indexer.index_node(node_id, node_json[self.DEFAULT_KEY_NODE_PROPERTIES])
+
+    def create_prefix_index_on_property(self, *property_name_list):
+        """
+        create a ordered index on some properties, so find_one_node_by_property_value_starts_with() and
+        find_nodes_by_property_value_starts_with() on them are binary searches instead of scanning every node,
+        e.g., create_prefix_index_on_property("qualified_name") for the queries like "java.util.".
+        It works as the index of create_index_on_property() as well. Unlike create_index_on_property(), the existing
+        nodes are indexed at once.
+        :param property_name_list: one or one more property names.
+        :return:
+        """
+        new_property_names = [property_name for property_name in property_name_list
+                              if not self.index_collection.is_property_indexed(property_name)]
+        self.index_collection.create_prefix_index_on_property(*property_name_list)
+        if not new_property_names:
+            return
+        indexers = [self.index_collection.property_to_indexer_map[property_name]
+                    for property_name in new_property_names]
+        for node_id, node_json in self.storage.nodes():
+            for indexer in indexers:
+                indexer.index_new_node(node_id, node_json[self.DEFAULT_KEY_NODE_PROPERTIES])
+
+    def create_range_index_on_property(self, *property_name_list):
+        """
+        create a ordered index on some properties with number values, or str values compared as str like the
+        timestamps, so find_nodes_by_property_range() and find_top_k_nodes_by_property() on them don't scan every node,
+        e.g., create_range_index_on_property("sourcerank", "latest release publish timestamp").
+        The existing nodes are indexed at once.
+        :param property_name_list: one or one more property names.
+        :return:
+        """
+        indexers = self.index_collection.create_range_index_on_property(*property_name_list)
+        if not indexers:
+            return
+        for node_id, node_json in self.storage.nodes():
+            for indexer in indexers:
+                indexer.index_node(node_id, node_json[self.DEFAULT_KEY_NODE_PROPERTIES])
+
+    def __iter_range_values(self, property_name):
+        """
+        scan all nodes for a property without a range index, the values are accepted in the same way as the index.
+        :return: a iterator of (value, node_id) of the nodes with a value of the kind of the first one
+        """
+        value_kind = None
+        for node_id, node_json in self.storage.nodes():
+            value = node_json[self.DEFAULT_KEY_NODE_PROPERTIES].get(property_name, None)
+            kind = RangePropertyIndexer.kind_of(value)
+            if kind is None:
+                continue
+            if value_kind is None:
+                value_kind = kind
+            if kind == value_kind:
+                yield value, node_id
+
+    def find_nodes_by_property_range(self, property_name, low=None, high=None):
+        """
+        find all nodes with the property value in [low, high]. It is a binary search if the property has a range
+        index, see create_range_index_on_property(), otherwise all nodes are scanned.
+        :param property_name: the property name
+        :param low: the smallest value, None for no lower bound
+        :param high: the largest value, None for no upper bound
+        :return: a list of node json, sorted by the property value
+        """
+        indexer = self.index_collection.get_range_index(property_name)
+        if indexer is not None:
+            node_ids = indexer.find_node_ids_by_range(low, high).tolist()
+        else:
+            # only the values in the range are sorted
+            matches = [(value, node_id) for value, node_id in self.__iter_range_values(property_name)
+                       if (low is None or value >= low) and (high is None or value <= high)]
+            matches.sort(key=itemgetter(0))
+            node_ids = [node_id for value, node_id in matches]
+        return [self.storage.get_node(node_id) for node_id in node_ids]
+
+    def find_top_k_nodes_by_property(self, property_name, k, largest=True):
+        """
+        find the k nodes with the largest property values, e.g., find_top_k_nodes_by_property("sourcerank", 10).
+        It uses the range index if the property has one, otherwise all nodes are scanned.
+        :param property_name: the property name
+        :param k: the number of nodes
+        :param largest: True for the largest values in descending order, False for the smallest values in ascending
+        order.
+        :return: a list of node json
+        """
+        indexer = self.index_collection.get_range_index(property_name)
+        if indexer is not None:
+            node_ids = indexer.find_top_k_node_ids(k, largest).tolist()
+        else:
+            # keep only the k best values in a heap during the scan
+            select = heapq.nlargest if largest else heapq.nsmallest
+            node_ids = [node_id for value, node_id in
+                        select(max(k, 0), self.__iter_range_values(property_name), key=itemgetter(0))]
+        return [self.storage.get_node(node_id) for node_id in node_ids]
+
+    def create_normalized_index_on_property(self, property_name, normalizer="lowercase"):
+        """
+        create a index on the normalized str values of a property, the values are normalized once on indexing,
+        e.g., create_normalized_index_on_property("name", "lowercase") for the case-insensitive lookup, or
+        create_normalized_index_on_property("name", ["camel_case_split", "lowercase"]) to find the nodes by the words
+        in the names. The existing nodes are indexed at once.
+        A property could have several normalized indexes with different normalizers.
+        :param property_name: the property name
+        :param normalizer: a PropertyValueNormalizer, or the steps to create one, see PropertyValueNormalizer.
+        :return:
+        """
+        indexer = self.index_collection.create_normalized_index_on_property(
+            property_name, PropertyValueNormalizer.of(normalizer))
+        if indexer is None:
+            return
+        for node_id, node_json in self.storage.nodes():
+            indexer.index_new_node(node_id, node_json[self.DEFAULT_KEY_NODE_PROPERTIES])
+
+    def __iter_node_ids_by_normalized_property(self, property_name, property_value, normalizer):
+        normalizer = PropertyValueNormalizer.of(normalizer)
+        indexer = self.index_collection.get_normalized_index(property_name, normalizer.name)
+        if indexer is not None:
+            yield from indexer.find_node_ids_by_value(property_value)
+            return
+        # scan all nodes, the values are normalized in the same way as the index
+        indexer = NormalizedPropertyIndexer(property_name, normalizer)
+        normalized_values = indexer.normalize(property_value)
+        if not normalized_values:
+            return
+        for node_id, node_json in self.storage.nodes():
+            node_properties = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
+            if property_name in node_properties and \
+                    normalized_values.issubset(indexer.normalize(node_properties[property_name])):
+                yield node_id
+
+    def find_nodes_by_normalized_property(self, property_name, property_value, normalizer="lowercase"):
+        """
+        find all nodes whose normalized property values have all the normalized values of the given value,
+        e.g., find_nodes_by_normalized_property("name", "stringbuffer") finds the node named "StringBuffer".
+        It is a lookup if the property has a normalized index with the same normalizer,
+        see create_normalized_index_on_property(), otherwise all nodes are scanned.
+        :param property_name: the property name
+        :param property_value: a str, not normalized
+        :param normalizer: a PropertyValueNormalizer, or the steps to create one
+        :return: a list of node json
+        """
+        return self.find_nodes_by_ids(
+            *self.__iter_node_ids_by_normalized_property(property_name, property_value, normalizer))
+
+    def find_one_node_by_normalized_property(self, property_name, property_value, normalizer="lowercase"):
+        """
+        find a node whose normalized property values have all the normalized values of the given value,
+        see find_nodes_by_normalized_property().
+        :return: a node json, None if not found
+        """
+        for node_id in self.__iter_node_ids_by_normalized_property(property_name, property_value, normalizer):
+            return self.get_node_info_dict(node_id)
+        return None
+
     def refresh_indexer(self):
         """
         refresh the index on all properties.
         :return:
         """
-        index_properties = self.index_collection.get_index_property()
-        index_properties = list(index_properties)
+        index_collection = self.index_collection.create_empty_copy()
         del self.index_collection
-        self.index_collection = GraphIndexCollection()
+        self.index_collection = index_collection
 
-        self.create_index_on_property(*index_properties)
-        for node_id, node_json in self.graph.nodes(data=True):
+        for node_id, node_json in self.storage.nodes():
             if node_json is None:
                 continue
             node_properties_json = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
@@ -615,7 +2329,12 @@ class GraphData(SaveLoad):
                 return None
             return self.get_node_info_dict(candidate_node_ids[0])
 
-        for node_id, node_json in self.graph.nodes(data=True):
+        if self.property_store is not None:
+            node_ids = self.__find_node_ids_in_property_store(
+                self.property_store.find_rows(property_name, property_value))
+            return self.get_node_info_dict(node_ids[0]) if node_ids else None
+
+        for node_id, node_json in self.storage.nodes():
             node_properties_json = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
             if property_name in node_properties_json.keys() and node_properties_json[property_name] == property_value:
                 return node_json
@@ -635,8 +2354,13 @@ class GraphData(SaveLoad):
 
             return self.find_nodes_by_ids(*candidate_node_ids)
 
+        if self.property_store is not None:
+            node_ids = self.__find_node_ids_in_property_store(
+                self.property_store.find_rows(property_name, property_value))
+            return self.find_nodes_by_ids(*node_ids)
+
         nodes = []
-        for node_id, node_json in self.graph.nodes(data=True):
+        for node_id, node_json in self.storage.nodes():
             node_properties_json = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
             if property_name in node_properties_json.keys() and node_properties_json[property_name] == property_value:
                 nodes.append(node_json)
@@ -649,7 +2373,21 @@ class GraphData(SaveLoad):
         :param property_value_starter:
         :return:
         """
-        for node_id, node_json in self.graph.nodes(data=True):
+        if self.index_collection.is_property_prefix_indexed(property_name):
+            indexer = self.index_collection.property_to_indexer_map[property_name]
+            for property_value in indexer.iter_values_by_prefix(property_value_starter):
+                for node_id in indexer.find_node_ids_by_value(property_value):
+                    node_json = self.storage.get_node(node_id)
+                    if self.__is_str_starts_with(node_json, property_name, property_value_starter):
+                        return node_json
+            return None
+
+        if self.property_store is not None:
+            node_ids = self.__find_node_ids_in_property_store(
+                self.property_store.find_rows_by_str_prefix(property_name, property_value_starter))
+            return self.get_node_info_dict(node_ids[0]) if node_ids else None
+
+        for node_id, node_json in self.storage.nodes():
             node_properties_json = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
             if property_name not in node_properties_json.keys():
                 continue
@@ -668,8 +2406,19 @@ class GraphData(SaveLoad):
         :param property_value_starter:
         :return:
         """
+        if self.index_collection.is_property_prefix_indexed(property_name):
+            node_jsons = [self.storage.get_node(node_id) for node_id in
+                          self.index_collection.find_ids_by_prefix(property_name, property_value_starter)]
+            return [node_json for node_json in node_jsons
+                    if self.__is_str_starts_with(node_json, property_name, property_value_starter)]
+
+        if self.property_store is not None:
+            node_ids = self.__find_node_ids_in_property_store(
+                self.property_store.find_rows_by_str_prefix(property_name, property_value_starter))
+            return self.find_nodes_by_ids(*node_ids)
+
         nodes = []
-        for node_id, node_json in self.graph.nodes(data=True):
+        for node_id, node_json in self.storage.nodes():
             node_properties_json = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
             if property_name not in node_properties_json.keys():
                 continue
@@ -681,50 +2430,122 @@ class GraphData(SaveLoad):
                 nodes.append(node_json)
         return nodes
 
-    def __find_node_ids_by_index_properties(self, **index_properties):
-        result_ids = self.get_node_ids()
-
-        for property_name, property_value in index_properties.items():
-            result_ids = result_ids.intersection(
-                self.index_collection.find_ids(property_name=property_name,
-                                               property_value=property_value))
-
-        return result_ids
+    def __is_str_starts_with(self, node_json, property_name, property_value_starter):
+        # the index keeps each str in a list value as well, but only a str value itself is matched by the prefix
+        if node_json is None:
+            return False
+        property_value = node_json[self.DEFAULT_KEY_NODE_PROPERTIES].get(property_name, None)
+        return type(property_value) == str and property_value.startswith(property_value_starter)
 
-    def find_one_node_by_properties(self, **properties):
-        indexed_properties = {}
+    def plan_property_query(self, **properties):
+        """
+        make the plan to find the nodes matching all the given properties. If a composite index covers some of the
+        properties, it gives the candidates. Otherwise, the indexed properties are ordered by the size of their
+        posting sets, the smallest one gives the candidates. The other indexed properties are probed from the smallest.
+        If no property is indexed, the columns of the columnar property store are scanned if possible.
+        The properties not covered by the index and the columns are compared on each candidate.
+        >>>
+            print(graph_data.plan_property_query(name="String", version="1.0").explain())
+            # 1. index lookup name='String' -> 3 node ids
+            # 2. filter version == '1.0'
+        >>>
+        :param properties: the property name and property value pairs
+        :return: a PropertyQueryPlan
+        """
+        node_num = self.get_node_num()
+        composite_postings = [(indexer.index_property_names, indexer.find_node_ids(properties))
+                              for indexer in self.index_collection.find_covering_composite_indexes(properties.keys())]
+        covered_names = set()
+        if composite_postings:
+            # a composite posting is never larger than the posting of each property it covers
+            composite_postings.sort(key=lambda posting: len(posting[1]))
+            covered_names.update(composite_postings[0][0])
+
+        postings = []
         unindexed_properties = {}
         for property_name, property_value in properties.items():
-            if self.index_collection.is_property_indexed(property_name=property_name):
-                indexed_properties[property_name] = property_value
+            if property_name in covered_names:
+                continue
+            if self.index_collection.is_property_indexed(property_name):
+                postings.append((property_name, self.index_collection.find_ids(property_name, property_value)))
             else:
                 unindexed_properties[property_name] = property_value
 
-        candidate_node_ids = self.__find_node_ids_by_index_properties(**indexed_properties)
-
-        if len(candidate_node_ids) == 0:
-            return None
-
-        if len(unindexed_properties) == 0:
-            return self.get_node_info_dict(list(candidate_node_ids)[0])
+        if composite_postings:
+            driver_names, driver_ids = composite_postings[0]
+            postings.sort(key=lambda posting: len(posting[1]))
+            return PropertyQueryPlan(properties, PropertyQueryPlan.DRIVER_COMPOSITE_INDEX, list(driver_names),
+                                     driver_ids, postings, list(unindexed_properties.items()), node_num)
+        if postings:
+            postings.sort(key=lambda posting: len(posting[1]))
+            driver_name, driver_ids = postings[0]
+            return PropertyQueryPlan(properties, PropertyQueryPlan.DRIVER_INDEX, [driver_name], driver_ids,
+                                     postings[1:], list(unindexed_properties.items()), node_num)
+
+        scan_names = []
+        if self.property_store is not None:
+            scan_names = [property_name for property_name in unindexed_properties.keys()
+                          if self.property_store.is_vectorized(property_name)]
+        if scan_names:
+            rows = None
+            for property_name in scan_names:
+                property_rows = self.property_store.find_rows(property_name, unindexed_properties[property_name])
+                rows = property_rows if rows is None else np.intersect1d(rows, property_rows, assume_unique=True)
+            filters = [(property_name, property_value) for property_name, property_value in
+                       unindexed_properties.items() if property_name not in scan_names]
+            return PropertyQueryPlan(properties, PropertyQueryPlan.DRIVER_COLUMN_SCAN, scan_names,
+                                     self.__find_node_ids_in_property_store(rows), [], filters, node_num)
+
+        return PropertyQueryPlan(properties, PropertyQueryPlan.DRIVER_NODE_SCAN, [], None, [],
+                                 list(unindexed_properties.items()), node_num)
+
+    def __iter_nodes_by_plan(self, plan):
+        """
+        run a PropertyQueryPlan lazily, so find_one stops on the first match.
+        :return: a iterator of node jsons
+        """
+        if plan.is_empty():
+            return
+        postings = [posting for property_name, posting in plan.probes]
+        filters = plan.filters
+        if plan.driver_ids is None:
+            for node_id, node_json in self.storage.nodes():
+                if self.__match_properties(node_json[self.DEFAULT_KEY_NODE_PROPERTIES], filters):
+                    yield node_json
+            return
 
-        for node_id in candidate_node_ids:
-            node_json = self.get_node_info_dict(node_id=node_id)
-            node_properties_json = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
+        for node_id in plan.driver_ids:
+            if not all(node_id in posting for posting in postings):
+                continue
+            node_json = self.get_node_info_dict(node_id)
+            if node_json is None:
+                continue
+            if not filters or self.__match_properties(node_json[self.DEFAULT_KEY_NODE_PROPERTIES], filters):
+                yield node_json
+
+    @staticmethod
+    def __match_properties(node_properties, filters):
+        for property_name, property_value in filters:
+            if property_name not in node_properties or node_properties[property_name] != property_value:
+                return False
+        return True
 
-            is_match = True
-            for property_name, property_value in unindexed_properties.items():
-                if property_name not in node_properties_json.keys() or node_properties_json[
-                    property_name
-                ] != property_value:
-                    is_match = False
-                    break
-            if is_match:
-                return node_json
+    def find_one_node_by_properties(self, **properties):
+        """
+        find one node matching all the given properties, see plan_property_query().
+        :return: the node json, None if not found
+        """
+        return next(self.__iter_nodes_by_plan(self.plan_property_query(**properties)), None)
 
-        return None
+    def find_nodes_by_properties(self, **properties):
+        """
+        find all nodes matching all the given properties, see plan_property_query().
+        :return: a list of node jsons
+        """
+        return list(self.__iter_nodes_by_plan(self.plan_property_query(**properties)))
 
     def set_relations(self, relations):
+        self.__check_writable()
         for t in relations:
             self.add_relation(startId=t[self.DEFAULT_KEY_RELATION_START_ID],
                               relationType=t[self.DEFAULT_KEY_RELATION_TYPE],
@@ -738,12 +2559,13 @@ class GraphData(SaveLoad):
         :param endId:
         :return:False, the relation is already exist adding fail, True, add the relation successsful
         """
+        self.__check_writable()
         # if startId == GraphData.UNASSIGNED_NODE_ID:
         #     return False
         # if endId == GraphData.UNASSIGNED_NODE_ID:
         #     return False
 
-        if startId not in self.graph.nodes or endId not in self.graph.nodes:
+        if not self.storage.has_node(startId) or not self.storage.has_node(endId):
             return False
 
         if self.exist_relation(startId=startId, relationType=relationType, endId=endId):
@@ -751,67 +2573,210 @@ class GraphData(SaveLoad):
 
         self.__add_one_relation_count(relationType)
 
-        self.graph.add_edge(startId, endId, relationType)
+        code = self.relation_type_table.add(relationType)
+        self.storage.add_relation(startId, code, endId)
+        self.__record_change(GraphJournal.OP_ADD_RELATION, startId, code, endId)
         return True
 
+    def add_relations_bulk(self, start_ids, relation_types=None, end_ids=None):
+        """
+        add many relations at once. The relations with a missing start/end node, the relations already exist and
+        the repeated relations in the input (except the first one) are dropped in a vectorized way.
+        >>>
+            graph_data.add_relations_bulk(np.array([1, 1, 2]), ["call", "call", "belong to"], np.array([2, 2, 5]))
+            # array([ True, False, False])
+            graph_data.add_relations_bulk(iter([(1, "call", 3), (3, "call", 1)]))
+        >>>
+        :param start_ids: a numpy array (or list) of start node ids, or a iterable of (startId, relationType, endId)
+        if relation_types and end_ids are not given.
+        :param relation_types: a list/numpy array of relation type strings, or one string for all relations.
+        :param end_ids: a numpy array (or list) of end node ids.
+        :return: a bool numpy array, True for each accepted row.
+        """
+        self.__check_writable()
+        if relation_types is None and end_ids is None:
+            start_ids, codes, end_ids = self.__relation_triples_to_arrays(start_ids)
+        else:
+            start_ids = np.asarray(start_ids)
+            end_ids = np.asarray(end_ids)
+            codes = self.__encode_relation_types(relation_types, len(start_ids))
+        return self.__add_relation_codes_bulk(start_ids, codes, end_ids)
+
+    def __add_relation_codes_bulk(self, start_ids, codes, end_ids):
+        if len(start_ids) == 0:
+            return np.zeros(0, dtype=bool)
+
+        accepted = self.storage.add_relations_bulk(start_ids, codes, end_ids)
+        self.__on_structure_changed()
+        self.__record_changes(GraphJournal.OP_ADD_RELATION, start_ids[accepted], codes[accepted], end_ids[accepted])
+
+        relation_type_to_num_map = self.get_relation_type_to_num_map()
+        counts = np.bincount(codes[accepted], minlength=len(self.relation_type_table))
+        for code in np.flatnonzero(counts).tolist():
+            relation_type = self.relation_type_table.get_type(code)
+            relation_type_to_num_map[relation_type] = relation_type_to_num_map.get(relation_type, 0) + int(
+                counts[code])
+        return accepted
+
+    def __encode_relation_types(self, relation_types, num):
+        if isinstance(relation_types, str):
+            return np.full(num, self.relation_type_table.add(relation_types), dtype=MultiDiGraphStorage.TYPE_DTYPE)
+        if isinstance(relation_types, np.ndarray) and relation_types.dtype != object:
+            unique_types, inverse = np.unique(relation_types, return_inverse=True)
+            unique_codes = np.array([self.relation_type_table.add(t) for t in unique_types.tolist()],
+                                    dtype=MultiDiGraphStorage.TYPE_DTYPE)
+            return unique_codes[inverse.reshape(-1)]
+        # sorting python strings is slow, a dict lookup for each row is faster for the few relation types
+        add = self.relation_type_table.add
+        return np.fromiter((add(t) for t in relation_types), dtype=MultiDiGraphStorage.TYPE_DTYPE, count=num)
+
+    def __relation_triples_to_arrays(self, relations, chunk_size=1000000):
+        """
+        read a iterable of (startId, relationType, endId) chunk by chunk into numpy arrays,
+        the relation types are encoded on the fly, so no list of all triples is created.
+        """
+        start_id_chunks, code_chunks, end_id_chunks = [], [], []
+        iterator = iter(relations)
+        while True:
+            chunk = []
+            for relation in iterator:
+                chunk.append(relation)
+                if len(chunk) >= chunk_size:
+                    break
+            if not chunk:
+                break
+            start_ids, relation_types, end_ids = zip(*chunk)
+            start_id_chunks.append(np.asarray(start_ids))
+            code_chunks.append(self.__encode_relation_types(relation_types, len(chunk)))
+            end_id_chunks.append(np.asarray(end_ids))
+            if len(chunk) < chunk_size:
+                break
+        if not start_id_chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=MultiDiGraphStorage.TYPE_DTYPE), np.empty(
+                0, dtype=np.int64)
+        return np.concatenate(start_id_chunks), np.concatenate(code_chunks), np.concatenate(end_id_chunks)
+
     def __add_one_relation_count(self, relation_type):
+        self.__on_structure_changed()
         relation_type_to_num_map = self.get_relation_type_to_num_map()
         relation_type_to_num_map[relation_type] = relation_type_to_num_map.get(relation_type, 0) + 1
 
     def __remove_one_relation_count(self, relation_type):
+        self.__on_structure_changed()
         relation_type_to_num_map = self.get_relation_type_to_num_map()
         relation_type_to_num_map[relation_type] = max(0, relation_type_to_num_map.get(relation_type, 0) - 1)
 
     def add_relation_with_property(self, startId, relationType, endId, **kwargs):
-        if startId not in self.graph.nodes or endId not in self.graph.nodes:
+        self.__check_writable()
+        if not self.storage.has_node(startId) or not self.storage.has_node(endId):
             return False
 
         if self.exist_relation(startId=startId, relationType=relationType, endId=endId):
             return False
 
         self.__add_one_relation_count(relationType)
-        self.graph.add_edge(startId, endId, relationType, **kwargs)
+        code = self.relation_type_table.add(relationType)
+        self.storage.add_relation(startId, code, endId, **kwargs)
+        self.__record_change(GraphJournal.OP_ADD_RELATION, startId, code, endId)
         return True
 
     def remove_relation(self, startId, relationType, endId):
+        self.__check_writable()
         if not self.exist_relation(startId=startId, relationType=relationType, endId=endId):
             return False
         self.__remove_one_relation_count(relationType)
 
-        self.graph.remove_edge(startId, endId, relationType)
+        code = self.relation_type_table.get_code(relationType)
+        self.storage.remove_relation(startId, code, endId)
+        self.__record_change(GraphJournal.OP_REMOVE_RELATION, startId, code, endId)
         return True
 
+    def remove_relations_by_type(self, relation_type):
+        """
+        remove all relations with the relation type at once.
+        :param relation_type: the relation type
+        :return: a set of the removed relations in (startId, endId, relationType)
+        """
+        self.__check_writable()
+        code = self.relation_type_table.get_code(relation_type)
+        if code is None:
+            return set()
+        removed_relations = self.storage.remove_relations_of_type(code)
+        self.__remove_relation_counts(removed_relations)
+        self.__record_removed_relations(removed_relations)
+        return self.__decode_removed_relations(removed_relations)
+
     def remove_all_relations(self):
-        relation_pairs = self.get_relation_pairs()
-        for relation_pair in relation_pairs:
-            relations = self.get_relations(start_id=relation_pair[0], end_id=relation_pair[1])
-            for relation in relations:
-                self.remove_relation(relation[0], relation[1], relation[2])
+        """
+        remove all relations at once, the nodes are kept.
+        """
+        self.__check_writable()
+        if self.is_journal_enabled():
+            self.journal.record_many(GraphJournal.OP_REMOVE_RELATION, *self.storage.relation_arrays())
+        self.storage.remove_all_relations()
+        self.__on_structure_changed()
+        relation_type_to_num_map = self.get_relation_type_to_num_map()
+        for relation_type in relation_type_to_num_map:
+            relation_type_to_num_map[relation_type] = 0
         return True
 
-
-
     def exist_relation(self, startId, relationType, endId):
-        return self.graph.has_edge(startId, endId, relationType)
+        code = self.relation_type_table.get_code(relationType)
+        if code is None:
+            return False
+        return self.storage.has_relation(startId, code, endId)
 
     def exist_any_relation(self, startId, endId):
-        return self.graph.has_edge(startId, endId)
+        return self.storage.has_any_relation(startId, endId)
+
+    def __decode_relations(self, relations):
+        """
+        translate the (startId, relation type code, endId) from the storage to (startId, relationType, endId)
+        """
+        relation_types = self.relation_type_table.types
+        return ((start_id, relation_types[code], end_id) for start_id, code, end_id in relations)
 
     def get_relations(self, start_id=None, relation_type=None, end_id=None):
-        candidates = None
-        if start_id is not None:
-            candidates = self.get_all_out_relations(start_id)
-        if end_id is not None:
-            tmp = self.get_all_in_relations(end_id)
-            if candidates is not None:
-                candidates &= tmp
-            else:
-                candidates = tmp
-        candidates = self.get_relation_pairs_with_type() if candidates is None else candidates
+        return set(self.iter_relations(start_id=start_id, relation_type=relation_type, end_id=end_id))
 
+    def iter_relations(self, start_id=None, relation_type=None, end_id=None):
+        """
+        iterate the relations matching the given start id, relation type and end id lazily, the None one matches
+        anything. The relations are read from the storage directly without building a set, so the graph must not be
+        changed during the iteration.
+        :param start_id: the id of the start node
+        :param relation_type: the relation type string
+        :param end_id: the id of the end node
+        :return: a iterator of (startId, relationType, endId)
+        """
+        code = None
         if relation_type is not None:
-            candidates = set(filter(lambda r: r[1] == relation_type, candidates))
-        return candidates
+            code = self.relation_type_table.get_code(relation_type)
+            if code is None:
+                return iter(())
+
+        if start_id is None and end_id is None:
+            if code is None:
+                return self.__decode_relations(self.storage.relations())
+            return self.__decode_relations(self.storage.relations_of_type(code))
+
+        if start_id is not None and end_id is not None and code is not None:
+            if self.storage.has_relation(start_id, code, end_id):
+                return iter(((start_id, relation_type, end_id),))
+            return iter(())
+
+        if start_id is not None:
+            if code is None:
+                candidates = self.storage.out_relations(start_id)
+            else:
+                candidates = self.storage.out_relations_of_type(start_id, code)
+            if end_id is not None:
+                candidates = (r for r in candidates if r[2] == end_id)
+        elif code is None:
+            candidates = self.storage.in_relations(end_id)
+        else:
+            candidates = self.storage.in_relations_of_type(end_id, code)
+        return self.__decode_relations(candidates)
 
     def get_all_relations(self, id_1, id_2):
         result = set([])
@@ -820,20 +2785,42 @@ class GraphData(SaveLoad):
         return result
 
     def get_edge_extra_info(self, start_id, end_id, relation_name, extra_key):
-        relation_dict = self.graph.get_edge_data(start_id, end_id)
-        if relation_name in relation_dict:
-            if extra_key in relation_dict[relation_name]:
-                return relation_dict[relation_name][extra_key]
+        code = self.relation_type_table.get_code(relation_name)
+        if code is None:
+            return ""
+        relation_properties = self.storage.get_relation_properties(start_id, code, end_id)
+        if relation_properties and extra_key in relation_properties:
+            return relation_properties[extra_key]
         return ""
 
     def get_node_num(self):
-        return len(self.graph.nodes)
+        return self.storage.node_num()
 
     def get_relation_num(self):
-        return len(self.graph.edges)
+        return self.storage.relation_num()
 
     def get_node_ids(self):
-        return set(self.graph.nodes)
+        return set(self.storage.node_ids())
+
+    def get_node_id_view(self):
+        """
+        get a read-only live view of all node ids, it supports O(1) "in" and len() without copying the ids.
+        :return: a NodeIdView
+        """
+        return NodeIdView(self)
+
+    def iter_node_ids(self):
+        """
+        iterate all node ids lazily, the graph must not be changed during the iteration.
+        """
+        return self.storage.node_ids()
+
+    def iter_nodes(self):
+        """
+        iterate all node jsons lazily, the graph must not be changed during the iteration.
+        :return: a iterator of node json, e.g., {"id": 1, "properties": {"name": "bob"}, "labels": {"entity"}}
+        """
+        return (node_json for node_id, node_json in self.storage.nodes())
 
     def get_relation_pairs(self):
         # todo:cache the result?
@@ -841,7 +2828,7 @@ class GraphData(SaveLoad):
         get the relation list in [(startId,endId)] format
         :return:
         """
-        pairs = set(self.graph.edges(keys=False))
+        pairs = {(r[0], r[2]) for r in self.storage.relations()}
 
         return pairs
 
@@ -850,18 +2837,14 @@ class GraphData(SaveLoad):
         get the relation list in [(startId,endId)] format
         :return:
         """
-        pairs = {(r[0], r[2], r[1]) for r in self.graph.edges(keys=True)}
+        pairs = set(self.iter_relations())
         return pairs
 
     def get_all_out_relations(self, node_id):
-        if node_id not in self.graph.nodes:
-            return set()
-        return {(r[0], r[2], r[1]) for r in self.graph.out_edges(node_id, keys=True)}
+        return set(self.iter_relations(start_id=node_id))
 
     def get_all_in_relations(self, node_id):
-        if node_id not in self.graph.nodes:
-            return set()
-        return {(r[0], r[2], r[1]) for r in self.graph.in_edges(node_id, keys=True)}
+        return set(self.iter_relations(end_id=node_id))
 
     def update_node_index(self, node_id):
 
@@ -876,14 +2859,15 @@ class GraphData(SaveLoad):
         :param node_id: the node id
         :return:
         """
-        return self.graph.nodes.get(node_id, None)
+        return self.storage.get_node(node_id)
 
     def get_properties_for_node(self, node_id, key_node_properties=DEFAULT_KEY_NODE_PROPERTIES):
         """
         get the node properties part from node info dict
         :param key_node_properties: specify the key of key_node_properties, default is "properties"
         :param node_id: the node id
-        :return: {} if the node not exist
+        :return: {} if the node not exist. For the columnar property store, it is a NodeProperties mapping on the
+        columns, which works like the properties dict.
         """
         node_info_dict = self.get_node_info_dict(node_id)
         if node_info_dict is None:
@@ -891,12 +2875,20 @@ class GraphData(SaveLoad):
 
         return node_info_dict[key_node_properties]
 
+    def get_property_view(self, node_id):
+        """
+        get a read-only live view of the node properties.
+        :param node_id: the node id
+        :return: a MappingProxyType of the properties dict, a empty one if the node not exist
+        """
+        return MappingProxyType(self.get_properties_for_node(node_id))
+
     def get_labels_for_node(self, node_id, key_node_labels=DEFAULT_KEY_NODE_LABELS):
         """
         get the node properties part from node info dict
         :param key_node_labels: specify the key of node_labels, default is "labels"
         :param node_id: the node id
-        :return: [] if the node not exist
+        :return: [] if the node not exist, or a frozenset of labels shared by the nodes with the same labels
         """
         node_info_dict = self.get_node_info_dict(node_id)
         if node_info_dict is None:
@@ -927,14 +2919,12 @@ class GraphData(SaveLoad):
         return self.relation_type_to_num_map
 
     def __count_relation_type_to_num_map(self):
+        start_ids, codes, end_ids = self.storage.relation_arrays()
+        counts = np.bincount(codes, minlength=len(self.relation_type_table))
         relation_type_to_num_map = {}
-        relation_type_to_relation = {}
-        for r in self.get_relation_pairs_with_type():
-            if r[1] not in relation_type_to_relation:
-                relation_type_to_relation[r[1]] = set()
-            relation_type_to_relation[r[1]].add(r)
-        for k, v in relation_type_to_relation.items():
-            relation_type_to_num_map[k] = len(v)
+        for code, num in enumerate(counts.tolist()):
+            if num > 0:
+                relation_type_to_num_map[self.relation_type_table.get_type(code)] = num
         return relation_type_to_num_map
 
     def print_label_count(self):
@@ -955,20 +2945,128 @@ class GraphData(SaveLoad):
         for k, v in relation_type_to_num_map.items():
             print("<Relation:%r Num:%d>" % (k, v))
 
+    def diff(self, other):
+        """
+        get the difference from this graph data to a newer version of it, e.g., to find what to update in Neo4j
+        after the graph data is built again. The nodes are matched by the id, the node ids of both are sorted and
+        compared as numpy arrays, and a node in both is changed if the hash of its labels and properties is
+        different. The relations are matched by (startId, relationType, endId), the properties of the relations
+        are not compared.
+        >>>
+            graph_diff = old_graph_data.diff(new_graph_data)
+            graph_diff.added_node_ids, graph_diff.removed_node_ids, graph_diff.changed_node_ids
+            start_ids, relation_types, end_ids = graph_diff.removed_relations
+        >>>
+        :param other: the newer GraphData
+        :return: a GraphDiff, the added nodes and relations are in other only, the removed ones are in self only
+        """
+        return GraphDiff.between(self, other)
+
+    def memory_report(self, sample_size=None):
+        """
+        estimate the bytes used by each part of the graph, to find out what takes the memory.
+        The shared objects are only counted once, in the first part they are found.
+        :param sample_size: None to measure every object, it may take minutes on a large graph.
+        Otherwise, only about sample_size items of each large dict, list or set are measured,
+        and the others are estimated from them, e.g., sample_size=1000 is fast enough for a graph with 10M nodes.
+        :return: a dict of bytes, e.g.,
+        {
+            "nodes": 1024, # the node jsons and the node id structures of the storage
+            "relations": 2048,
+            "relation_index": 512, # the relation type index of the storage
+            "properties": 4096, # the node properties, or the columnar property store
+            "labels": {"entity": 256}, # the node ids of each label
+            "label_sets": 128, # the shared label sets of the nodes
+            "indexes": {"name": 1024, "group_id,artifact_id (composite)": 2048}, # each property index
+            "relation_types": 64,
+            "total": 11200
+        }
+        """
+        seen = set()
+        report = {}
+        if self.property_store is None:
+            node_jsons, scale = self.storage.sample_node_jsons(sample_size)
+            report["properties"] = int(scale * sum(estimate_size(node_json[self.DEFAULT_KEY_NODE_PROPERTIES],
+                                                                 sample_size, seen) for node_json in node_jsons))
+        else:
+            # each node json keeps a small NodeProperties on its row of the store
+            report["properties"] = estimate_size(self.property_store, sample_size, seen) + \
+                                   self.get_node_num() * estimate_size(NodeProperties(None, 0))
+        report["labels"] = {label: estimate_size(node_ids, sample_size, seen)
+                            for label, node_ids in self.label_to_ids_map.items()}
+        report["label_sets"] = estimate_size(self.label_pool, sample_size, seen)
+        report["indexes"] = {property_name: estimate_size(indexer, sample_size, seen)
+                             for property_name, indexer in self.index_collection.property_to_indexer_map.items()}
+        for property_names, indexer in self.index_collection.composite_indexer_map.items():
+            report["indexes"]["%s (composite)" % ",".join(property_names)] = estimate_size(indexer, sample_size, seen)
+        for property_name, indexer in self.index_collection.range_indexer_map.items():
+            report["indexes"]["%s (range)" % property_name] = estimate_size(indexer, sample_size, seen)
+        for (property_name, normalizer_name), indexer in self.index_collection.normalized_indexer_map.items():
+            report["indexes"]["%s (%s)" % (property_name, normalizer_name)] = estimate_size(indexer, sample_size, seen)
+        report["relation_types"] = (estimate_size(self.relation_type_table, sample_size, seen)
+                                    + estimate_size(self.relation_type_to_num_map, sample_size, seen))
+        report.update(self.storage.memory_report(sample_size, seen))
+        report["total"] = sum(sum(value.values()) if type(value) == dict else value for value in report.values())
+        return report
+
     def __repr__(self):
-        return "<GraphData nodeNum=%d relNum=%d maxNodeId=%d>" % (
-            self.get_node_num(), self.get_relation_num(), self.max_node_id)
+        return "<GraphData nodeNum=%d relNum=%d maxNodeId=%d backend=%s>" % (
+            self.get_node_num(), self.get_relation_num(), self.max_node_id, self.backend)
 
-    def subgraph(self, node_ids):
+    def subgraph(self, node_ids, read_only=False):
         """
-        get a sub graph of graph data which keep only given nodes and relations between nodes
-        :param node_ids: the kept node ids in graph
+        get a sub graph of graph data which keep only given nodes and relations between nodes.
+        Only the kept nodes, the relations between them and their index entries are copied, so the cost depends on
+        the size of the sub graph, not the whole graph. The backend, the indexed properties, the relation type codes
+        and the max node id are the same as this graph.
+        :param node_ids: the kept node ids in graph, the ids not in the graph are ignored.
+        :param read_only: False, the properties of the nodes and relations are deep copied. True, the sub graph
+        shares the node properties dicts and the node label sets with this graph, which is much faster. The methods
+        adding, changing or removing the nodes and the relations of a read-only sub graph raise ValueError, and the
+        shared properties dicts must not be changed directly.
         :return: a graph that keep all things.
         """
-        graph_data = deepcopy(self)
-
-        remove_nodes = set(self.get_node_ids()) - node_ids
-        for node_id in remove_nodes:
-            graph_data.remove_node(node_id)
+        graph_data = GraphData(backend=self.backend, property_store=self.property_store_type)
+        if read_only:
+            graph_data.property_store = self.property_store
+        graph_data.max_node_id = self.max_node_id
+        graph_data.index_collection = self.index_collection.create_empty_copy()
+        for relation_type in self.relation_type_table.types:
+            graph_data.relation_type_table.add(relation_type)
+
+        kept_node_ids = {node_id for node_id in node_ids if self.storage.has_node(node_id)}
+
+        node_id_json_pairs = []
+        for node_id in kept_node_ids:
+            node_json = self.storage.get_node(node_id)
+            node_properties = node_json[self.DEFAULT_KEY_NODE_PROPERTIES]
+            node_labels = node_json[self.DEFAULT_KEY_NODE_LABELS]
+            if not read_only:
+                node_properties = graph_data.__store_node_properties(node_id, deepcopy(dict(node_properties)))
+                node_labels = graph_data.label_pool.intern(node_labels)
+            node_id_json_pairs.append((node_id, {
+                self.DEFAULT_KEY_NODE_ID: node_id,
+                self.DEFAULT_KEY_NODE_PROPERTIES: node_properties,
+                self.DEFAULT_KEY_NODE_LABELS: node_labels
+            }))
+            for label in node_labels:
+                label_node_ids = graph_data.label_to_ids_map.get(label, None)
+                if label_node_ids is None:
+                    label_node_ids = graph_data.label_to_ids_map[label] = NodeIdSet()
+                label_node_ids.add(node_id)
+        graph_data.storage.add_nodes(node_id_json_pairs)
+        graph_data.index_collection.add_nodes(
+            (node_id, node_json[self.DEFAULT_KEY_NODE_PROPERTIES]) for node_id, node_json in node_id_json_pairs)
+
+        for node_id in kept_node_ids:
+            for start_id, code, end_id in self.storage.out_relations(node_id):
+                if end_id not in kept_node_ids:
+                    continue
+                relation_properties = self.storage.get_relation_properties(start_id, code, end_id)
+                if relation_properties and not read_only:
+                    relation_properties = deepcopy(relation_properties)
+                graph_data.storage.add_relation(start_id, code, end_id, **(relation_properties or {}))
+        graph_data.relation_type_to_num_map = graph_data.__count_relation_type_to_num_map()
+        graph_data.read_only = read_only
 
         return graph_data
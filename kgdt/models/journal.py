@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the append-only log of the changes of a graph data, see GraphData.enable_journal() and GraphData.changes_since().
+"""
+from array import array
+
+import numpy as np
+
+from kgdt.utils import SaveLoad
+
+
+class GraphJournal(SaveLoad):
+    """
+    the log of the changes of the nodes and the relations, each change is given a sequence number increasing by 1.
+    A change only keeps the op code, the node ids and the relation type code in typed arrays, about 21 bytes for
+    each change, the properties are not copied, the current ones are read from the graph data.
+
+    Only the latest max_size changes are kept, the older ones are dropped. A consumer remembers the last sequence
+    number it has seen, and asks for the changes after it. If some of these changes are dropped, the consumer has to
+    scan the whole graph data again.
+    >>>
+        journal = GraphJournal(max_size=1000)
+        journal.record(GraphJournal.OP_ADD_NODE, 1)
+        journal.record(GraphJournal.OP_ADD_RELATION, 1, 0, 2)
+        seqs, ops, start_ids, codes, end_ids = journal.changes_since(0)
+    >>>
+    """
+    OP_ADD_NODE = 0  # a new node is added, start_id is the node id
+    OP_UPDATE_NODE = 1  # the properties or the labels of a node are changed, start_id is the node id
+    OP_REMOVE_NODE = 2  # a node is removed, start_id is the node id, its relations are removed before
+    OP_ADD_RELATION = 3  # a relation (start_id, code, end_id) is added
+    OP_REMOVE_RELATION = 4  # a relation (start_id, code, end_id) is removed
+    OP_CLEAR = 5  # all nodes and relations are removed at once
+
+    NO_ID = -1  # the end_id of a node change
+    NO_CODE = -1  # the relation type code of a node change
+    DEFAULT_MAX_SIZE = 1000000
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param max_size: the max number of the kept changes, None for no limit
+        """
+        self.max_size = self.__check_max_size(max_size)
+        self.ops = array("b")
+        self.start_ids = array("q")
+        self.codes = array("i")
+        self.end_ids = array("q")
+        self.recording = True
+        self.last_seq = 0  # the seq of the last change, 0 for no change
+        self.oldest_seq = 1  # the seq of the oldest kept change
+        self.stored_seq = 1  # the seq of the first change in the arrays, the ones before oldest_seq are to be deleted
+
+    @staticmethod
+    def __check_max_size(max_size):
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size of the journal must be positive, got %r" % max_size)
+        return max_size
+
+    def __len__(self):
+        return self.last_seq - self.oldest_seq + 1
+
+    def record(self, op, start_id, code=NO_CODE, end_id=NO_ID):
+        """
+        append one change.
+        """
+        self.ops.append(op)
+        self.start_ids.append(start_id)
+        self.codes.append(code)
+        self.end_ids.append(end_id)
+        self.last_seq += 1
+        self.__drop_old_changes()
+
+    def record_many(self, op, start_ids, codes=None, end_ids=None):
+        """
+        append many changes with the same op code.
+        :param start_ids: a iterable of node ids
+        :param codes: None for the node changes, otherwise the relation type codes aligned with start_ids
+        :param end_ids: None for the node changes, otherwise the end node ids aligned with start_ids
+        """
+        start_ids = np.asarray(start_ids if isinstance(start_ids, np.ndarray) else list(start_ids), dtype=np.int64)
+        num = len(start_ids)
+        if not num:
+            return
+        if codes is None:
+            codes = np.full(num, self.NO_CODE)
+            end_ids = np.full(num, self.NO_ID)
+        self.ops.frombytes(np.full(num, op, dtype=np.int8).tobytes())
+        self.start_ids.frombytes(start_ids.tobytes())
+        self.codes.frombytes(np.asarray(codes, dtype=np.int32).tobytes())
+        self.end_ids.frombytes(np.asarray(end_ids, dtype=np.int64).tobytes())
+        self.last_seq += num
+        self.__drop_old_changes()
+
+    def __drop_old_changes(self):
+        if self.max_size is None:
+            return
+        self.oldest_seq = max(self.oldest_seq, self.last_seq - self.max_size + 1)
+        # deleting from the head of the arrays moves all the kept changes, so it is done after enough changes are
+        # dropped, the cost for each change is constant
+        dropped_num = self.oldest_seq - self.stored_seq
+        if dropped_num > self.max_size // 8:
+            for values in (self.ops, self.start_ids, self.codes, self.end_ids):
+                del values[:dropped_num]
+            self.stored_seq = self.oldest_seq
+
+    def set_max_size(self, max_size):
+        self.max_size = self.__check_max_size(max_size)
+        self.__drop_old_changes()
+
+    def pause(self):
+        """
+        stop recording and drop all kept changes, the changes before are not available any more.
+        """
+        for values in (self.ops, self.start_ids, self.codes, self.end_ids):
+            del values[:]
+        self.recording = False
+        self.oldest_seq = self.stored_seq = self.last_seq + 1
+
+    def resume(self):
+        """
+        start recording again after pause(). A seq is skipped for the unknown changes when not recording, so the
+        changes since any seq before are not available.
+        """
+        if self.recording:
+            return
+        self.recording = True
+        self.last_seq += 1
+        self.oldest_seq = self.stored_seq = self.last_seq + 1
+
+    def changes_since(self, seq):
+        """
+        :param seq: a seq given by last_seq or by a earlier call, 0 for all changes since the journal is created
+        :return: (seqs, ops, start_ids, codes, end_ids), five aligned numpy arrays of the changes after seq in order
+        :raise ValueError: some changes after seq are dropped
+        """
+        if seq < self.oldest_seq - 1:
+            raise ValueError("the changes after seq %d are dropped, the oldest kept change is %d, "
+                             "the whole graph data should be scanned again" % (seq, self.oldest_seq))
+        begin = max(seq + 1, self.oldest_seq) - self.stored_seq
+        # the numpy arrays are copied, the array can't be extended while a numpy array is on its buffer
+        return (np.arange(self.stored_seq + begin, self.last_seq + 1, dtype=np.int64),
+                np.frombuffer(self.ops, dtype=np.int8)[begin:].copy(),
+                np.frombuffer(self.start_ids, dtype=np.int64)[begin:].copy(),
+                np.frombuffer(self.codes, dtype=np.int32)[begin:].copy(),
+                np.frombuffer(self.end_ids, dtype=np.int64)[begin:].copy())
+
+    def __repr__(self):
+        return "<GraphJournal lastSeq=%d size=%d maxSize=%r>" % (self.last_seq, len(self), self.max_size)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the compact structures to keep the labels of nodes.
+"""
+from collections.abc import MutableSet
+
+import numpy as np
+
+from kgdt.utils import SaveLoad
+
+
+class LabelPool(SaveLoad):
+    """
+    the pool of the label sets in one GraphData. The graph usually has only a few distinct label combinations,
+    so all nodes with the same labels share one frozenset from the pool.
+    >>>
+        pool = LabelPool()
+        labels = pool.intern({"entity", "class"})
+        pool.intern(["class", "entity"]) is labels  # True
+    >>>
+    """
+
+    def __init__(self):
+        self.label_sets = {}
+
+    def intern(self, labels):
+        """
+        :param labels: a iterable of labels
+        :return: the shared frozenset of the labels
+        """
+        labels = frozenset(labels)
+        return self.label_sets.setdefault(labels, labels)
+
+    def add(self, labels, *new_labels):
+        """
+        :return: the shared frozenset of the labels together with the new labels
+        """
+        if all(label in labels for label in new_labels):
+            return self.intern(labels)
+        return self.intern(labels.union(new_labels))
+
+    def __len__(self):
+        return len(self.label_sets)
+
+
+class NodeIdSet(MutableSet):
+    """
+    a set of node ids for one label. The int ids are kept in a sorted int64 numpy array, the recent changes are kept
+    in two small python sets and merged into the array once they are large enough. The ids that are not int are always
+    kept in the python set.
+
+    It works like a python set, and the array of all ids could be got by to_array() for vectorized operations.
+    The operators (&, |, -, ^) and the methods like union() and copy() return a new python set, as the set returned
+    by GraphData.get_node_ids_by_label() before.
+    """
+    MIN_PENDING_SIZE = 1024
+    INT64_MIN = -2 ** 63
+    INT64_MAX = 2 ** 63 - 1
+
+    def __init__(self, node_ids=()):
+        self.sorted_ids = np.empty(0, dtype=np.int64)
+        self.added = set()
+        self.removed = set()
+        self.update(node_ids)
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    @classmethod
+    def is_array_id(cls, node_id):
+        """
+        :return: True if the node id could be kept in the int64 array
+        """
+        return (type(node_id) == int or isinstance(node_id, np.integer)) and \
+            cls.INT64_MIN <= node_id <= cls.INT64_MAX
+
+    def __in_array(self, node_id):
+        if not len(self.sorted_ids) or not self.is_array_id(node_id):
+            return False
+        position = self.sorted_ids.searchsorted(node_id)
+        return position < len(self.sorted_ids) and self.sorted_ids[position] == node_id
+
+    def __contains__(self, node_id):
+        if node_id in self.added:
+            return True
+        if node_id in self.removed:
+            return False
+        return self.__in_array(node_id)
+
+    def __len__(self):
+        return len(self.sorted_ids) - len(self.removed) + len(self.added)
+
+    def __iter__(self):
+        removed = self.removed
+        node_ids = self.sorted_ids.tolist()
+        if removed:
+            node_ids = [node_id for node_id in node_ids if node_id not in removed]
+        node_ids.extend(self.added)
+        return iter(node_ids)
+
+    def copy(self):
+        return set(self)
+
+    def union(self, *others):
+        return set(self).union(*others)
+
+    def intersection(self, *others):
+        if not others:
+            return set(self)
+        # only the ids of the other are looked up in this set, it may be much smaller
+        return {node_id for node_id in others[0] if node_id in self}.intersection(*others[1:])
+
+    def difference(self, *others):
+        return set(self).difference(*others)
+
+    def symmetric_difference(self, other):
+        return set(self).symmetric_difference(other)
+
+    def issubset(self, other):
+        return set(self).issubset(other)
+
+    def issuperset(self, other):
+        return all(node_id in self for node_id in other)
+
+    def add(self, node_id):
+        if node_id in self.removed:
+            self.removed.remove(node_id)
+        elif not self.__in_array(node_id):
+            self.added.add(node_id)
+            self.__compact_if_needed()
+
+    def discard(self, node_id):
+        if node_id in self.added:
+            self.added.remove(node_id)
+        elif node_id not in self.removed and self.__in_array(node_id):
+            self.removed.add(node_id)
+            self.__compact_if_needed()
+
+    def update(self, node_ids):
+        """
+        add many node ids, the int ids are merged into the array at once.
+        """
+        array_ids = []
+        for node_id in node_ids:
+            if self.is_array_id(node_id):
+                array_ids.append(node_id)
+            else:
+                self.add(node_id)
+        if len(array_ids) < self.MIN_PENDING_SIZE:
+            for node_id in array_ids:
+                self.add(node_id)
+            return
+        self.compact()
+        self.sorted_ids = np.union1d(self.sorted_ids, np.array(array_ids, dtype=np.int64))
+        self.sorted_ids.flags.writeable = False
+
+    def difference_update(self, node_ids):
+        """
+        remove many node ids, the int ids are removed from the array at once.
+        """
+        array_ids = []
+        for node_id in node_ids:
+            if self.is_array_id(node_id):
+                array_ids.append(node_id)
+            else:
+                self.discard(node_id)
+        if len(array_ids) < self.MIN_PENDING_SIZE:
+            for node_id in array_ids:
+                self.discard(node_id)
+            return
+        self.compact()
+        self.sorted_ids = np.setdiff1d(self.sorted_ids, np.array(array_ids, dtype=np.int64))
+        self.sorted_ids.flags.writeable = False
+
+    def __compact_if_needed(self):
+        if len(self.added) + len(self.removed) > max(self.MIN_PENDING_SIZE, len(self.sorted_ids) >> 3):
+            self.compact()
+
+    def compact(self):
+        """
+        merge the pending changes into the sorted array.
+        """
+        added_array_ids = [node_id for node_id in self.added if self.is_array_id(node_id)]
+        if not added_array_ids and not self.removed:
+            return
+        sorted_ids = self.sorted_ids
+        if self.removed:
+            sorted_ids = np.setdiff1d(sorted_ids, np.array(list(self.removed), dtype=np.int64), assume_unique=True)
+        if added_array_ids:
+            sorted_ids = np.union1d(sorted_ids, np.array(added_array_ids, dtype=np.int64))
+        sorted_ids.flags.writeable = False
+        self.sorted_ids = sorted_ids
+        self.added = {node_id for node_id in self.added if not self.is_array_id(node_id)}
+        self.removed = set()
+
+    def to_array(self):
+        """
+        :return: a sorted read-only int64 numpy array of all ids. If some ids are not int, it is a object array
+        and not sorted.
+        """
+        self.compact()
+        if self.added:
+            return np.array(list(self), dtype=object)
+        return self.sorted_ids
+
+    @staticmethod
+    def intersect_sorted_arrays(first, second):
+        """
+        intersect two sorted int64 arrays without duplicates, by a binary search of the smaller one in the larger one.
+        :return: a sorted int64 array
+        """
+        if len(first) > len(second):
+            first, second = second, first
+        if not len(first):
+            return first
+        positions = second.searchsorted(first)
+        positions[positions == len(second)] = 0
+        return first[second[positions] == first]
+
+    def __repr__(self):
+        return "NodeIdSet(%r)" % set(self)
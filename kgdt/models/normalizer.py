@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the normalizers of the str property values, see GraphData.create_normalized_index_on_property().
+"""
+import re
+
+from kgdt.utils import SaveLoad
+
+# the words in a identifier, e.g., "HTTPServerError2" -> "HTTP", "Server", "Error", "2"
+CAMEL_CASE_WORD_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def lowercase(value):
+    return value.lower()
+
+
+def strip(value):
+    return value.strip()
+
+
+def split_camel_case(value):
+    """
+    split a identifier into words, the characters other than letters and digits are separators,
+    e.g., "java.util.ArrayList" -> ["java", "util", "Array", "List"].
+    """
+    return CAMEL_CASE_WORD_PATTERN.findall(value)
+
+
+class PropertyValueNormalizer(SaveLoad):
+    """
+    a normalizer made of several steps, each step is a function taking a str and returning a str, or a list of str
+    for splitting. The steps are applied in order, and every str given by a step goes through the next step.
+    A step is given by the name of a built-in one in NAME_TO_STEP_MAP, or a function. The function must be defined on
+    the module level if the graph data is saved, a lambda can't be saved.
+    >>>
+        normalizer = PropertyValueNormalizer(["camel_case_split", "lowercase"])
+        normalizer("StringBuffer")  # {"string", "buffer"}
+        normalizer.name  # "camel_case_split+lowercase"
+    >>>
+    """
+    NAME_TO_STEP_MAP = {
+        "lowercase": lowercase,
+        "strip": strip,
+        "camel_case_split": split_camel_case,
+    }
+
+    def __init__(self, steps):
+        """
+        :param steps: a step or a list of steps, each step is a name in NAME_TO_STEP_MAP or a function.
+        """
+        if type(steps) == str or callable(steps):
+            steps = [steps]
+        self.steps = []
+        step_names = []
+        for step in steps:
+            if type(step) == str:
+                if step not in self.NAME_TO_STEP_MAP:
+                    raise ValueError("unknown normalizer %r" % step)
+                step_names.append(step)
+                step = self.NAME_TO_STEP_MAP[step]
+            else:
+                step_names.append(getattr(step, "__name__", repr(step)))
+            self.steps.append(step)
+        self.name = "+".join(step_names)
+
+    @classmethod
+    def of(cls, normalizer):
+        """
+        :param normalizer: a PropertyValueNormalizer, or the steps to create one
+        :return: a PropertyValueNormalizer
+        """
+        if isinstance(normalizer, cls):
+            return normalizer
+        return cls(normalizer)
+
+    def __call__(self, value):
+        """
+        :param value: a str
+        :return: a set of the normalized str
+        """
+        values = [value]
+        for step in self.steps:
+            new_values = []
+            for value in values:
+                normalized_value = step(value)
+                if type(normalized_value) == str:
+                    new_values.append(normalized_value)
+                else:
+                    new_values.extend(normalized_value)
+            values = new_values
+        return set(values)
+
+    def __repr__(self):
+        return "<PropertyValueNormalizer %s>" % self.name
@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the columnar store of node properties, see GraphData(property_store=GraphData.PROPERTY_STORE_COLUMNAR).
+"""
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from kgdt.utils import SaveLoad
+
+
+class PropertyColumn(SaveLoad):
+    """
+    the values of one property name for all rows. A row without the property is marked as not present.
+    """
+
+    def __init__(self):
+        self.present = np.zeros(0, dtype=bool)
+
+    def accept(self, value):
+        """
+        :return: True if the value could be kept in this column
+        """
+        raise NotImplementedError
+
+    def reserve(self, row_num):
+        """
+        make sure the column has space for row_num rows.
+        """
+        if row_num <= len(self.present):
+            return
+        capacity = max(16, 2 * len(self.present), row_num)
+        self.present = self._grow(self.present, capacity)
+
+    @staticmethod
+    def _grow(array, capacity, fill_value=0):
+        new_array = np.full(capacity, fill_value, dtype=array.dtype)
+        new_array[:len(array)] = array
+        return new_array
+
+    def has(self, row):
+        return row < len(self.present) and self.present[row]
+
+    def get(self, row):
+        raise NotImplementedError
+
+    def set(self, row, value):
+        raise NotImplementedError
+
+    def delete(self, row):
+        if self.has(row):
+            self.present[row] = False
+
+    def find_rows(self, value, row_num):
+        """
+        find all rows with the value.
+        :return: a sorted numpy array of rows
+        """
+        raise NotImplementedError
+
+    def rows(self, row_num):
+        """
+        :return: a sorted numpy array of the rows having this property
+        """
+        return np.flatnonzero(self.present[:row_num])
+
+
+class NumericColumn(PropertyColumn):
+    """
+    a column of int, float or bool values kept in a numpy array.
+    """
+    PYTHON_TYPE_TO_DTYPE = {int: np.int64, float: np.float64, bool: np.bool_}
+
+    def __init__(self, python_type):
+        super().__init__()
+        self.python_type = python_type
+        self.values = np.zeros(0, dtype=self.PYTHON_TYPE_TO_DTYPE[python_type])
+
+    def accept(self, value):
+        if type(value) != self.python_type:
+            return False
+        if self.python_type == int:
+            return -2 ** 63 <= value < 2 ** 63
+        return True
+
+    def reserve(self, row_num):
+        super().reserve(row_num)
+        if len(self.values) < len(self.present):
+            self.values = self._grow(self.values, len(self.present))
+
+    def get(self, row):
+        return self.values[row].item()
+
+    def set(self, row, value):
+        self.values[row] = value
+        self.present[row] = True
+
+    def find_rows(self, value, row_num):
+        # a number could equal to the number of other types, e.g., 1 == 1.0 == True
+        if not isinstance(value, (int, float, np.integer, np.floating)):
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero((self.values[:row_num] == value) & self.present[:row_num])
+
+
+class StrColumn(PropertyColumn):
+    """
+    a dictionary encoded column of str values, each row keeps the int code of its value.
+    """
+    CODE_DTYPE = np.int32
+
+    def __init__(self):
+        super().__init__()
+        self.codes = np.zeros(0, dtype=self.CODE_DTYPE)
+        self.dictionary = []
+        self.value_to_code_map = {}
+
+    def accept(self, value):
+        return type(value) == str
+
+    def reserve(self, row_num):
+        super().reserve(row_num)
+        if len(self.codes) < len(self.present):
+            self.codes = self._grow(self.codes, len(self.present))
+
+    def get(self, row):
+        return self.dictionary[self.codes[row]]
+
+    def set(self, row, value):
+        code = self.value_to_code_map.get(value, None)
+        if code is None:
+            code = len(self.dictionary)
+            self.dictionary.append(value)
+            self.value_to_code_map[value] = code
+        self.codes[row] = code
+        self.present[row] = True
+
+    def find_rows(self, value, row_num):
+        code = self.value_to_code_map.get(value, None) if type(value) == str else None
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero((self.codes[:row_num] == code) & self.present[:row_num])
+
+    def find_rows_by_codes(self, codes, row_num):
+        """
+        find all rows with one of the given codes.
+        """
+        return np.flatnonzero(np.isin(self.codes[:row_num], codes) & self.present[:row_num])
+
+
+class ObjectColumn(PropertyColumn):
+    """
+    a column of any python values, used when the values of a property are not of the same simple type.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.values = []
+
+    def accept(self, value):
+        return True
+
+    def reserve(self, row_num):
+        super().reserve(row_num)
+        if len(self.values) < len(self.present):
+            self.values.extend([None] * (len(self.present) - len(self.values)))
+
+    def get(self, row):
+        return self.values[row]
+
+    def set(self, row, value):
+        self.values[row] = value
+        self.present[row] = True
+
+    def delete(self, row):
+        super().delete(row)
+        if row < len(self.values):
+            self.values[row] = None
+
+    def find_rows(self, value, row_num):
+        values = self.values
+        present = self.present
+        return np.array([row for row in np.flatnonzero(present[:row_num]).tolist() if values[row] == value],
+                        dtype=np.int64)
+
+
+class ColumnarPropertyStore(SaveLoad):
+    """
+    keep the properties of all nodes by columns, one column for each property name. The int, float and bool
+    values are kept in numpy arrays, the str values are dictionary encoded, other values are kept as python objects.
+    A column is changed to ObjectColumn once a value of other type is set.
+
+    Each node is given a row, and its properties are accessed by a NodeProperties mapping on the row.
+    >>>
+        store = ColumnarPropertyStore()
+        node_properties = store.add_row(3, {"name": "String", "line": 12})
+        node_properties["name"]  # "String"
+        store.find_rows("line", 12)  # array([0])
+    >>>
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.row_ids = []
+        self.row_num = 0
+        self.alive_row_num = 0
+
+    def add_row(self, node_id, node_properties):
+        """
+        add a row for a node.
+        :param node_id: the id of the node
+        :param node_properties: a dict of node properties
+        :return: a NodeProperties mapping on the new row
+        """
+        row = self.row_num
+        self.row_ids.append(node_id)
+        self.row_num += 1
+        self.alive_row_num += 1
+        for property_name, property_value in node_properties.items():
+            self.set_value(row, property_name, property_value)
+        return NodeProperties(self, row)
+
+    def reset_row(self, row, node_properties):
+        """
+        replace all properties of the row with the given ones.
+        """
+        for column in self.columns.values():
+            column.delete(row)
+        for property_name, property_value in node_properties.items():
+            self.set_value(row, property_name, property_value)
+        return NodeProperties(self, row)
+
+    def remove_row(self, row):
+        """
+        remove all properties of the row, the row is not reused.
+        """
+        for column in self.columns.values():
+            column.delete(row)
+        self.row_ids[row] = None
+        self.alive_row_num -= 1
+
+    @staticmethod
+    def __new_column(property_value):
+        if type(property_value) in NumericColumn.PYTHON_TYPE_TO_DTYPE:
+            column = NumericColumn(type(property_value))
+            if column.accept(property_value):
+                return column
+        if type(property_value) == str:
+            return StrColumn()
+        return ObjectColumn()
+
+    def set_value(self, row, property_name, property_value):
+        column = self.columns.get(property_name, None)
+        if column is None:
+            column = self.columns[property_name] = self.__new_column(property_value)
+        elif not column.accept(property_value):
+            column = self.columns[property_name] = self.__to_object_column(column)
+        column.reserve(self.row_num)
+        column.set(row, property_value)
+
+    def __to_object_column(self, column):
+        object_column = ObjectColumn()
+        object_column.reserve(self.row_num)
+        for row in column.rows(self.row_num).tolist():
+            object_column.set(row, column.get(row))
+        return object_column
+
+    def find_rows(self, property_name, property_value):
+        """
+        find all rows whose property value equals to the given value, by one vectorized scan of the column.
+        :return: a sorted numpy array of rows
+        """
+        column = self.columns.get(property_name, None)
+        if column is None:
+            return np.empty(0, dtype=np.int64)
+        return column.find_rows(property_value, self.row_num)
+
+    def is_vectorized(self, property_name):
+        """
+        :return: True if find_rows() on the property is a vectorized scan, i.e., the column is not a ObjectColumn
+        """
+        return not isinstance(self.columns.get(property_name, None), ObjectColumn)
+
+    def find_rows_by_str_prefix(self, property_name, prefix):
+        """
+        find all rows whose property value is a str starting with the prefix, the prefix is only checked once for each
+        distinct value of the column.
+        :return: a sorted numpy array of rows
+        """
+        column = self.columns.get(property_name, None)
+        if column is None:
+            return np.empty(0, dtype=np.int64)
+        if isinstance(column, StrColumn):
+            codes = [code for code, value in enumerate(column.dictionary) if value.startswith(prefix)]
+            return column.find_rows_by_codes(codes, self.row_num)
+        return np.array([row for row in column.rows(self.row_num).tolist()
+                         if type(column.get(row)) == str and column.get(row).startswith(prefix)], dtype=np.int64)
+
+    def get_node_ids(self, rows):
+        return [self.row_ids[row] for row in rows]
+
+
+class NodeProperties(MutableMapping):
+    """
+    the properties dict of one node in a ColumnarPropertyStore. It works like a dict, and every change is written to
+    the columns directly.
+    """
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, property_name):
+        column = self.store.columns.get(property_name, None)
+        if column is None or not column.has(self.row):
+            raise KeyError(property_name)
+        return column.get(self.row)
+
+    def __setitem__(self, property_name, property_value):
+        self.store.set_value(self.row, property_name, property_value)
+
+    def __delitem__(self, property_name):
+        column = self.store.columns.get(property_name, None)
+        if column is None or not column.has(self.row):
+            raise KeyError(property_name)
+        column.delete(self.row)
+
+    def __contains__(self, property_name):
+        column = self.store.columns.get(property_name, None)
+        return column is not None and column.has(self.row)
+
+    def __iter__(self):
+        row = self.row
+        return iter([property_name for property_name, column in self.store.columns.items() if column.has(row)])
+
+    def __len__(self):
+        row = self.row
+        return sum(1 for column in self.store.columns.values() if column.has(row))
+
+    def __getstate__(self):
+        return self.store, self.row
+
+    def __setstate__(self, state):
+        self.store, self.row = state
+
+    def __repr__(self):
+        return repr(dict(self))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the plan of a lookup on several node properties, see GraphData.plan_property_query().
+"""
+
+
+class PropertyQueryPlan:
+    """
+    the plan to find the nodes matching several (property name, property value) pairs.
+
+    The candidates come from one driver, i.e., the posting set of a composite index covering some properties,
+    the smallest posting set of the indexes, the rows found by scanning some columns of the columnar property store,
+    or all nodes. Then each candidate is checked by the probes, i.e.,
+    the membership in the other posting sets from the smallest one, so most candidates fail on the first probe.
+    At last, the remaining properties are compared on the node properties of the candidate one by one.
+    >>>
+        plan = graph_data.plan_property_query(name="String", version="1.0")
+        print(plan.explain())
+    >>>
+    """
+    DRIVER_COMPOSITE_INDEX = "composite index"
+    DRIVER_INDEX = "index"
+    DRIVER_COLUMN_SCAN = "column scan"
+    DRIVER_NODE_SCAN = "node scan"
+
+    def __init__(self, properties, driver, driver_names, driver_ids, probes, filters, node_num):
+        """
+        :param properties: the dict of all properties to match
+        :param driver: one of DRIVER_COMPOSITE_INDEX, DRIVER_INDEX, DRIVER_COLUMN_SCAN and DRIVER_NODE_SCAN
+        :param driver_names: the property names used by the driver
+        :param driver_ids: the candidate node ids given by the driver, None for DRIVER_NODE_SCAN
+        :param probes: a list of (property name, posting set), sorted by the size of the posting set
+        :param filters: a list of (property name, property value) checked on the node properties
+        :param node_num: the number of nodes in the graph
+        """
+        self.properties = properties
+        self.driver = driver
+        self.driver_names = driver_names
+        self.driver_ids = driver_ids
+        self.probes = probes
+        self.filters = filters
+        self.node_num = node_num
+
+    def is_empty(self):
+        """
+        :return: True if it is sure that no node matches, without checking any candidate
+        """
+        return self.driver_ids is not None and len(self.driver_ids) == 0
+
+    def candidate_num(self):
+        """
+        :return: the number of candidates need to check
+        """
+        if self.driver_ids is None:
+            return self.node_num
+        return len(self.driver_ids)
+
+    def explain(self):
+        """
+        :return: a readable description of the plan
+        """
+        lines = []
+        if self.driver == self.DRIVER_COMPOSITE_INDEX:
+            lines.append("1. composite index lookup (%s)=(%s) -> %d node ids" % (
+                ", ".join(self.driver_names), ", ".join(repr(self.properties[name]) for name in self.driver_names),
+                self.candidate_num()))
+        elif self.driver == self.DRIVER_INDEX:
+            lines.append("1. index lookup %s=%r -> %d node ids" % (
+                self.driver_names[0], self.properties[self.driver_names[0]], self.candidate_num()))
+        elif self.driver == self.DRIVER_COLUMN_SCAN:
+            lines.append("1. column scan %s -> %d node ids" % (
+                ", ".join("%s=%r" % (name, self.properties[name]) for name in self.driver_names),
+                self.candidate_num()))
+        else:
+            lines.append("1. node scan -> %d node ids" % self.candidate_num())
+        for property_name, posting in self.probes:
+            lines.append("%d. probe index %s=%r (%d node ids)" % (
+                len(lines) + 1, property_name, self.properties[property_name], len(posting)))
+        for property_name, property_value in self.filters:
+            lines.append("%d. filter %s == %r" % (len(lines) + 1, property_name, property_value))
+        if self.is_empty():
+            lines.append("no node could match, stop")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return "<PropertyQueryPlan driver=%s candidateNum=%d probeNum=%d filterNum=%d>" % (
+            self.driver, self.candidate_num(), len(self.probes), len(self.filters))
@@ -0,0 +1,1165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description: the storage engines behind GraphData.
+"""
+import sys
+from itertools import chain
+
+import numpy as np
+from networkx import MultiDiGraph
+
+from kgdt.utils import SaveLoad, estimate_size, sample_evenly
+
+
+def first_occurrence_mask(*columns):
+    """
+    mark the first occurrence of each distinct row of some aligned columns, the repeated rows after it are False.
+    :param columns: some numpy arrays with the same length
+    :return: a bool numpy array
+    """
+    row_num = len(columns[0])
+    mask = np.zeros(row_num, dtype=bool)
+    if row_num == 0:
+        return mask
+    try:
+        # lexsort is stable, so the first row of each group in the sorted order is the first occurrence
+        order = np.lexsort(columns[::-1])
+    except TypeError:
+        seen = set()
+        for index, row in enumerate(zip(*[column.tolist() for column in columns])):
+            if row not in seen:
+                seen.add(row)
+                mask[index] = True
+        return mask
+
+    is_same_as_previous = np.ones(row_num - 1, dtype=bool)
+    for column in columns:
+        sorted_column = column[order]
+        is_same_as_previous &= sorted_column[1:] == sorted_column[:-1]
+    is_first = np.ones(row_num, dtype=bool)
+    is_first[1:] = ~is_same_as_previous
+    mask[order[is_first]] = True
+    return mask
+
+
+class GraphStorage(SaveLoad):
+    """
+    The base class of the storage engines that keep the nodes and relations of a GraphData.
+
+    A storage engine only knows how to store node jsons and (startId, relation type code, endId) triples,
+    the labels, the indexes, the relation count and the relation type symbol table are maintained by GraphData.
+    The relation type is always given as the int code from GraphData.relation_type_table,
+    and every relation is returned as a (startId, relation type code, endId) tuple.
+    """
+
+    TYPE_DTYPE = np.int32
+
+    def add_node(self, node_id, node_json):
+        """
+        add a node json to the storage. if the node already exists, its node json will be updated by the given one.
+        :param node_id: the id of the node
+        :param node_json: the node json dict
+        :return:
+        """
+        raise NotImplementedError
+
+    def add_nodes(self, node_id_json_pairs):
+        """
+        add many node jsons to the storage.
+        :param node_id_json_pairs: a iterable of (node_id, node_json)
+        :return:
+        """
+        for node_id, node_json in node_id_json_pairs:
+            self.add_node(node_id, node_json)
+
+    def add_relations_bulk(self, start_ids, relation_type_codes, end_ids):
+        """
+        add many relations at once. A relation is dropped if one of its nodes not exist, it already exists, or it
+        is repeated in the input (only the first one is added).
+        :param start_ids: a numpy array of the start node ids
+        :param relation_type_codes: a numpy array of the relation type codes
+        :param end_ids: a numpy array of the end node ids
+        :return: a bool numpy array, True for each accepted row
+        """
+        accepted = np.fromiter((self.has_node(start_id) and self.has_node(end_id)
+                                for start_id, end_id in zip(start_ids.tolist(), end_ids.tolist())),
+                               dtype=bool, count=len(start_ids))
+        accepted &= first_occurrence_mask(start_ids, relation_type_codes, end_ids)
+        for index in np.flatnonzero(accepted).tolist():
+            start_id, code, end_id = start_ids[index].item(), int(relation_type_codes[index]), end_ids[index].item()
+            if self.has_relation(start_id, code, end_id):
+                accepted[index] = False
+            else:
+                self.add_relation(start_id, code, end_id)
+        return accepted
+
+    def remove_node(self, node_id):
+        """
+        remove a node and all relations on it.
+        :param node_id: the id of the node
+        :return: None if the node not exist, otherwise, (node_json, out_relations, in_relations)
+        """
+        raise NotImplementedError
+
+    def remove_nodes(self, node_ids):
+        """
+        remove many nodes and all relations on them.
+        :param node_ids: a iterable of node ids, the ids not exist are ignored
+        :return: (a list of (node_id, node_json) of the removed nodes, a set of the removed relations)
+        """
+        removed_nodes = []
+        removed_relations = set()
+        for node_id in node_ids:
+            result = self.remove_node(node_id)
+            if result is None:
+                continue
+            node_json, out_relations, in_relations = result
+            removed_nodes.append((node_id, node_json))
+            removed_relations.update(out_relations)
+            removed_relations.update(in_relations)
+        return removed_nodes, removed_relations
+
+    def has_node(self, node_id):
+        raise NotImplementedError
+
+    def get_node(self, node_id):
+        """
+        get the node json of the node.
+        :param node_id: the id of the node
+        :return: None if the node not exist
+        """
+        raise NotImplementedError
+
+    def node_ids(self):
+        """
+        :return: a iterator of all node ids
+        """
+        raise NotImplementedError
+
+    def nodes(self):
+        """
+        :return: a iterator of all (node_id, node_json) pairs, in the same order of node_ids()
+        """
+        raise NotImplementedError
+
+    def node_num(self):
+        raise NotImplementedError
+
+    def add_relation(self, start_id, relation_type_code, end_id, **properties):
+        """
+        add a relation to the storage. the caller must make sure both nodes exist and the relation not exist.
+        :param start_id: the id of the start node
+        :param relation_type_code: the int code of the relation type
+        :param end_id: the id of the end node
+        :param properties: the extra properties of the relation
+        :return:
+        """
+        raise NotImplementedError
+
+    def remove_relation(self, start_id, relation_type_code, end_id):
+        """
+        :return: True, the relation is removed. False, the relation not exist.
+        """
+        raise NotImplementedError
+
+    def remove_relations_of_type(self, relation_type_code):
+        """
+        remove all relations with the given relation type code.
+        :return: a list of the removed relations
+        """
+        relations = list(self.relations_of_type(relation_type_code))
+        for start_id, code, end_id in relations:
+            self.remove_relation(start_id, code, end_id)
+        return relations
+
+    def remove_all_relations(self):
+        """
+        remove all relations, the nodes are kept.
+        """
+        for start_id, code, end_id in list(self.relations()):
+            self.remove_relation(start_id, code, end_id)
+
+    def has_relation(self, start_id, relation_type_code, end_id):
+        raise NotImplementedError
+
+    def has_any_relation(self, start_id, end_id):
+        raise NotImplementedError
+
+    def out_relations(self, node_id):
+        """
+        :return: a iterator of all relations start from the node
+        """
+        raise NotImplementedError
+
+    def in_relations(self, node_id):
+        """
+        :return: a iterator of all relations end with the node
+        """
+        raise NotImplementedError
+
+    def out_relations_of_type(self, node_id, relation_type_code):
+        """
+        :return: a iterator of the relations start from the node with the given relation type code
+        """
+        return (r for r in self.out_relations(node_id) if r[1] == relation_type_code)
+
+    def in_relations_of_type(self, node_id, relation_type_code):
+        """
+        :return: a iterator of the relations end with the node with the given relation type code
+        """
+        return (r for r in self.in_relations(node_id) if r[1] == relation_type_code)
+
+    def relations(self):
+        """
+        :return: a iterator of all relations in the storage
+        """
+        raise NotImplementedError
+
+    def relation_arrays(self):
+        """
+        get all relations as three aligned numpy arrays, so the relations could be filtered or counted by type
+        without creating a tuple for each relation.
+        :return: (start_ids, relation_type_codes, end_ids)
+        """
+        relations = list(self.relations())
+        if not relations:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.TYPE_DTYPE), np.empty(0, dtype=np.int64)
+        start_ids, codes, end_ids = zip(*relations)
+        return np.array(start_ids), np.array(codes, dtype=self.TYPE_DTYPE), np.array(end_ids)
+
+    def relations_of_type(self, relation_type_code):
+        """
+        :return: a iterator of all relations with the given relation type code
+        """
+        start_ids, codes, end_ids = self.relation_arrays()
+        is_match = codes == relation_type_code
+        return zip(start_ids[is_match].tolist(), codes[is_match].tolist(), end_ids[is_match].tolist())
+
+    def relation_num(self):
+        raise NotImplementedError
+
+    def get_relation_properties(self, start_id, relation_type_code, end_id):
+        """
+        get the extra properties of a relation.
+        :return: None if the relation not exist, otherwise a dict.
+        """
+        raise NotImplementedError
+
+    def relations_with_properties(self):
+        """
+        :return: a iterator of (start_id, relation_type_code, end_id, properties) of the relations with some extra
+        properties, the properties dict is the one kept in the storage
+        """
+        for start_id, code, end_id in self.relations():
+            properties = self.get_relation_properties(start_id, code, end_id)
+            if properties:
+                yield start_id, code, end_id, properties
+
+    def to_networkx(self, relation_types=None):
+        """
+        :param relation_types: the relation type string of each code, e.g., RelationTypeTable.types, the key of each
+        edge is its relation type string. None to keep the relation type code as the key.
+        :return: a new networkx MultiDiGraph with the same content. The node attributes and the edge properties are
+        copied into new dicts, but the properties dict of each node is shared.
+        """
+        graph = MultiDiGraph()
+        graph.add_nodes_from((node_id, dict(node_json)) for node_id, node_json in self.nodes())
+        graph.add_edges_from((start_id, end_id, code if relation_types is None else relation_types[code],
+                              dict(self.get_relation_properties(start_id, code, end_id)))
+                             for start_id, code, end_id in self.relations())
+        return graph
+
+    def memory_report(self, sample_size=None, seen=None):
+        """
+        estimate the bytes of the nodes, the relations and the relation type index, see GraphData.memory_report().
+        The properties and the labels in the node jsons are not counted.
+        :param sample_size: None to measure everything, or the number of items to measure in each large container.
+        :param seen: a set of ids of the objects already counted, see estimate_size().
+        :return: a dict, e.g., {"nodes": 1024, "relations": 2048, "relation_index": 512}
+        """
+        raise NotImplementedError
+
+    def sample_node_jsons(self, sample_size):
+        """
+        take some evenly spaced node jsons.
+        :param sample_size: the number of node jsons to take, None to take all
+        :return: (a list of node jsons, the node number / the number of node jsons taken)
+        """
+        return sample_evenly((node_json for node_id, node_json in self.nodes()), self.node_num(), sample_size)
+
+    def _estimate_node_jsons_size(self, sample_size):
+        node_jsons, scale = self.sample_node_jsons(sample_size)
+        # only the dict itself, the properties and the labels are counted by GraphData
+        return int(sum(sys.getsizeof(node_json) for node_json in node_jsons) * scale)
+
+
+class MultiDiGraphStorage(GraphStorage):
+    """
+    the default storage engine, every node and relation is kept in a networkx MultiDiGraph.
+    The key of each edge is the relation type code.
+
+    Besides the MultiDiGraph, a adjacency index grouped by relation type is maintained, i.e.,
+    type_to_out_adjacency[code][start_id] is the end ids, type_to_in_adjacency[code][end_id] is the start ids.
+    The neighbor ids are kept in a set, or as a single id if there is only one. So the relations of one type,
+    or of one type on one node, are found without scanning other relations.
+    The MultiDiGraph must not be changed directly, otherwise the index will be out of date.
+    """
+
+    def __init__(self, graph=None):
+        if graph is None:
+            graph = MultiDiGraph()
+        self.graph = graph
+        self.type_to_out_adjacency = {}
+        self.type_to_in_adjacency = {}
+        for start_id, end_id, code in graph.edges(keys=True):
+            self.__index_relation(start_id, code, end_id)
+
+    @staticmethod
+    def __adjacency_add(adjacency, node_id, neighbor_id):
+        # most nodes have only one neighbor for a relation type, the neighbor id is stored without a set to save memory
+        neighbors = adjacency.get(node_id, adjacency)
+        if neighbors is adjacency:
+            adjacency[node_id] = neighbor_id
+        elif type(neighbors) == set:
+            neighbors.add(neighbor_id)
+        elif neighbors != neighbor_id:
+            adjacency[node_id] = {neighbors, neighbor_id}
+
+    @staticmethod
+    def __adjacency_remove(adjacency, node_id, neighbor_id):
+        neighbors = adjacency[node_id]
+        if type(neighbors) != set:
+            del adjacency[node_id]
+            return
+        neighbors.discard(neighbor_id)
+        if len(neighbors) == 1:
+            adjacency[node_id] = neighbors.pop()
+
+    @staticmethod
+    def __adjacency_get(adjacency, node_id):
+        neighbors = adjacency.get(node_id, adjacency)
+        if neighbors is adjacency:
+            return ()
+        if type(neighbors) == set:
+            return neighbors
+        return neighbors,
+
+    def __index_relation(self, start_id, code, end_id):
+        if code not in self.type_to_out_adjacency:
+            self.type_to_out_adjacency[code] = {}
+            self.type_to_in_adjacency[code] = {}
+        self.__adjacency_add(self.type_to_out_adjacency[code], start_id, end_id)
+        self.__adjacency_add(self.type_to_in_adjacency[code], end_id, start_id)
+
+    def __unindex_relation(self, start_id, code, end_id):
+        self.__adjacency_remove(self.type_to_out_adjacency[code], start_id, end_id)
+        self.__adjacency_remove(self.type_to_in_adjacency[code], end_id, start_id)
+
+    def add_node(self, node_id, node_json):
+        self.graph.add_node(node_id, **node_json)
+
+    def add_nodes(self, node_id_json_pairs):
+        self.graph.add_nodes_from(node_id_json_pairs)
+
+    def add_relations_bulk(self, start_ids, relation_type_codes, end_ids):
+        accepted = first_occurrence_mask(start_ids, relation_type_codes, end_ids)
+        nodes = self.graph.nodes
+        has_edge = self.graph.has_edge
+        new_edges = []
+        start_ids, relation_type_codes, end_ids = start_ids.tolist(), relation_type_codes.tolist(), end_ids.tolist()
+        for index in np.flatnonzero(accepted).tolist():
+            start_id, code, end_id = start_ids[index], relation_type_codes[index], end_ids[index]
+            if start_id in nodes and end_id in nodes and not has_edge(start_id, end_id, code):
+                new_edges.append((start_id, end_id, code))
+            else:
+                accepted[index] = False
+        self.graph.add_edges_from(new_edges)
+        for start_id, end_id, code in new_edges:
+            self.__index_relation(start_id, code, end_id)
+        return accepted
+
+    def remove_node(self, node_id):
+        if node_id not in self.graph.nodes:
+            return None
+        node_json = self.graph.nodes[node_id]
+        out_relations = set(self.out_relations(node_id))
+        in_relations = set(self.in_relations(node_id))
+        for start_id, code, end_id in out_relations | in_relations:
+            self.__unindex_relation(start_id, code, end_id)
+        self.graph.remove_node(node_id)
+        return node_json, out_relations, in_relations
+
+    def remove_nodes(self, node_ids):
+        graph = self.graph
+        node_ids = [node_id for node_id in dict.fromkeys(node_ids) if node_id in graph.nodes]
+        removed_nodes = [(node_id, graph.nodes[node_id]) for node_id in node_ids]
+        removed_relations = set()
+        # read the adjacency dicts directly, the edge views cost much more on many nodes
+        succ = graph.succ
+        pred = graph.pred
+        for node_id in node_ids:
+            for end_id, codes in succ[node_id].items():
+                removed_relations.update((node_id, code, end_id) for code in codes)
+            for start_id, codes in pred[node_id].items():
+                removed_relations.update((start_id, code, node_id) for code in codes)
+
+        # the index entries of the removed nodes are dropped at once, only the entries of their neighbors are updated
+        removed_node_ids = set(node_ids)
+        for start_id, code, end_id in removed_relations:
+            if start_id not in removed_node_ids:
+                self.__adjacency_remove(self.type_to_out_adjacency[code], start_id, end_id)
+            if end_id not in removed_node_ids:
+                self.__adjacency_remove(self.type_to_in_adjacency[code], end_id, start_id)
+        for adjacency in list(self.type_to_out_adjacency.values()) + list(self.type_to_in_adjacency.values()):
+            for node_id in node_ids:
+                adjacency.pop(node_id, None)
+        graph.remove_nodes_from(node_ids)
+        return removed_nodes, removed_relations
+
+    def has_node(self, node_id):
+        return node_id in self.graph.nodes
+
+    def get_node(self, node_id):
+        return self.graph.nodes.get(node_id, None)
+
+    def node_ids(self):
+        return iter(self.graph.nodes)
+
+    def nodes(self):
+        return iter(self.graph.nodes(data=True))
+
+    def node_num(self):
+        return len(self.graph.nodes)
+
+    def add_relation(self, start_id, relation_type_code, end_id, **properties):
+        self.graph.add_edge(start_id, end_id, relation_type_code, **properties)
+        self.__index_relation(start_id, relation_type_code, end_id)
+
+    def remove_relation(self, start_id, relation_type_code, end_id):
+        if not self.graph.has_edge(start_id, end_id, relation_type_code):
+            return False
+        self.graph.remove_edge(start_id, end_id, relation_type_code)
+        self.__unindex_relation(start_id, relation_type_code, end_id)
+        return True
+
+    def remove_relations_of_type(self, relation_type_code):
+        relations = list(self.relations_of_type(relation_type_code))
+        self.graph.remove_edges_from([(start_id, end_id, code) for start_id, code, end_id in relations])
+        # the whole adjacency of the type is dropped, instead of removing the relations from it one by one
+        self.type_to_out_adjacency.pop(relation_type_code, None)
+        self.type_to_in_adjacency.pop(relation_type_code, None)
+        return relations
+
+    def remove_all_relations(self):
+        # the edge dicts of each node are cleared in place, instead of removing the edges one by one
+        for neighbors in chain(self.graph._succ.values(), self.graph._pred.values()):
+            neighbors.clear()
+        self.type_to_out_adjacency = {}
+        self.type_to_in_adjacency = {}
+
+    def has_relation(self, start_id, relation_type_code, end_id):
+        return self.graph.has_edge(start_id, end_id, relation_type_code)
+
+    def has_any_relation(self, start_id, end_id):
+        return self.graph.has_edge(start_id, end_id)
+
+    def out_relations(self, node_id):
+        if node_id not in self.graph.nodes:
+            return iter(())
+        return ((r[0], r[2], r[1]) for r in self.graph.out_edges(node_id, keys=True))
+
+    def in_relations(self, node_id):
+        if node_id not in self.graph.nodes:
+            return iter(())
+        return ((r[0], r[2], r[1]) for r in self.graph.in_edges(node_id, keys=True))
+
+    def out_relations_of_type(self, node_id, relation_type_code):
+        end_ids = self.__adjacency_get(self.type_to_out_adjacency.get(relation_type_code, {}), node_id)
+        return ((node_id, relation_type_code, end_id) for end_id in end_ids)
+
+    def in_relations_of_type(self, node_id, relation_type_code):
+        start_ids = self.__adjacency_get(self.type_to_in_adjacency.get(relation_type_code, {}), node_id)
+        return ((start_id, relation_type_code, node_id) for start_id in start_ids)
+
+    def relations(self):
+        return ((r[0], r[2], r[1]) for r in self.graph.edges(keys=True))
+
+    def relation_arrays(self):
+        # the keys of the edges between a pair of nodes are the relation type codes, so the arrays are filled from the
+        # adjacency dicts of the MultiDiGraph by chained iterators, without creating a tuple for each relation
+        adjacency = self.graph._adj
+        pair_nums = np.fromiter(map(len, adjacency.values()), dtype=np.int64, count=len(adjacency))
+        end_ids = np.fromiter(chain.from_iterable(adjacency.values()), dtype=np.int64, count=int(pair_nums.sum()))
+        key_dicts = list(chain.from_iterable(map(dict.values, adjacency.values())))
+        key_nums = np.fromiter(map(len, key_dicts), dtype=np.int64, count=len(key_dicts))
+        codes = np.fromiter(chain.from_iterable(key_dicts), dtype=self.TYPE_DTYPE, count=int(key_nums.sum()))
+        start_ids = np.repeat(np.fromiter(adjacency, dtype=np.int64, count=len(adjacency)), pair_nums)
+        return np.repeat(start_ids, key_nums), codes, np.repeat(end_ids, key_nums)
+
+    def relations_with_properties(self):
+        return ((start_id, code, end_id, properties)
+                for start_id, end_id, code, properties in self.graph.edges(keys=True, data=True) if properties)
+
+    def relations_of_type(self, relation_type_code):
+        out_adjacency = self.type_to_out_adjacency.get(relation_type_code, {})
+        return ((start_id, relation_type_code, end_id)
+                for start_id, end_ids in out_adjacency.items()
+                for end_id in (end_ids if type(end_ids) == set else (end_ids,)))
+
+    def relation_num(self):
+        return self.graph.number_of_edges()
+
+    def get_relation_properties(self, start_id, relation_type_code, end_id):
+        return self.graph.get_edge_data(start_id, end_id, relation_type_code, None)
+
+    def to_networkx(self, relation_types=None):
+        graph = MultiDiGraph()
+        graph.add_nodes_from((node_id, dict(node_json)) for node_id, node_json in self.graph.nodes(data=True))
+        graph.add_edges_from((start_id, end_id, code if relation_types is None else relation_types[code], dict(data))
+                             for start_id, end_id, code, data in self.graph.edges(keys=True, data=True))
+        return graph
+
+    def sample_node_jsons(self, sample_size):
+        return sample_evenly(self.graph._node.values(), len(self.graph._node), sample_size)
+
+    def memory_report(self, sample_size=None, seen=None):
+        if seen is None:
+            seen = set()
+        graph = self.graph
+        # the edge dicts in graph._pred are the same ones in graph._adj, only the dicts of each node are counted
+        pred_dicts, scale = sample_evenly(graph._pred.values(), len(graph._pred), sample_size)
+        pred_size = sys.getsizeof(graph._pred) + int(sum(sys.getsizeof(pred_dict) for pred_dict in pred_dicts) * scale)
+        return {
+            "nodes": self._estimate_node_jsons_size(sample_size) + sys.getsizeof(graph._node),
+            "relations": estimate_size(graph._adj, sample_size, seen) + pred_size,
+            "relation_index": (estimate_size(self.type_to_out_adjacency, sample_size, seen)
+                               + estimate_size(self.type_to_in_adjacency, sample_size, seen)),
+        }
+
+
+class CompactGraphStorage(GraphStorage):
+    """
+    A storage engine for large graphs. Each node is given a dense integer slot, the consolidated relations are kept
+    in CSR (grouped by start slot) and CSC (grouped by end slot) numpy arrays together with the relation type codes.
+    Each row is sorted by (type, neighbor slot), so the relations of one type on a node are a continuous range of
+    the row. The positions of the CSR arrays are also grouped by type (type_indptr/type_positions), so all relations
+    of one type are found without scanning the others.
+
+    New relations go to a write buffer first and are merged into the arrays when the buffer is full or a whole-graph
+    scan is needed. A removed relation in the arrays is only marked as dead, and will be dropped on next merge.
+    The slot of a removed node is kept in a free list and given to the next new node, so the number of slots is
+    bounded by the max number of nodes at any time. The node id must be int.
+    >>>
+        graph_data = GraphData(backend=GraphData.BACKEND_COMPACT)
+    >>>
+    """
+
+    DEFAULT_BUFFER_SIZE = 100000
+    RELATION_CHUNK_SIZE = 65536
+    SLOT_DTYPE = np.int32
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+
+        self.id_to_slot = {}
+        self.slot_to_node = []
+        self.slot_ids = np.empty(0, dtype=np.int64)
+        self.free_slots = []
+        self.node_count = 0
+
+        self.out_indptr = np.zeros(1, dtype=np.int64)
+        self.out_targets = np.empty(0, dtype=self.SLOT_DTYPE)
+        self.out_types = np.empty(0, dtype=self.TYPE_DTYPE)
+        self.out_alive = np.empty(0, dtype=bool)
+
+        self.in_indptr = np.zeros(1, dtype=np.int64)
+        self.in_sources = np.empty(0, dtype=self.SLOT_DTYPE)
+        self.in_types = np.empty(0, dtype=self.TYPE_DTYPE)
+        self.in_alive = np.empty(0, dtype=bool)
+        self.dead_num = 0
+
+        self.type_indptr = np.zeros(1, dtype=np.int64)
+        self.type_positions = np.empty(0, dtype=np.int64)
+
+        self.buffer_out = {}
+        self.buffer_in = {}
+        self.buffer_num = 0
+
+        self.relation_properties = {}
+        self.relation_count = 0
+        self.sorted_id_cache = None
+
+    def __setstate__(self, state):
+        if "free_slots" not in state:
+            # the slots of the removed nodes were not reused
+            state["free_slots"] = [slot for slot, node_json in enumerate(state["slot_to_node"]) if node_json is None]
+        self.__dict__.update(state)
+
+    def __get_slot(self, node_id):
+        return self.id_to_slot.get(node_id, None)
+
+    def slots_of(self, node_ids):
+        """
+        get the slots of many nodes at once.
+        :param node_ids: a numpy array of node ids
+        :return: a numpy array of slots, -1 for the node not exist
+        """
+        if self.sorted_id_cache is None:
+            ids = np.fromiter(self.id_to_slot.keys(), dtype=np.int64, count=len(self.id_to_slot))
+            slots = np.fromiter(self.id_to_slot.values(), dtype=np.int64, count=len(self.id_to_slot))
+            order = np.argsort(ids)
+            self.sorted_id_cache = (ids[order], slots[order])
+        sorted_ids, sorted_slots = self.sorted_id_cache
+
+        node_ids = np.asarray(node_ids)
+        if node_ids.dtype.kind not in "iu":
+            return np.array([self.id_to_slot.get(node_id, -1) for node_id in node_ids.tolist()], dtype=np.int64)
+        if len(sorted_ids) == 0:
+            return np.full(len(node_ids), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(sorted_ids, node_ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[positions] == node_ids, sorted_slots[positions], -1)
+
+    def add_node(self, node_id, node_json):
+        slot = self.__get_slot(node_id)
+        if slot is not None:
+            self.slot_to_node[slot].update(node_json)
+            return
+        if not isinstance(node_id, (int, np.integer)):
+            raise TypeError("CompactGraphStorage only support int node id, got %r" % (node_id,))
+
+        if self.free_slots:
+            # the relations on the slot are all removed with the old node, the dead ones left in the arrays are
+            # never matched and are dropped on next merge
+            slot = self.free_slots.pop()
+            self.slot_to_node[slot] = dict(node_json)
+        else:
+            slot = len(self.slot_to_node)
+            if slot >= len(self.slot_ids):
+                new_slot_ids = np.empty(max(16, 2 * len(self.slot_ids)), dtype=np.int64)
+                new_slot_ids[:len(self.slot_ids)] = self.slot_ids
+                self.slot_ids = new_slot_ids
+            self.slot_to_node.append(dict(node_json))
+        self.slot_ids[slot] = node_id
+        self.id_to_slot[node_id] = slot
+        self.node_count += 1
+        self.sorted_id_cache = None
+
+    def remove_node(self, node_id):
+        slot = self.__get_slot(node_id)
+        if slot is None:
+            return None
+        out_relations = set(self.out_relations(node_id))
+        in_relations = set(self.in_relations(node_id))
+        for start_id, code, end_id in out_relations | in_relations:
+            self.remove_relation(start_id, code, end_id)
+
+        node_json = self.slot_to_node[slot]
+        self.slot_to_node[slot] = None
+        self.free_slots.append(slot)
+        self.id_to_slot.pop(node_id)
+        self.node_count -= 1
+        self.sorted_id_cache = None
+        return node_json, out_relations, in_relations
+
+    def remove_nodes(self, node_ids):
+        """
+        the relations on the nodes are found and dropped by one scan of the arrays, instead of one by one.
+        """
+        node_ids = [node_id for node_id in dict.fromkeys(node_ids) if node_id in self.id_to_slot]
+        if not node_ids:
+            return [], set()
+        slots = np.array([self.id_to_slot[node_id] for node_id in node_ids], dtype=np.int64)
+        is_removed_slot = np.zeros(len(self.slot_to_node), dtype=bool)
+        is_removed_slot[slots] = True
+
+        self.flush()
+        start_slots = np.repeat(np.arange(len(self.out_indptr) - 1, dtype=self.SLOT_DTYPE), np.diff(self.out_indptr))
+        positions = np.flatnonzero(is_removed_slot[start_slots] | is_removed_slot[self.out_targets])
+        removed_relations = self.__kill_relations(start_slots[positions], positions)
+        if self.relation_properties:
+            self.relation_properties = {key: properties for key, properties in self.relation_properties.items()
+                                        if not is_removed_slot[key[0]] and not is_removed_slot[key[2]]}
+
+        removed_nodes = []
+        for node_id, slot in zip(node_ids, slots.tolist()):
+            removed_nodes.append((node_id, self.slot_to_node[slot]))
+            self.slot_to_node[slot] = None
+            self.id_to_slot.pop(node_id)
+        self.free_slots.extend(slots.tolist())
+        self.node_count -= len(node_ids)
+        self.sorted_id_cache = None
+        return removed_nodes, removed_relations
+
+    def __kill_relations(self, start_slots, positions):
+        """
+        drop the relations at the positions of the CSR arrays, the write buffer must be flushed before.
+        :return: a set of the dropped relations
+        """
+        codes = self.out_types[positions]
+        relations = set(zip(self.slot_ids[start_slots].tolist(), codes.tolist(),
+                            self.slot_ids[self.out_targets[positions]].tolist()))
+        self.out_alive[positions] = False
+        self.dead_num += len(positions)
+        self.relation_count -= len(positions)
+        # drop the dead relations from the arrays, the CSC arrays are rebuilt from the CSR arrays
+        self.flush()
+        return relations
+
+    def has_node(self, node_id):
+        return node_id in self.id_to_slot
+
+    def get_node(self, node_id):
+        slot = self.__get_slot(node_id)
+        if slot is None:
+            return None
+        return self.slot_to_node[slot]
+
+    def node_ids(self):
+        return iter(self.id_to_slot)
+
+    def nodes(self):
+        return ((node_id, self.slot_to_node[slot]) for node_id, slot in self.id_to_slot.items())
+
+    def node_num(self):
+        return self.node_count
+
+    @staticmethod
+    def __type_range(indptr, types, slot, code):
+        """
+        get the range of the relations with the given type in the row of the slot.
+        :return: (range_start, range_end), the range is empty if no such relation
+        """
+        if slot >= len(indptr) - 1:
+            return 0, 0
+        row_start = indptr[slot]
+        row_end = indptr[slot + 1]
+        if row_start == row_end:
+            return 0, 0
+        row_types = types[row_start:row_end]
+        return row_start + row_types.searchsorted(code, "left"), row_start + row_types.searchsorted(code, "right")
+
+    def __find_in_row(self, indptr, neighbors, types, alive, slot, code, neighbor_slot):
+        range_start, range_end = self.__type_range(indptr, types, slot, code)
+        if range_start == range_end:
+            return -1
+        position = range_start + neighbors[range_start:range_end].searchsorted(neighbor_slot)
+        if position < range_end and neighbors[position] == neighbor_slot and alive[position]:
+            return position
+        return -1
+
+    def __find_in_array(self, start_slot, code, end_slot):
+        """
+        find the position of a relation in the CSR arrays, the row of each start slot is sorted by (type, end slot).
+        :return: -1 if not found
+        """
+        return self.__find_in_row(self.out_indptr, self.out_targets, self.out_types, self.out_alive,
+                                  start_slot, code, end_slot)
+
+    def __find_in_in_array(self, start_slot, code, end_slot):
+        return self.__find_in_row(self.in_indptr, self.in_sources, self.in_types, self.in_alive,
+                                  end_slot, code, start_slot)
+
+    def add_relation(self, start_id, relation_type_code, end_id, **properties):
+        start_slot = self.id_to_slot[start_id]
+        end_slot = self.id_to_slot[end_id]
+        code = relation_type_code
+
+        self.buffer_out.setdefault(start_slot, set()).add((code, end_slot))
+        self.buffer_in.setdefault(end_slot, set()).add((code, start_slot))
+        self.buffer_num += 1
+        self.relation_count += 1
+        if properties:
+            self.relation_properties[(start_slot, code, end_slot)] = dict(properties)
+
+        if self.buffer_num >= self.buffer_size:
+            self.flush()
+
+    def __relation_keys(self, first_slots, codes, second_slots, type_num):
+        """
+        combine (first slot, type code, second slot) of each relation into one int64 key, the keys sort in the same
+        order as the tuples.
+        :return: None if the key may overflow
+        """
+        slot_num = len(self.slot_to_node)
+        if slot_num * slot_num * type_num >= 2 ** 62:
+            return None
+        return (first_slots.astype(np.int64) * type_num + codes) * slot_num + second_slots
+
+    def add_relations_bulk(self, start_ids, relation_type_codes, end_ids):
+        start_slots = self.slots_of(start_ids)
+        end_slots = self.slots_of(end_ids)
+        codes = np.asarray(relation_type_codes, dtype=self.TYPE_DTYPE)
+
+        accepted = (start_slots >= 0) & (end_slots >= 0)
+        # the keys of the rows with missing nodes may collide with others, so only the valid rows are compared
+        candidates = np.flatnonzero(accepted)
+        keys = self.__relation_keys(start_slots[candidates], codes[candidates], end_slots[candidates],
+                                    int(codes.max()) + 1)
+        if keys is None:
+            is_first = first_occurrence_mask(start_slots[candidates], codes[candidates], end_slots[candidates])
+        else:
+            is_first = first_occurrence_mask(keys)
+        accepted[candidates[~is_first]] = False
+        self.flush()
+        candidates = np.flatnonzero(accepted)
+        is_exist = self.__exist_in_array(start_slots[candidates], codes[candidates], end_slots[candidates])
+        accepted[candidates[is_exist]] = False
+
+        self.__merge(start_slots[accepted].astype(self.SLOT_DTYPE), codes[accepted],
+                     end_slots[accepted].astype(self.SLOT_DTYPE))
+        self.relation_count += int(accepted.sum())
+        return accepted
+
+    def __exist_in_array(self, start_slots, codes, end_slots):
+        """
+        check many relations at once in the CSR arrays, the write buffer must be flushed before.
+        :return: a bool numpy array
+        """
+        if len(start_slots) == 0 or len(self.out_targets) == 0:
+            return np.zeros(len(start_slots), dtype=bool)
+
+        type_num = int(max(self.out_types.max(), codes.max())) + 1
+        keys = self.__relation_keys(start_slots, codes, end_slots, type_num)
+        if keys is None:
+            return np.array([self.__find_in_array(start_slot, code, end_slot) != -1
+                             for start_slot, code, end_slot in zip(start_slots.tolist(), codes.tolist(),
+                                                                   end_slots.tolist())], dtype=bool)
+
+        # the CSR arrays are sorted by (start slot, type, end slot), so are the combined keys
+        array_start_slots = np.repeat(np.arange(len(self.out_indptr) - 1, dtype=np.int64), np.diff(self.out_indptr))
+        array_keys = self.__relation_keys(array_start_slots, self.out_types, self.out_targets, type_num)
+        positions = np.minimum(np.searchsorted(array_keys, keys), len(array_keys) - 1)
+        return array_keys[positions] == keys
+
+    def remove_relation(self, start_id, relation_type_code, end_id):
+        start_slot = self.__get_slot(start_id)
+        end_slot = self.__get_slot(end_id)
+        code = relation_type_code
+        if start_slot is None or end_slot is None:
+            return False
+
+        buffered = self.buffer_out.get(start_slot, None)
+        if buffered is not None and (code, end_slot) in buffered:
+            buffered.remove((code, end_slot))
+            self.buffer_in[end_slot].remove((code, start_slot))
+            self.buffer_num -= 1
+        else:
+            position = self.__find_in_array(start_slot, code, end_slot)
+            if position == -1:
+                return False
+            self.out_alive[position] = False
+            self.in_alive[self.__find_in_in_array(start_slot, code, end_slot)] = False
+            self.dead_num += 1
+
+        self.relation_properties.pop((start_slot, code, end_slot), None)
+        self.relation_count -= 1
+        return True
+
+    def remove_relations_of_type(self, relation_type_code):
+        code = relation_type_code
+        self.flush()
+        if not 0 <= code < len(self.type_indptr) - 1:
+            return []
+        positions = self.type_positions[self.type_indptr[code]:self.type_indptr[code + 1]].astype(np.int64)
+        start_slots = np.searchsorted(self.out_indptr, positions, "right") - 1
+        relations = list(self.__kill_relations(start_slots, positions))
+        if self.relation_properties:
+            self.relation_properties = {key: properties for key, properties in self.relation_properties.items()
+                                        if key[1] != code}
+        return relations
+
+    def remove_all_relations(self):
+        # all arrays and the write buffer are reset at once, nothing is left to merge
+        slot_num = len(self.slot_to_node)
+        self.out_indptr = np.zeros(slot_num + 1, dtype=np.int64)
+        self.out_targets = np.empty(0, dtype=self.SLOT_DTYPE)
+        self.out_types = np.empty(0, dtype=self.TYPE_DTYPE)
+        self.out_alive = np.empty(0, dtype=bool)
+
+        self.in_indptr = np.zeros(slot_num + 1, dtype=np.int64)
+        self.in_sources = np.empty(0, dtype=self.SLOT_DTYPE)
+        self.in_types = np.empty(0, dtype=self.TYPE_DTYPE)
+        self.in_alive = np.empty(0, dtype=bool)
+        self.dead_num = 0
+
+        self.type_indptr = np.zeros(1, dtype=np.int64)
+        self.type_positions = np.empty(0, dtype=np.int64)
+
+        self.buffer_out = {}
+        self.buffer_in = {}
+        self.buffer_num = 0
+
+        self.relation_properties = {}
+        self.relation_count = 0
+
+    def has_relation(self, start_id, relation_type_code, end_id):
+        start_slot = self.__get_slot(start_id)
+        end_slot = self.__get_slot(end_id)
+        code = relation_type_code
+        if start_slot is None or end_slot is None:
+            return False
+        buffered = self.buffer_out.get(start_slot, None)
+        if buffered is not None and (code, end_slot) in buffered:
+            return True
+        return self.__find_in_array(start_slot, code, end_slot) != -1
+
+    def has_any_relation(self, start_id, end_id):
+        start_slot = self.__get_slot(start_id)
+        end_slot = self.__get_slot(end_id)
+        if start_slot is None or end_slot is None:
+            return False
+        # the shorter one of the out row of the start and the in row of the end is searched
+        out_buffered = self.buffer_out.get(start_slot, ())
+        in_buffered = self.buffer_in.get(end_slot, ())
+        if len(out_buffered) <= len(in_buffered):
+            is_buffered = any(t_end_slot == end_slot for t_code, t_end_slot in out_buffered)
+        else:
+            is_buffered = any(t_start_slot == start_slot for t_code, t_start_slot in in_buffered)
+        if is_buffered:
+            return True
+        if self.__row_size(self.out_indptr, start_slot) <= self.__row_size(self.in_indptr, end_slot):
+            return self.__has_neighbor_in_row(self.out_indptr, self.out_targets, self.out_types, self.out_alive,
+                                              start_slot, end_slot)
+        return self.__has_neighbor_in_row(self.in_indptr, self.in_sources, self.in_types, self.in_alive,
+                                          end_slot, start_slot)
+
+    @staticmethod
+    def __row_size(indptr, slot):
+        if slot >= len(indptr) - 1:
+            return 0
+        return indptr[slot + 1] - indptr[slot]
+
+    @staticmethod
+    def __has_neighbor_in_row(indptr, neighbors, types, alive, slot, neighbor_slot):
+        """
+        the row is sorted by (type, neighbor slot), so the neighbor is binary searched in the range of each type,
+        it takes O(type number * log(row size)) instead of scanning the row.
+        """
+        if slot >= len(indptr) - 1:
+            return False
+        row_start = int(indptr[slot])
+        row_end = int(indptr[slot + 1])
+        row_types = types[row_start:row_end]
+        range_start = row_start
+        while range_start < row_end:
+            range_end = row_start + int(row_types.searchsorted(types[range_start], "right"))
+            position = range_start + int(neighbors[range_start:range_end].searchsorted(neighbor_slot))
+            if position < range_end and neighbors[position] == neighbor_slot and alive[position]:
+                return True
+            range_start = range_end
+        return False
+
+    def __row(self, indptr, neighbors, types, alive, slot):
+        if slot >= len(indptr) - 1:
+            return [], []
+        row_start = indptr[slot]
+        row_end = indptr[slot + 1]
+        if row_start == row_end:
+            return [], []
+        row_alive = alive[row_start:row_end]
+        return neighbors[row_start:row_end][row_alive].tolist(), types[row_start:row_end][row_alive].tolist()
+
+    def out_relations(self, node_id):
+        slot = self.__get_slot(node_id)
+        if slot is None:
+            return iter(())
+        targets, codes = self.__row(self.out_indptr, self.out_targets, self.out_types, self.out_alive, slot)
+        relations = [(node_id, code, int(self.slot_ids[end_slot])) for end_slot, code in zip(targets, codes)]
+        for code, end_slot in self.buffer_out.get(slot, ()):
+            relations.append((node_id, code, int(self.slot_ids[end_slot])))
+        return iter(relations)
+
+    def in_relations(self, node_id):
+        slot = self.__get_slot(node_id)
+        if slot is None:
+            return iter(())
+        sources, codes = self.__row(self.in_indptr, self.in_sources, self.in_types, self.in_alive, slot)
+        relations = [(int(self.slot_ids[start_slot]), code, node_id) for start_slot, code in zip(sources, codes)]
+        for code, start_slot in self.buffer_in.get(slot, ()):
+            relations.append((int(self.slot_ids[start_slot]), code, node_id))
+        return iter(relations)
+
+    def out_relations_of_type(self, node_id, relation_type_code):
+        slot = self.__get_slot(node_id)
+        if slot is None:
+            return iter(())
+        code = relation_type_code
+        range_start, range_end = self.__type_range(self.out_indptr, self.out_types, slot, code)
+        end_slots = self.out_targets[range_start:range_end][self.out_alive[range_start:range_end]]
+        relations = [(node_id, code, end_id) for end_id in self.slot_ids[end_slots].tolist()]
+        for t_code, end_slot in self.buffer_out.get(slot, ()):
+            if t_code == code:
+                relations.append((node_id, code, int(self.slot_ids[end_slot])))
+        return iter(relations)
+
+    def in_relations_of_type(self, node_id, relation_type_code):
+        slot = self.__get_slot(node_id)
+        if slot is None:
+            return iter(())
+        code = relation_type_code
+        range_start, range_end = self.__type_range(self.in_indptr, self.in_types, slot, code)
+        start_slots = self.in_sources[range_start:range_end][self.in_alive[range_start:range_end]]
+        relations = [(start_id, code, node_id) for start_id in self.slot_ids[start_slots].tolist()]
+        for t_code, start_slot in self.buffer_in.get(slot, ()):
+            if t_code == code:
+                relations.append((int(self.slot_ids[start_slot]), code, node_id))
+        return iter(relations)
+
+    def relations(self):
+        """
+        the relations are converted to python objects chunk by chunk, so iterating them doesn't copy the whole arrays.
+        """
+        self.flush()
+        chunk_size = self.RELATION_CHUNK_SIZE
+        for chunk_start in range(0, len(self.out_targets), chunk_size):
+            positions = np.arange(chunk_start, min(chunk_start + chunk_size, len(self.out_targets)))
+            start_slots = np.searchsorted(self.out_indptr, positions, "right") - 1
+            yield from zip(self.slot_ids[start_slots].tolist(), self.out_types[positions].tolist(),
+                           self.slot_ids[self.out_targets[positions]].tolist())
+
+    def relations_of_type(self, relation_type_code):
+        """
+        the relations in the arrays are found by the type index, the write buffer is scanned, so it doesn't need
+        to merge the write buffer.
+        """
+        code = relation_type_code
+        if 0 <= code < len(self.type_indptr) - 1:
+            positions = self.type_positions[self.type_indptr[code]:self.type_indptr[code + 1]]
+            positions = positions[self.out_alive[positions]]
+        else:
+            positions = np.empty(0, dtype=np.int64)
+        start_slots = np.searchsorted(self.out_indptr, positions, "right") - 1
+        start_ids = self.slot_ids[start_slots].tolist()
+        end_ids = self.slot_ids[self.out_targets[positions]].tolist()
+        for start_slot, buffered in self.buffer_out.items():
+            for t_code, end_slot in buffered:
+                if t_code == code:
+                    start_ids.append(int(self.slot_ids[start_slot]))
+                    end_ids.append(int(self.slot_ids[end_slot]))
+        return ((start_id, code, end_id) for start_id, end_id in zip(start_ids, end_ids))
+
+    def relation_arrays(self):
+        self.flush()
+        start_slots = np.repeat(np.arange(len(self.out_indptr) - 1), np.diff(self.out_indptr))
+        return self.slot_ids[start_slots], self.out_types.copy(), self.slot_ids[self.out_targets]
+
+    def relation_num(self):
+        return self.relation_count
+
+    def get_relation_properties(self, start_id, relation_type_code, end_id):
+        if not self.has_relation(start_id, relation_type_code, end_id):
+            return None
+        key = (self.id_to_slot[start_id], relation_type_code, self.id_to_slot[end_id])
+        # don't keep a empty dict for every relation read
+        return self.relation_properties.get(key, {})
+
+    def relations_with_properties(self):
+        slot_ids = self.slot_ids
+        return ((int(slot_ids[start_slot]), code, int(slot_ids[end_slot]), properties)
+                for (start_slot, code, end_slot), properties in self.relation_properties.items() if properties)
+
+    def flush(self):
+        """
+        merge the write buffer into the CSR/CSC arrays, and drop the dead relations.
+        :return:
+        """
+        if self.buffer_num == 0 and self.dead_num == 0:
+            return
+        self.__merge(np.empty(0, dtype=self.SLOT_DTYPE), np.empty(0, dtype=self.TYPE_DTYPE),
+                     np.empty(0, dtype=self.SLOT_DTYPE))
+
+    def __merge(self, new_start_slots, new_codes, new_end_slots):
+        """
+        rebuild the CSR/CSC arrays from the alive relations in the arrays, the write buffer and the given relations.
+        """
+        slot_num = len(self.slot_to_node)
+        start_slots = np.repeat(np.arange(len(self.out_indptr) - 1, dtype=self.SLOT_DTYPE), np.diff(self.out_indptr))
+        start_slots = start_slots[self.out_alive]
+        end_slots = self.out_targets[self.out_alive]
+        codes = self.out_types[self.out_alive]
+
+        if self.buffer_num > 0:
+            buffer_start_slots = np.empty(self.buffer_num, dtype=self.SLOT_DTYPE)
+            buffer_end_slots = np.empty(self.buffer_num, dtype=self.SLOT_DTYPE)
+            buffer_codes = np.empty(self.buffer_num, dtype=self.TYPE_DTYPE)
+            index = 0
+            for start_slot, buffered in self.buffer_out.items():
+                for code, end_slot in buffered:
+                    buffer_start_slots[index] = start_slot
+                    buffer_end_slots[index] = end_slot
+                    buffer_codes[index] = code
+                    index += 1
+            start_slots = np.concatenate([start_slots, buffer_start_slots])
+            end_slots = np.concatenate([end_slots, buffer_end_slots])
+            codes = np.concatenate([codes, buffer_codes])
+        if len(new_start_slots) > 0:
+            start_slots = np.concatenate([start_slots, new_start_slots])
+            end_slots = np.concatenate([end_slots, new_end_slots])
+            codes = np.concatenate([codes, new_codes])
+
+        type_num = int(codes.max()) + 1 if len(codes) > 0 else 1
+        keys = self.__relation_keys(start_slots, codes, end_slots, type_num)
+        order = np.lexsort((end_slots, codes, start_slots)) if keys is None else np.argsort(keys)
+        self.out_targets = end_slots[order]
+        self.out_types = codes[order]
+        self.out_alive = np.ones(len(order), dtype=bool)
+        self.out_indptr = np.zeros(slot_num + 1, dtype=np.int64)
+        np.cumsum(np.bincount(start_slots, minlength=slot_num), out=self.out_indptr[1:])
+
+        keys = self.__relation_keys(end_slots, codes, start_slots, type_num)
+        order = np.lexsort((start_slots, codes, end_slots)) if keys is None else np.argsort(keys)
+        self.in_sources = start_slots[order]
+        self.in_types = codes[order]
+        self.in_alive = np.ones(len(order), dtype=bool)
+        self.in_indptr = np.zeros(slot_num + 1, dtype=np.int64)
+        np.cumsum(np.bincount(end_slots, minlength=slot_num), out=self.in_indptr[1:])
+
+        position_dtype = np.int32 if len(self.out_types) < 2 ** 31 else np.int64
+        self.type_positions = np.argsort(self.out_types, kind="stable").astype(position_dtype)
+        self.type_indptr = np.zeros(type_num + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.out_types, minlength=type_num), out=self.type_indptr[1:])
+
+        self.buffer_out = {}
+        self.buffer_in = {}
+        self.buffer_num = 0
+        self.dead_num = 0
+
+    def to_networkx(self, relation_types=None):
+        graph = MultiDiGraph()
+        graph.add_nodes_from((node_id, dict(node_json)) for node_id, node_json in self.nodes())
+        id_to_slot = self.id_to_slot
+        for start_id, code, end_id in self.relations():
+            properties = self.relation_properties.get((id_to_slot[start_id], code, id_to_slot[end_id]), {})
+            graph.add_edge(start_id, end_id, code if relation_types is None else relation_types[code], **properties)
+        return graph
+
+    def sample_node_jsons(self, sample_size):
+        if sample_size is None or self.node_count <= sample_size:
+            return super().sample_node_jsons(sample_size)
+        # the removed nodes leave None in their slots
+        node_jsons, scale = sample_evenly(self.slot_to_node, len(self.slot_to_node), sample_size)
+        node_jsons = [node_json for node_json in node_jsons if node_json is not None]
+        return node_jsons, self.node_count / max(1, len(node_jsons))
+
+    def memory_report(self, sample_size=None, seen=None):
+        if seen is None:
+            seen = set()
+        return {
+            "nodes": (self._estimate_node_jsons_size(sample_size) + sys.getsizeof(self.slot_to_node)
+                      + sum(estimate_size(value, sample_size, seen)
+                            for value in (self.id_to_slot, self.slot_ids, self.sorted_id_cache))),
+            "relations": sum(estimate_size(value, sample_size, seen)
+                             for value in (self.out_indptr, self.out_targets, self.out_types, self.out_alive,
+                                           self.in_indptr, self.in_sources, self.in_types, self.in_alive,
+                                           self.buffer_out, self.buffer_in, self.relation_properties)),
+            "relation_index": (estimate_size(self.type_indptr, sample_size, seen)
+                               + estimate_size(self.type_positions, sample_size, seen)),
+        }
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+the breadth first traversal on a GraphAdjacency, see GraphData.bfs_distances() and GraphData.find_shortest_path().
+"""
+import numpy as np
+
+from kgdt.models.adjacency import GraphAdjacency
+
+
+class GraphTraversal:
+    """
+    the breadth first search on the node indexes of a GraphAdjacency, following only the given relation types in the
+    given direction, up to the max depth. Each level of the search is a few numpy operations on the whole frontier.
+    >>>
+        adjacency = graph_data.get_adjacency()
+        traversal = GraphTraversal(adjacency, relation_type_codes=[0], direction="both", max_depth=3)
+        distances = traversal.distances(adjacency.indexes_of([1, 2]))
+    >>>
+    """
+    BATCH_SIZE = 64  # the number of sources searched together in distance_matrix(), one bit for each source
+
+    def __init__(self, adjacency, relation_type_codes=None, direction=GraphAdjacency.DIRECTION_OUT, max_depth=None):
+        """
+        :param adjacency: a GraphAdjacency
+        :param relation_type_codes: None to follow all relations, or a list of relation type codes to follow
+        :param direction: GraphAdjacency.DIRECTION_OUT, DIRECTION_IN or DIRECTION_BOTH
+        :param max_depth: None for no limit, or the max number of relations in a path
+        """
+        if direction not in GraphAdjacency.DIRECTIONS:
+            raise ValueError("unknown direction %r" % direction)
+        self.adjacency = adjacency
+        self.relation_type_codes = relation_type_codes
+        self.direction = direction
+        self.max_depth = max_depth
+
+    def __reverse_direction(self):
+        if self.direction == GraphAdjacency.DIRECTION_OUT:
+            return GraphAdjacency.DIRECTION_IN
+        if self.direction == GraphAdjacency.DIRECTION_IN:
+            return GraphAdjacency.DIRECTION_OUT
+        return GraphAdjacency.DIRECTION_BOTH
+
+    def __is_deeper_than_max(self, depth):
+        return self.max_depth is not None and depth >= self.max_depth
+
+    def distances(self, source_indexes, target_indexes=None):
+        """
+        the distance of each node from the nearest source.
+        :param source_indexes: a int64 numpy array of node indexes, the -1 ones are ignored
+        :param target_indexes: None to search all reachable nodes, or a int64 numpy array of node indexes,
+        the search stops once all of them are reached
+        :return: a int64 numpy array of the distance of each node index, -1 for the node not reached
+        """
+        distances = np.full(self.adjacency.node_num(), -1, dtype=np.int64)
+        frontier = np.unique(source_indexes[source_indexes >= 0])
+        distances[frontier] = 0
+        if target_indexes is not None:
+            target_indexes = target_indexes[target_indexes >= 0]
+        depth = 0
+        while len(frontier) and not self.__is_deeper_than_max(depth):
+            if target_indexes is not None and (distances[target_indexes] >= 0).all():
+                break
+            neighbors, _ = self.adjacency.gather(frontier, self.direction, self.relation_type_codes)
+            frontier = np.unique(neighbors[distances[neighbors] < 0])
+            depth += 1
+            distances[frontier] = depth
+        return distances
+
+    def distance_matrix(self, source_indexes, target_indexes):
+        """
+        the distance from each source to each target. Up to BATCH_SIZE sources are searched together, the sources
+        reaching a node are kept as the bits of a uint64, so a level of the search is done for all of them at once.
+        :param source_indexes: a int64 numpy array of node indexes
+        :param target_indexes: a int64 numpy array of node indexes
+        :return: a int64 numpy array in the shape of (len(source_indexes), len(target_indexes)), -1 for the target not
+        reached from the source, and for the index -1
+        """
+        matrix = np.full((len(source_indexes), len(target_indexes)), -1, dtype=np.int64)
+        valid_targets = np.flatnonzero(target_indexes >= 0)
+        targets = target_indexes[valid_targets]
+        for batch_start in range(0, len(source_indexes), self.BATCH_SIZE):
+            batch = source_indexes[batch_start:batch_start + self.BATCH_SIZE]
+            rows = np.flatnonzero(batch >= 0)
+            if not len(rows) or not len(targets):
+                continue
+            source_bits = np.left_shift(np.uint64(1), rows.astype(np.uint64))
+            all_bits = np.bitwise_or.reduce(source_bits)
+            visited = np.zeros(self.adjacency.node_num(), dtype=np.uint64)
+            np.bitwise_or.at(visited, batch[rows], source_bits)
+            frontier = np.unique(batch[rows])
+            frontier_bits = visited[frontier]
+            depth = 0
+            batch_matrix = matrix[batch_start:batch_start + len(batch)]
+            self.__record_distances(batch_matrix, valid_targets, targets, frontier, frontier_bits, depth)
+            while len(frontier) and not self.__is_deeper_than_max(depth):
+                if (visited[targets] == all_bits).all():
+                    break
+                neighbors, sources = self.adjacency.gather(frontier, self.direction, self.relation_type_codes)
+                neighbors, inverse = np.unique(neighbors, return_inverse=True)
+                reached_bits = np.zeros(len(neighbors), dtype=np.uint64)
+                np.bitwise_or.at(reached_bits, inverse, frontier_bits[sources])
+                new_bits = reached_bits & ~visited[neighbors]
+                is_new = new_bits != 0
+                frontier = neighbors[is_new]
+                frontier_bits = new_bits[is_new]
+                visited[frontier] |= frontier_bits
+                depth += 1
+                self.__record_distances(batch_matrix, valid_targets, targets, frontier, frontier_bits, depth)
+        return matrix
+
+    @staticmethod
+    def __record_distances(batch_matrix, valid_targets, targets, frontier, frontier_bits, depth):
+        # the bits of the sources first reaching each target on this level
+        if not len(frontier):
+            return
+        positions = np.minimum(frontier.searchsorted(targets), len(frontier) - 1)
+        target_bits = np.where(frontier[positions] == targets, frontier_bits[positions], np.uint64(0))
+        rows = np.arange(len(batch_matrix), dtype=np.uint64)
+        is_reached = ((target_bits[np.newaxis, :] >> rows[:, np.newaxis]) & np.uint64(1)).astype(bool)
+        batch_matrix[:, valid_targets] = np.where(is_reached, depth, batch_matrix[:, valid_targets])
+
+    def __predecessors(self, index, distances, direction=None):
+        """
+        :return: the sorted node indexes one level nearer to the source with a followed relation to the node,
+        the relations are followed in the reverse direction of the search by default
+        """
+        neighbors, _ = self.adjacency.gather(np.array([index], dtype=np.int64), direction or self.__reverse_direction(),
+                                             self.relation_type_codes)
+        return np.unique(neighbors[distances[neighbors] == distances[index] - 1])
+
+    def __bidirectional_search(self, source_index, target_index):
+        """
+        search from the source and from the target in turn, always expanding the smaller frontier by one level,
+        until the two searches meet.
+        :return: (the meeting node index, the distances from the source, the distances to the target),
+        None if the target is not reached
+        """
+        node_num = self.adjacency.node_num()
+        searches = []
+        for index, direction in ((source_index, self.direction), (target_index, self.__reverse_direction())):
+            distances = np.full(node_num, -1, dtype=np.int64)
+            distances[index] = 0
+            searches.append([distances, np.array([index], dtype=np.int64), 0, direction])
+        if source_index == target_index:
+            return source_index, searches[0][0], searches[1][0]
+        while len(searches[0][1]) and len(searches[1][1]):
+            if self.__is_deeper_than_max(searches[0][2] + searches[1][2]):
+                return None
+            search, other_search = sorted(searches, key=lambda search: len(search[1]))
+            distances, frontier, depth, direction = search
+            neighbors, _ = self.adjacency.gather(frontier, direction, self.relation_type_codes)
+            frontier = np.unique(neighbors[distances[neighbors] < 0])
+            depth += 1
+            distances[frontier] = depth
+            search[1:3] = frontier, depth
+            other_distances = other_search[0][frontier]
+            if (other_distances >= 0).any():
+                # all the new nodes have the same depth, the nearest one to the other side is on a shortest path
+                is_met = other_distances >= 0
+                meeting_index = int(frontier[is_met][np.argmin(other_distances[is_met])])
+                return meeting_index, searches[0][0], searches[1][0]
+        return None
+
+    def shortest_path(self, source_index, target_index):
+        """
+        :return: a list of node indexes from the source to the target, None if the target is not reached
+        """
+        result = self.__bidirectional_search(source_index, target_index)
+        if result is None:
+            return None
+        meeting_index, source_distances, target_distances = result
+        path = [meeting_index]
+        while source_distances[path[-1]] > 0:
+            path.append(int(self.__predecessors(path[-1], source_distances)[0]))
+        path.reverse()
+        while target_distances[path[-1]] > 0:
+            path.append(int(self.__predecessors(path[-1], target_distances, self.direction)[0]))
+        return path
+
+    def all_shortest_paths(self, source_index, target_index):
+        """
+        :return: a list of all the shortest paths from the source to the target, each path is a list of node indexes,
+        a empty list if the target is not reached
+        """
+        distances = self.distances(np.array([source_index], dtype=np.int64), np.array([target_index], dtype=np.int64))
+        if distances[target_index] < 0:
+            return []
+        if distances[target_index] == 0:
+            return [[target_index]]
+        paths = []
+        # depth first from the target to the source, each item is a reversed path and the predecessors to try
+        stack = [([target_index], self.__predecessors(target_index, distances).tolist())]
+        while stack:
+            reversed_path, predecessors = stack[-1]
+            if not predecessors:
+                stack.pop()
+                continue
+            predecessor = predecessors.pop()
+            if distances[predecessor] == 0:
+                paths.append([predecessor] + reversed_path[::-1])
+                continue
+            stack.append((reversed_path + [predecessor], self.__predecessors(predecessor, distances).tolist()))
+        return paths
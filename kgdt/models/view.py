@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+read-only live views on a GraphData. A view doesn't copy anything, it always shows the current content of the graph,
+the membership test and the len() cost O(1). They support the set operations of collections.abc.Set, e.g., &, |, -,
+and the result of a set operation is a normal set.
+NetworkxView is a frozen networkx MultiDiGraph on the same content, see GraphData.graph.
+"""
+from collections.abc import Mapping, Set
+
+from networkx import MultiDiGraph, freeze
+
+
+class _ReadOnlySetView(Set):
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+
+class NodeIdView(_ReadOnlySetView):
+    """
+    the view of all node ids in a GraphData.
+    >>>
+        node_id_view = graph_data.get_node_id_view()
+        3 in node_id_view
+        len(node_id_view)
+    >>>
+    """
+
+    def __init__(self, graph_data):
+        self.graph_data = graph_data
+
+    def __contains__(self, node_id):
+        return self.graph_data.storage.has_node(node_id)
+
+    def __len__(self):
+        return self.graph_data.storage.node_num()
+
+    def __iter__(self):
+        return self.graph_data.storage.node_ids()
+
+    def __repr__(self):
+        return "<NodeIdView node_num=%d>" % len(self)
+
+
+class LabelView(_ReadOnlySetView):
+    """
+    the view of the ids of the nodes with a label in a GraphData.
+    """
+
+    def __init__(self, graph_data, label):
+        self.graph_data = graph_data
+        self.label = label
+
+    def __ids(self):
+        return self.graph_data.label_to_ids_map.get(self.label, ())
+
+    def __contains__(self, node_id):
+        return node_id in self.__ids()
+
+    def __len__(self):
+        return len(self.__ids())
+
+    def __iter__(self):
+        return iter(self.__ids())
+
+    def __repr__(self):
+        return "<LabelView label=%r node_num=%d>" % (self.label, len(self))
+
+
+class _NodeMapping(Mapping):
+    """
+    the node id to node json mapping of a NetworkxView, read from the storage on each access.
+    """
+
+    def __init__(self, graph_data):
+        self.graph_data = graph_data
+
+    def __getitem__(self, node_id):
+        node_json = self.graph_data.storage.get_node(node_id)
+        if node_json is None:
+            raise KeyError(node_id)
+        return node_json
+
+    def __contains__(self, node_id):
+        return self.graph_data.storage.has_node(node_id)
+
+    def __len__(self):
+        return self.graph_data.storage.node_num()
+
+    def __iter__(self):
+        return self.graph_data.storage.node_ids()
+
+
+class _AdjacencyMapping(_NodeMapping):
+    """
+    the node id to {neighbor id: {relation type: relation properties}} mapping of a NetworkxView, the inner dicts
+    are built from the relations of the node on each access.
+    """
+
+    def __init__(self, graph_data, is_out):
+        super().__init__(graph_data)
+        self.is_out = is_out
+
+    def __getitem__(self, node_id):
+        storage = self.graph_data.storage
+        if not storage.has_node(node_id):
+            raise KeyError(node_id)
+        relation_types = self.graph_data.relation_type_table.types
+        neighbors = {}
+        relations = storage.out_relations(node_id) if self.is_out else storage.in_relations(node_id)
+        for start_id, code, end_id in relations:
+            neighbor_id = end_id if self.is_out else start_id
+            neighbors.setdefault(neighbor_id, {})[relation_types[code]] = \
+                storage.get_relation_properties(start_id, code, end_id)
+        return neighbors
+
+
+class NetworkxView(MultiDiGraph):
+    """
+    a frozen networkx MultiDiGraph on the current content of a GraphData, the key of each edge is the relation type
+    string. Nothing is copied, the nodes and the relations are read from the storage when they are accessed, so it
+    could be passed to the networkx algorithms and always shows the latest graph data.
+    Adding or removing nodes and edges on it raises networkx.NetworkXError. The node jsons are the ones kept in the
+    graph data, they should be changed by the methods of GraphData.
+    >>>
+        graph = graph_data.graph
+        networkx.shortest_path(graph, 1, 2)
+    >>>
+    """
+
+    def __init__(self, graph_data=None, **attr):
+        if graph_data is None:
+            # networkx creates a empty graph of the same class for the views and the copies
+            super().__init__(**attr)
+            return
+        self.graph = dict(attr)
+        self.graph_data = graph_data
+        self._node = _NodeMapping(graph_data)
+        self._adj = _AdjacencyMapping(graph_data, is_out=True)
+        self._pred = _AdjacencyMapping(graph_data, is_out=False)
+        self.__networkx_cache__ = {}
+        freeze(self)
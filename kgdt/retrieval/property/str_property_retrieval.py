@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from kgdt.models.graph import GraphData
-from kgdt.utils import SaveLoad
+from kgdt.utils import SaveLoad, estimate_size
 
 
 class StrPropertySearcher(SaveLoad):
@@ -53,7 +53,7 @@ class StrPropertySearcher(SaveLoad):
         """
         # todo: add some config arguments, to control whether lower the case, split the words.
         self.clear()
-        for node_id in graph_data.get_node_ids():
+        for node_id in graph_data.iter_node_ids():
             node_properties = graph_data.get_properties_for_node(node_id=node_id)
             for property_name in properties:
                 property_value = node_properties.get(property_name, None)
@@ -152,3 +152,24 @@ class StrPropertySearcher(SaveLoad):
         self.id_2_values_map = {}
         self.value_keyword_2_ids_map = {}
         self.id_2_value_keywords_map = {}
+
+    def memory_report(self, sample_size=None):
+        """
+        estimate the bytes used by each map of the searcher.
+        :param sample_size: None to measure every item, or the number of items to measure in each large map,
+        the others are estimated from them.
+        :return: a dict of bytes, e.g.,
+        {
+            "value_2_ids_map": 1024,
+            "id_2_values_map": 1024,
+            "value_keyword_2_ids_map": 2048,
+            "id_2_value_keywords_map": 2048,
+            "total": 6144
+        }
+        """
+        seen = set()
+        report = {}
+        for name in ("value_2_ids_map", "id_2_values_map", "value_keyword_2_ids_map", "id_2_value_keywords_map"):
+            report[name] = estimate_size(getattr(self, name), sample_size, seen)
+        report["total"] = sum(report.values())
+        return report
@@ -122,7 +122,7 @@ class Neo4jImporter:
             self.graph_accessor.delete_all_nodes()
 
         # todo: this is slow, need to speed up, maybe not commit on every step
-        all_node_ids = graph_data.get_node_ids()
+        all_node_ids = graph_data.iter_node_ids()
         for node_id in all_node_ids:
             ## todo: fix this by not using 'properties','labels'
             node_info_dict = graph_data.get_node_info_dict(node_id)
@@ -131,7 +131,7 @@ class Neo4jImporter:
             self.import_one_entity(node_id, properties, labels)
 
         print("all entity imported")
-        relations = graph_data.get_relations()
+        relations = graph_data.iter_relations()
         for r in relations:
             start_node_id, r_name, end_node_id = r
             start_node = self.graph_accessor.find_node(primary_label=self.DEFAULT_LABEL,
@@ -332,9 +332,8 @@ class CSVGraphdataTranformer():
         csvfilename2ids = {}
         csvfilename2property_name = {}
 
-        ids = graph.get_node_ids()
-        for id in ids:
-            node = graph.get_node_info_dict(id)
+        for node in graph.iter_nodes():
+            id = node.get(GraphData.DEFAULT_KEY_NODE_ID)
             labels = node.get(GraphData.DEFAULT_KEY_NODE_LABELS)
             property_names = node.get(GraphData.DEFAULT_KEY_NODE_PROPERTIES).keys()
             csvfilename = "$nodes$_"+ '_'.join(labels)
@@ -381,7 +380,7 @@ class CSVGraphdataTranformer():
                 writer = csv.writer(csvfile, delimiter=',')
                 first_relation = True
                 for relation_type in relation_types:
-                    relation_pairs = graph.get_relations(relation_type=relation_type)
+                    relation_pairs = graph.iter_relations(relation_type=relation_type)
                     for relation_pair in relation_pairs:
                         relation_dic = {}
                         relation_dic[relation_file_start_id] = node_id_value_prefix + "_" + str(relation_pair[0])
@@ -399,7 +398,7 @@ class CSVGraphdataTranformer():
             if prefix != "":
                 relation_file_name = str(prefix) + "_" + relation_file_name + "_"
             for relation_type in relation_types:
-                relation_pairs = graph.get_relations(relation_type=relation_type)
+                relation_pairs = graph.iter_relations(relation_type=relation_type)
                 with open(os.path.join(csv_folder, '{}.{}'.format(relation_file_name + relation_type.replace(' ', '_'), 'csv')), 'w', newline='',
                           encoding='utf-8') as csvfile:
                     writer = csv.writer(csvfile, delimiter=',')
@@ -12,8 +12,10 @@
 """
 
 import inspect
+import itertools
 import logging
 import pickle as _pickle
+import sys
 import traceback
 import warnings
 from functools import wraps
@@ -439,3 +441,70 @@ def catch_exception(function):
             traceback.print_exc()
 
     return wrapped
+
+
+def estimate_size(obj, sample_size=None, seen=None):
+    """
+    estimate the bytes of a object and all objects referred by it, by sys.getsizeof().
+    The objects already in seen are not counted again, so the shared objects are counted once.
+    :param obj: any python object
+    :param sample_size: None to measure every item. Otherwise, only about sample_size items of each larger container
+    are measured, evenly spaced, and the bytes of the other items are estimated from them.
+    :param seen: a set of ids of the objects already counted, it is updated.
+    :return: the estimated bytes
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, np.ndarray):
+        if obj.base is not None:
+            size += estimate_size(obj.base, sample_size, seen)
+        if obj.dtype == object:
+            size += _estimate_items_size(obj.flat, obj.size, sample_size, seen)
+        return size
+    if isinstance(obj, dict):
+        if sample_size is None or len(obj) <= sample_size:
+            return size + sum(estimate_size(key, sample_size, seen) + estimate_size(value, sample_size, seen)
+                              for key, value in obj.items())
+        # taking the keys is much faster than taking the items
+        keys, scale = sample_evenly(obj.keys(), len(obj), sample_size)
+        return size + int(scale * sum(estimate_size(key, sample_size, seen) + estimate_size(obj[key], sample_size, seen)
+                                      for key in keys))
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + _estimate_items_size(obj, len(obj), sample_size, seen)
+    if hasattr(obj, "__dict__"):
+        size += estimate_size(obj.__dict__, sample_size, seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += estimate_size(getattr(obj, slot), sample_size, seen)
+    return size
+
+
+def sample_evenly(items, item_num, sample_size):
+    """
+    take about sample_size evenly spaced items from a iterable, without making a list of all items.
+    :param items: a iterable, a list is sliced directly
+    :param item_num: the number of items in the iterable
+    :param sample_size: the number of items to take, None to take all items
+    :return: (a list of the sampled items, item_num / the number of sampled items)
+    """
+    if sample_size is None or item_num <= sample_size:
+        return list(items), 1.0
+    step = item_num // sample_size
+    if isinstance(items, (list, tuple)):
+        items = list(items[::step])
+    else:
+        items = list(itertools.islice(items, 0, None, step))
+    return items, item_num / max(1, len(items))
+
+
+def _estimate_items_size(items, item_num, sample_size, seen):
+    if sample_size is None or item_num <= sample_size:
+        return sum(estimate_size(item, sample_size, seen) for item in items)
+    items, scale = sample_evenly(items, item_num, sample_size)
+    return int(sum(estimate_size(item, sample_size, seen) for item in items) * scale)
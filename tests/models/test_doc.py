@@ -25,3 +25,15 @@ class TestMultiFieldDocumentCollection(TestCase):
         dc.pretty_print_by_id(3)
         dc: MultiFieldDocumentCollection = MultiFieldDocumentCollection.load("test.v1.dc")
         self.assertEqual(dc.get_num(), 1)
+
+    def test_memory_report(self):
+        dc = MultiFieldDocumentCollection()
+        for index in range(100):
+            dc.add_document_from_field_values(index, "doc %d" % index, code="String s%d;" % index,
+                                              comment="the string %d" % index)
+        report = dc.memory_report()
+        self.assertEqual(set(report["fields"].keys()), {"code", "comment"})
+        self.assertEqual(report["total"], report["documents"] + sum(report["fields"].values()) + report["indexes"])
+        sampled_report = dc.memory_report(sample_size=10)
+        self.assertAlmostEqual(sampled_report["fields"]["code"], report["fields"]["code"],
+                               delta=report["fields"]["code"] * 0.1)
@@ -13,7 +13,13 @@
 
 from unittest import TestCase
 
+import numpy as np
+from networkx import NetworkXError, shortest_path
+
 from kgdt.models.graph import GraphData
+from kgdt.models.journal import GraphJournal
+from kgdt.models.label import NodeIdSet
+from kgdt.models.query import PropertyQueryPlan
 
 
 class TestGraphData(TestCase):
@@ -182,3 +188,802 @@ class TestGraphData(TestCase):
         self.assertEqual(graph_data.exist_any_relation(2, 1), False)
         new_relations = {(3, 'hasMethod', 1), (1, 'belongTo', 3)}
         self.assertEqual(graph_data.get_all_relations(1, 3), new_relations)
+
+    def test_compact_backend(self):
+        graph_data = GraphData(backend=GraphData.BACKEND_COMPACT)
+        graph_data.add_node({"method"}, {"qualified_name": "ArrayList.add"})
+        graph_data.add_node({"method"}, {"qualified_name": "ArrayList.remove"})
+        graph_data.add_node({"class"}, {"qualified_name": "ArrayList"})
+        self.assertTrue(graph_data.add_relation(3, "hasMethod", 1))
+        self.assertTrue(graph_data.add_relation(3, "hasMethod", 2))
+        self.assertFalse(graph_data.add_relation(3, "hasMethod", 2))
+        self.assertFalse(graph_data.add_relation(3, "hasMethod", 5))
+
+        self.assertEqual(graph_data.get_all_out_relations(3), {(3, "hasMethod", 1), (3, "hasMethod", 2)})
+        self.assertEqual(graph_data.get_relations(relation_type="hasMethod", end_id=2), {(3, "hasMethod", 2)})
+        self.assertTrue(graph_data.exist_relation(3, "hasMethod", 1))
+
+        graph_data.save("test.compact.graph")
+        graph_data: GraphData = GraphData.load("test.compact.graph")
+        self.assertEqual(graph_data.backend, GraphData.BACKEND_COMPACT)
+        self.assertEqual(graph_data.get_relation_num(), 2)
+        self.assertEqual(graph_data.get_all_in_relations(2), {(3, "hasMethod", 2)})
+
+    def test_relation_type_code(self):
+        graph_data = GraphData()
+        graph_data.add_node({"method"}, {"qualified_name": "ArrayList.add"})
+        graph_data.add_node({"class"}, {"qualified_name": "ArrayList"})
+        graph_data.add_relation(2, "hasMethod", 1)
+        graph_data.add_relation(1, "belongTo", 2)
+
+        self.assertEqual(graph_data.relation_type_table.get_code("hasMethod"), 0)
+        self.assertEqual(graph_data.relation_type_table.get_code("belongTo"), 1)
+        self.assertEqual(graph_data.relation_type_table.get_codes(["belongTo", "not exist", "hasMethod"]), [1, 0])
+        self.assertEqual(graph_data.relation_type_table.get_codes("hasMethod"), [0])
+        self.assertIsNone(graph_data.relation_type_table.get_codes(None))
+        self.assertEqual(set(graph_data.graph.edges(keys=True)), {(2, 1, "hasMethod"), (1, 2, "belongTo")})
+
+        self.assertEqual(graph_data.get_relations(relation_type="belongTo"), {(1, "belongTo", 2)})
+        self.assertEqual(graph_data.get_relations(relation_type="not exist"), set())
+        self.assertFalse(graph_data.exist_relation(2, "not exist", 1))
+        self.assertTrue(graph_data.remove_relation(2, "hasMethod", 1))
+        self.assertEqual(graph_data.get_relation_pairs_with_type(), {(1, "belongTo", 2)})
+
+    def test_networkx_view(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            graph_data.add_node({"method"}, {"qualified_name": "ArrayList.add"})
+            graph_data.add_node({"class"}, {"qualified_name": "ArrayList"})
+            graph_data.add_relation(2, "hasMethod", 1)
+
+            graph = graph_data.graph
+            self.assertIs(graph_data.graph, graph)
+            self.assertTrue(graph.has_edge(2, 1, "hasMethod"))
+            with self.assertRaises(NetworkXError):
+                graph.add_edge(1, 2, "belongTo")
+            self.assertFalse(graph_data.exist_relation(1, "belongTo", 2))
+
+            graph_data.add_label_by_node_id(1, "entity")
+            self.assertIs(graph_data.graph, graph)
+            self.assertEqual(graph.nodes[1]["labels"], {"method", "entity"})
+            graph_data.add_relation_with_property(1, "belongTo", 2, weight=2)
+            self.assertEqual(set(graph.edges(keys=True)), {(2, 1, "hasMethod"), (1, 2, "belongTo")})
+            self.assertEqual(graph.get_edge_data(1, 2, "belongTo"), {"weight": 2})
+            self.assertEqual(graph.number_of_nodes(), 2)
+            self.assertEqual(graph.number_of_edges(), 2)
+            self.assertEqual(list(graph.predecessors(1)), [2])
+            self.assertEqual(shortest_path(graph, 1, 2), [1, 2])
+            self.assertEqual(set(graph.subgraph([1]).nodes), {1})
+
+            graph_data.remove_node(2)
+            self.assertNotIn(2, graph)
+            self.assertEqual(graph.number_of_edges(), 0)
+
+    def test_add_nodes_bulk(self):
+        graph_data = GraphData()
+        graph_data.create_index_on_property("qualified_name", "alias")
+        graph_data.add_node({"class"}, {"qualified_name": "ArrayList"})
+
+        def node_generator():
+            yield {"properties": {"qualified_name": "ArrayList.add", "alias": ["add"]}, "labels": ["method"]}
+            yield {"id": 10, "properties": {"qualified_name": "ArrayList.clear"}, "labels": ["method", "entity"]}
+            yield {"properties": {"qualified_name": "ArrayList.remove"}}
+
+        node_ids = graph_data.add_nodes_bulk(node_generator())
+        self.assertEqual(node_ids.tolist(), [2, 10, 11])
+        self.assertEqual(graph_data.max_node_id, 11)
+        self.assertEqual(graph_data.get_node_ids_by_label("method"), {2, 10})
+        self.assertEqual(graph_data.get_node_ids_by_label("entity"), {10})
+        self.assertEqual(graph_data.find_one_node_by_property("qualified_name", "ArrayList.clear")["id"], 10)
+        self.assertEqual(graph_data.find_one_node_by_property("alias", "add")["id"], 2)
+
+        node_ids = graph_data.add_nodes_bulk([{"id": 10, "properties": {"qualified_name": "List.clear"}}],
+                                             id_policy=GraphData.ID_POLICY_NEW)
+        self.assertEqual(node_ids.tolist(), [12])
+        self.assertEqual(graph_data.get_properties_for_node(10), {"qualified_name": "ArrayList.clear"})
+
+    def test_add_relations_bulk(self):
+        for backend in (GraphData.BACKEND_MULTI_DI_GRAPH, GraphData.BACKEND_COMPACT):
+            graph_data = GraphData(backend=backend)
+            graph_data.add_nodes_bulk({"properties": {"name": str(i)}} for i in range(4))
+            graph_data.add_relation(1, "call", 2)
+
+            accepted = graph_data.add_relations_bulk(np.array([1, 1, 2, 3, 2]),
+                                                     ["call", "call", "call", "call", "extend"],
+                                                     np.array([2, 3, 3, 9, 3]))
+            self.assertEqual(accepted.tolist(), [False, True, True, False, True])
+            self.assertEqual(graph_data.get_relation_type_to_num_map(), {"call": 3, "extend": 1})
+
+            accepted = graph_data.add_relations_bulk(iter([(4, "call", 1), (4, "call", 1), (1, "call", 3)]))
+            self.assertEqual(accepted.tolist(), [True, False, False])
+            self.assertEqual(graph_data.get_relation_num(), 5)
+            self.assertEqual(graph_data.get_all_in_relations(3), {(1, "call", 3), (2, "call", 3), (2, "extend", 3)})
+
+    def test_merge_nodes_bulk(self):
+        for backend in (GraphData.BACKEND_MULTI_DI_GRAPH, GraphData.BACKEND_COMPACT):
+            graph_data = GraphData(backend=backend)
+            graph_data.add_node({"entity"}, {"name": "A", "kind": 1})
+            graph_data.add_node({"entity"}, {"name": "B", "kind": 1})
+
+            node_ids, inserted_num, merged_num = graph_data.merge_nodes_bulk([
+                {"properties": {"name": "A", "kind": 1, "alias": "a"}, "labels": ["class"]},
+                {"properties": {"name": "C", "kind": 2}, "labels": ["method"]},
+                {"properties": {"kind": 3}, "labels": ["method"]},
+                {"properties": {"name": "C", "kind": 2, "alias": "c"}, "labels": ["entity"]},
+                {"properties": {"name": "B", "kind": 2}, "labels": []},
+            ], primary_property_names=["name", "kind"])
+
+            self.assertEqual(node_ids.tolist(), [1, 3, -1, 3, 4])
+            self.assertEqual((inserted_num, merged_num), (2, 2))
+            self.assertEqual(graph_data.get_node_num(), 4)
+            self.assertEqual(graph_data.get_properties_for_node(1), {"name": "A", "kind": 1, "alias": "a"})
+            self.assertEqual(graph_data.get_labels_for_node(1), {"entity", "class"})
+            self.assertEqual(graph_data.get_properties_for_node(3), {"name": "C", "kind": 2, "alias": "c"})
+            self.assertEqual(graph_data.get_node_ids_by_label("entity"), {1, 2, 3})
+
+            graph_data.create_index_on_property("name")
+            graph_data.refresh_indexer()
+            node_ids, inserted_num, merged_num = graph_data.merge_nodes_bulk(
+                [{"properties": {"name": "C", "alias": "cc"}}, {"properties": {"name": "D"}}], "name")
+            self.assertEqual(node_ids.tolist(), [3, 5])
+            self.assertEqual((inserted_num, merged_num), (1, 1))
+            self.assertEqual(graph_data.find_one_node_by_property("name", "D")["id"], 5)
+            self.assertEqual(graph_data.get_properties_for_node(3)["alias"], "cc")
+
+            first = {"properties": {"name": "E", "x": 1}, "labels": ["class"]}
+            second = {"properties": {"name": "E", "y": 2}, "labels": ["method"]}
+            node_ids, inserted_num, merged_num = graph_data.merge_nodes_bulk([first, second], "name")
+            self.assertEqual(graph_data.get_properties_for_node(int(node_ids[0])), {"name": "E", "x": 1, "y": 2})
+            self.assertEqual(graph_data.get_labels_for_node(int(node_ids[0])), {"class", "method"})
+            self.assertEqual(first, {"properties": {"name": "E", "x": 1}, "labels": ["class"]})
+            self.assertEqual(second, {"properties": {"name": "E", "y": 2}, "labels": ["method"]})
+
+    def test_iter_nodes_and_relations(self):
+        for backend in (GraphData.BACKEND_MULTI_DI_GRAPH, GraphData.BACKEND_COMPACT):
+            graph_data = GraphData(backend=backend)
+            graph_data.add_node({"entity", "class"}, {"name": "A"})
+            graph_data.add_node({"entity"}, {"name": "B"})
+            graph_data.add_node({"method"}, {"name": "C"})
+            graph_data.add_relation(1, "related to", 2)
+            graph_data.add_relation(1, "call", 3)
+            graph_data.add_relation(2, "call", 3)
+
+            self.assertEqual(sorted(graph_data.iter_node_ids()), [1, 2, 3])
+            self.assertEqual([node["properties"]["name"] for node in graph_data.iter_nodes()], ["A", "B", "C"])
+            self.assertEqual(set(graph_data.iter_node_ids_by_label("entity")), {1, 2})
+            self.assertEqual(list(graph_data.iter_node_ids_by_label("package")), [])
+            self.assertEqual(graph_data.get_node_num_by_label("entity"), 2)
+            self.assertEqual(graph_data.get_node_num_by_label("package"), 0)
+
+            self.assertEqual(set(graph_data.iter_relations()), graph_data.get_relation_pairs_with_type())
+            self.assertEqual(set(graph_data.iter_relations(relation_type="call")), {(1, "call", 3), (2, "call", 3)})
+            self.assertEqual(set(graph_data.iter_relations(start_id=1)), {(1, "related to", 2), (1, "call", 3)})
+            self.assertEqual(list(graph_data.iter_relations(start_id=1, relation_type="call", end_id=3)),
+                             [(1, "call", 3)])
+            self.assertEqual(list(graph_data.iter_relations(end_id=3, relation_type="extend")), [])
+
+    def test_views(self):
+        graph_data = GraphData()
+        node_id_view = graph_data.get_node_id_view()
+        label_view = graph_data.get_label_view("entity")
+        self.assertEqual(len(node_id_view), 0)
+        self.assertEqual(len(label_view), 0)
+
+        graph_data.add_node({"entity"}, {"name": "A"})
+        graph_data.add_node({"method"}, {"name": "B"})
+        property_view = graph_data.get_property_view(1)
+        self.assertIn(1, node_id_view)
+        self.assertNotIn(3, node_id_view)
+        self.assertEqual(len(node_id_view), 2)
+        self.assertEqual(set(label_view), {1})
+        self.assertEqual(node_id_view - label_view, {2})
+
+        graph_data.update_node_property_by_node_id(1, {"alias": "a"})
+        self.assertEqual(property_view["alias"], "a")
+        with self.assertRaises(TypeError):
+            property_view["name"] = "C"
+
+        graph_data.remove_node(1)
+        self.assertNotIn(1, node_id_view)
+        self.assertEqual(len(label_view), 0)
+        self.assertEqual(graph_data.update_node_property_by_node_id(1, {"alias": "b"}), GraphData.UNASSIGNED_NODE_ID)
+
+    def test_subgraph(self):
+        for backend in (GraphData.BACKEND_MULTI_DI_GRAPH, GraphData.BACKEND_COMPACT):
+            graph_data = GraphData(backend=backend)
+            graph_data.create_index_on_property("name")
+            graph_data.add_node({"entity"}, {"name": "A", "alias": ["a"]})
+            graph_data.add_node({"entity"}, {"name": "B"})
+            graph_data.add_node({"method"}, {"name": "C"})
+            graph_data.add_relation(1, "call", 2)
+            graph_data.add_relation_with_property(2, "call", 1, weight=2)
+            graph_data.add_relation(1, "related to", 3)
+
+            subgraph = graph_data.subgraph({1, 2, 4})
+            self.assertEqual(subgraph.backend, backend)
+            self.assertEqual(subgraph.get_node_ids(), {1, 2})
+            self.assertEqual(subgraph.get_relation_pairs_with_type(), {(1, "call", 2), (2, "call", 1)})
+            self.assertEqual(subgraph.get_relation_type_to_num_map(), {"call": 2})
+            self.assertEqual(subgraph.get_edge_extra_info(2, 1, "call", "weight"), 2)
+            self.assertEqual(subgraph.get_node_ids_by_label("entity"), {1, 2})
+            self.assertEqual(subgraph.find_one_node_by_property("name", "B")["id"], 2)
+            self.assertIsNone(subgraph.find_one_node_by_property("name", "C"))
+            self.assertEqual(subgraph.max_node_id, 3)
+
+            subgraph.get_properties_for_node(1)["alias"].append("aa")
+            self.assertEqual(graph_data.get_properties_for_node(1)["alias"], ["a"])
+
+            view = graph_data.subgraph([1, 3], read_only=True)
+            self.assertEqual(view.get_relation_pairs_with_type(), {(1, "related to", 3)})
+            self.assertIs(view.get_properties_for_node(1), graph_data.get_properties_for_node(1))
+
+    def test_read_only_subgraph(self):
+        graph_data = GraphData(backend=GraphData.BACKEND_COMPACT, property_store=GraphData.PROPERTY_STORE_COLUMNAR)
+        graph_data.add_node({"entity"}, {"name": "A"})
+        graph_data.add_node({"entity"}, {"name": "B"})
+        graph_data.add_relation(1, "call", 2)
+
+        view = graph_data.subgraph([1, 2], read_only=True)
+        with self.assertRaises(ValueError):
+            view.remove_node(1)
+        with self.assertRaises(ValueError):
+            view.add_node({"entity"}, {"name": "C"})
+        with self.assertRaises(ValueError):
+            view.add_label_by_node_id(1, "method")
+        with self.assertRaises(ValueError):
+            view.remove_all_relations()
+        self.assertEqual(graph_data.get_properties_for_node(1), {"name": "A"})
+        self.assertEqual(graph_data.get_node_num(), 2)
+        self.assertEqual(view.get_relation_pairs_with_type(), {(1, "call", 2)})
+
+        subgraph = graph_data.subgraph([1])
+        subgraph.remove_node(1)
+        self.assertEqual(graph_data.get_properties_for_node(1), {"name": "A"})
+
+    def test_columnar_property_store(self):
+        graph_data = GraphData(backend=GraphData.BACKEND_COMPACT, property_store=GraphData.PROPERTY_STORE_COLUMNAR)
+        graph_data.add_node({"method"}, {"name": "A", "line": 3})
+        graph_data.add_nodes_bulk([{"properties": {"name": "Ab", "line": 3}}, {"properties": {"name": "B"}}])
+        graph_data.merge_node({"entity"}, {"name": "B", "line": 5}, primary_property_name="name")
+
+        node_properties = graph_data.get_properties_for_node(3)
+        self.assertEqual(node_properties, {"name": "B", "line": 5})
+        self.assertEqual([node["id"] for node in graph_data.find_nodes_by_property("line", 3)], [1, 2])
+        self.assertEqual(graph_data.find_one_node_by_property("name", "B")["id"], 3)
+        self.assertEqual([node["id"] for node in graph_data.find_nodes_by_property_value_starts_with("name", "A")],
+                         [1, 2])
+
+        graph_data.update_node_property_by_node_id(1, {"line": 4})
+        self.assertEqual([node["id"] for node in graph_data.find_nodes_by_property("line", 3)], [2])
+        node_json, out_relations, in_relations = graph_data.remove_node(2)
+        self.assertEqual(node_json["properties"], {"name": "Ab", "line": 3})
+        self.assertEqual(graph_data.find_nodes_by_property("line", 3), [])
+
+        graph_data.save("test.compact.graph")
+        graph_data: GraphData = GraphData.load("test.compact.graph")
+        self.assertEqual(graph_data.get_properties_for_node(1), {"name": "A", "line": 4})
+        self.assertEqual(graph_data.find_one_node_by_property("name", "B")["id"], 3)
+        with self.assertRaises(ValueError):
+            GraphData(property_store="row")
+
+    def test_label_pool(self):
+        graph_data = GraphData()
+        graph_data.add_node({"entity", "class"}, {"name": "A"})
+        graph_data.add_node(["class", "entity"], {"name": "B"})
+        graph_data.add_node({"entity"}, {"name": "C"})
+        graph_data.add_nodes_bulk([{"labels": ["entity", "class"], "properties": {"name": "D"}}])
+
+        self.assertIs(graph_data.get_labels_for_node(1), graph_data.get_labels_for_node(2))
+        self.assertIs(graph_data.get_labels_for_node(1), graph_data.get_labels_for_node(4))
+        self.assertEqual(len(graph_data.label_pool), 2)
+        self.assertEqual(graph_data.get_node_id_array_by_label("entity").tolist(), [1, 2, 3, 4])
+        self.assertEqual(graph_data.find_node_ids_by_labels("class", "entity").tolist(), [1, 2, 4])
+        self.assertEqual(graph_data.find_node_ids_by_labels("class", "method").tolist(), [])
+
+        self.assertTrue(graph_data.add_label_by_node_id(3, "class"))
+        self.assertIs(graph_data.get_labels_for_node(3), graph_data.get_labels_for_node(1))
+        self.assertEqual(graph_data.find_node_ids_by_labels("class", "entity").tolist(), [1, 2, 3, 4])
+        graph_data.remove_node(2)
+        self.assertEqual(graph_data.get_node_ids_by_label("class"), {1, 3, 4})
+        self.assertEqual(graph_data.get_node_ids_by_label("class").union([5]), {1, 3, 4, 5})
+        self.assertIsInstance(graph_data.get_node_ids_by_label("not exist"), NodeIdSet)
+        self.assertEqual(graph_data.get_node_ids_by_label("not exist").union([5]), {5})
+
+    def test_memory_report(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            graph_data.create_index_on_property("name")
+            graph_data.add_nodes_bulk([{"labels": ["entity"], "properties": {"name": "n%d" % i, "line": i}}
+                                       for i in range(2000)])
+            graph_data.add_relations_bulk([(i, "calls", i + 1) for i in range(1, 2000)])
+            graph_data.create_composite_index(("name", "line"))
+            report = graph_data.memory_report()
+            self.assertEqual(set(report["indexes"].keys()), {"name", "name,line (composite)"})
+            self.assertGreater(report["indexes"]["name,line (composite)"], 2000 * 100)
+            self.assertEqual(set(report["labels"].keys()), {"entity"})
+            for part in ("nodes", "relations", "relation_index", "properties"):
+                self.assertGreater(report[part], 0)
+            self.assertEqual(report["total"], sum(sum(value.values()) if type(value) == dict else value
+                                                  for name, value in report.items() if name != "total"))
+            sampled_report = graph_data.memory_report(sample_size=100)
+            self.assertAlmostEqual(sampled_report["total"], report["total"], delta=report["total"] * 0.2)
+
+    def test_remove_in_bulk(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            graph_data.create_index_on_property("name")
+            for index in range(6):
+                graph_data.add_node({"entity", "keep" if index % 2 else "tmp"}, {"name": "n%d" % index})
+            graph_data.add_relations_bulk([(1, "calls", 2), (2, "calls", 3), (3, "uses", 4), (4, "calls", 5),
+                                           (5, "uses", 6), (6, "calls", 1)])
+
+            graph_data.remove_node(3)
+            self.assertEqual(graph_data.get_relation_count_by_type("calls"), 3)
+            self.assertEqual(graph_data.get_relation_count_by_type("uses"), 1)
+
+            node_jsons, relations = graph_data.remove_nodes_by_label("tmp")
+            self.assertEqual([node_json["id"] for node_json in node_jsons], [1, 5])
+            self.assertEqual(relations, {(1, 2, "calls"), (4, 5, "calls"), (5, 6, "uses"), (6, 1, "calls")})
+            self.assertEqual(graph_data.get_node_ids_by_label("entity"), {2, 4, 6})
+            self.assertEqual(graph_data.get_node_ids_by_label("tmp"), set())
+            self.assertIsNone(graph_data.find_one_node_by_property("name", "n0"))
+            self.assertEqual(graph_data.get_relation_type_to_num_map(), {"calls": 0, "uses": 0})
+
+            graph_data.add_relation(2, "calls", 4)
+            graph_data.add_relation(4, "uses", 6)
+            self.assertEqual(graph_data.remove_relations_by_type("calls"), {(2, 4, "calls")})
+            self.assertEqual(graph_data.get_relations(), {(4, "uses", 6)})
+            self.assertEqual(graph_data.remove_relations_by_type("unknown"), set())
+            node_jsons, relations = graph_data.remove_nodes([4, 6, 7])
+            self.assertEqual(relations, {(4, 6, "uses")})
+            self.assertEqual(graph_data.get_relation_num(), 0)
+            self.assertEqual(graph_data.get_node_ids(), {2})
+
+    def test_remove_all_relations(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            for index in range(4):
+                graph_data.add_node({"entity"}, {"name": "n%d" % index})
+            graph_data.add_relations_bulk([(1, "calls", 2), (2, "calls", 3), (3, "uses", 4)])
+            graph_data.add_relation_with_property(4, "uses", 1, weight=2)
+            seq = graph_data.enable_journal()
+
+            self.assertTrue(graph_data.remove_all_relations())
+            self.assertEqual(graph_data.get_relations(), set())
+            self.assertEqual(graph_data.get_relation_num(), 0)
+            self.assertEqual(graph_data.get_relation_type_to_num_map(), {"calls": 0, "uses": 0})
+            self.assertEqual(graph_data.get_node_ids(), {1, 2, 3, 4})
+            self.assertFalse(graph_data.exist_any_relation(1, 2))
+            self.assertEqual(graph_data.get_adjacency().relation_num(), 0)
+            seqs, ops, start_ids, relation_types, end_ids = graph_data.changes_since(seq)
+            self.assertEqual(set(zip(start_ids.tolist(), relation_types.tolist(), end_ids.tolist())),
+                             {(1, "calls", 2), (2, "calls", 3), (3, "uses", 4), (4, "uses", 1)})
+
+            graph_data.add_relation(4, "uses", 1)
+            self.assertEqual(graph_data.get_relations(), {(4, "uses", 1)})
+            self.assertEqual(graph_data.get_edge_extra_info(4, 1, "uses", "weight"), "")
+
+    def test_plan_property_query(self):
+        graph_data = GraphData()
+        graph_data.create_index_on_property("group_id", "version")
+        for index in range(20):
+            graph_data.add_node({"library"}, {"group_id": "g%d" % (index % 2), "artifact_id": "a%d" % (index % 10),
+                                              "version": "1.0" if index < 18 else "2.0"})
+
+        plan = graph_data.plan_property_query(group_id="g0", artifact_id="a2", version="2.0")
+        self.assertEqual(plan.driver, PropertyQueryPlan.DRIVER_INDEX)
+        self.assertEqual(plan.driver_names, ["version"])
+        self.assertEqual([property_name for property_name, posting in plan.probes], ["group_id"])
+        self.assertEqual(plan.filters, [("artifact_id", "a2")])
+        self.assertIn("1. index lookup version='2.0' -> 2 node ids", plan.explain())
+        self.assertEqual(graph_data.find_nodes_by_properties(group_id="g1", artifact_id="a3", version="1.0"),
+                         [graph_data.get_node_info_dict(4), graph_data.get_node_info_dict(14)])
+        self.assertIsNone(graph_data.find_one_node_by_properties(group_id="g0", artifact_id="a2", version="2.0"))
+        self.assertTrue(graph_data.plan_property_query(group_id="g3", artifact_id="a2").is_empty())
+        self.assertEqual(graph_data.plan_property_query(artifact_id="a2").driver, PropertyQueryPlan.DRIVER_NODE_SCAN)
+
+        self.assertEqual(graph_data.merge_node_with_multi_primary_property(
+            {"library"}, {"group_id": "g1", "artifact_id": "a9", "version": "2.0", "stars": 3},
+            primary_property_names=["group_id", "artifact_id", "version"]), 20)
+        self.assertEqual(graph_data.get_properties_for_node(20)["stars"], 3)
+
+        graph_data = GraphData(property_store=GraphData.PROPERTY_STORE_COLUMNAR)
+        graph_data.add_node({"library"}, {"group_id": "g0", "artifact_id": "a0", "tags": ["x"]})
+        graph_data.add_node({"library"}, {"group_id": "g0", "artifact_id": "a1", "tags": ["y"]})
+        plan = graph_data.plan_property_query(group_id="g0", artifact_id="a1", tags=["y"])
+        self.assertEqual(plan.driver, PropertyQueryPlan.DRIVER_COLUMN_SCAN)
+        self.assertEqual(plan.driver_names, ["group_id", "artifact_id"])
+        self.assertEqual(plan.filters, [("tags", ["y"])])
+        self.assertEqual(graph_data.find_one_node_by_properties(group_id="g0", artifact_id="a1", tags=["y"])["id"], 2)
+
+    def test_composite_index(self):
+        graph_data = GraphData()
+        graph_data.add_node({"library"}, {"group_id": "junit", "artifact_id": "junit", "version": "4.12"})
+        graph_data.create_composite_index(("group_id", "artifact_id", "version"))
+        graph_data.create_index_on_property("version")
+        graph_data.add_node({"library"}, {"group_id": "junit", "artifact_id": "junit", "version": "4.13"})
+        graph_data.add_node({"library"}, {"group_id": "org.mockito", "artifact_id": "mockito-core", "version": "4.12"})
+        graph_data.add_node({"library"}, {"group_id": "junit", "tags": ["test"]})
+
+        indexer = graph_data.index_collection.get_composite_index(("group_id", "artifact_id", "version"))
+        self.assertEqual(indexer.find_node_ids_by_key(("junit", "junit", "4.12")), {1})
+        self.assertEqual(len(indexer.id_2_key_map), 3)
+        plan = graph_data.plan_property_query(group_id="junit", artifact_id="junit", version="4.13", stars=3)
+        self.assertEqual(plan.driver, PropertyQueryPlan.DRIVER_COMPOSITE_INDEX)
+        self.assertEqual(plan.probes, [])
+        self.assertEqual(plan.filters, [("stars", 3)])
+        self.assertEqual(graph_data.find_one_node_by_properties(group_id="junit", artifact_id="junit",
+                                                                version="4.13")["id"], 2)
+
+        graph_data.update_node_property_value_by_node_id(2, "version", "5.0")
+        self.assertEqual(indexer.find_node_ids_by_key(("junit", "junit", "4.13")), set())
+        self.assertEqual(indexer.find_node_ids_by_key(("junit", "junit", "5.0")), {2})
+        graph_data.update_node_by_node_id(4, {"library"}, {"artifact_id": "junit", "version": "4.12"})
+        self.assertEqual(indexer.find_node_ids_by_key(("junit", "junit", "4.12")), {1, 4})
+        graph_data.remove_node(1)
+        self.assertEqual(indexer.find_node_ids_by_key(("junit", "junit", "4.12")), {4})
+
+        self.assertEqual(graph_data.merge_node_with_multi_primary_property(
+            {"library"}, {"group_id": "junit", "artifact_id": "junit", "version": "5.0", "stars": 3},
+            primary_property_names=["group_id", "artifact_id", "version"]), 2)
+        node_ids, inserted_num, merged_num = graph_data.merge_nodes_bulk(
+            [{"properties": {"group_id": "junit", "artifact_id": "junit", "version": "5.0"}},
+             {"properties": {"group_id": "junit", "artifact_id": "junit", "version": "5.1"}}],
+            primary_property_names=("group_id", "artifact_id", "version"))
+        self.assertEqual(node_ids.tolist(), [2, 5])
+        self.assertEqual(indexer.find_node_ids_by_key(("junit", "junit", "5.1")), {5})
+
+        graph_data.refresh_indexer()
+        indexer = graph_data.index_collection.get_composite_index(("group_id", "artifact_id", "version"))
+        self.assertEqual(indexer.find_node_ids_by_key(("junit", "junit", "5.1")), {5})
+        sub_graph_data = graph_data.subgraph([2, 3])
+        self.assertEqual(sub_graph_data.index_collection.get_composite_index(
+            ("group_id", "artifact_id", "version")).find_node_ids_by_key(("junit", "junit", "5.0")), {2})
+
+    def test_prefix_index(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            graph_data.create_index_on_property("qualified_name")
+            graph_data.add_node({"class"}, {"qualified_name": "java.util.List"})
+            graph_data.add_node({"class"}, {"qualified_name": "java.lang.String"})
+            graph_data.create_prefix_index_on_property("qualified_name")
+            graph_data.add_node({"class"}, {"qualified_name": "java.util.ArrayList"})
+            graph_data.add_node({"class"}, {"qualified_name": ["java.util.Map", "Map"]})
+            graph_data.add_nodes_bulk([{"labels": ["class"], "properties": {"qualified_name": "java.util.Set"}}])
+
+            self.assertTrue(graph_data.index_collection.is_property_prefix_indexed("qualified_name"))
+            self.assertEqual([node["id"] for node in
+                              graph_data.find_nodes_by_property_value_starts_with("qualified_name", "java.util.")],
+                             [3, 1, 5])
+            self.assertEqual(graph_data.find_one_node_by_property_value_starts_with(
+                "qualified_name", "java.util.")["id"], 3)
+            self.assertIsNone(graph_data.find_one_node_by_property_value_starts_with("qualified_name", "javax."))
+            self.assertEqual(graph_data.find_one_node_by_property("qualified_name", "java.lang.String")["id"], 2)
+
+            graph_data.remove_node(3)
+            graph_data.update_node_property_value_by_node_id(1, "qualified_name", "java.lang.List")
+            self.assertEqual([node["id"] for node in
+                              graph_data.find_nodes_by_property_value_starts_with("qualified_name", "java.util.")],
+                             [5])
+            graph_data.update_node_property_value_by_node_id(2, "qualified_name", "java.util.ArrayList")
+            indexer = graph_data.index_collection.property_to_indexer_map["qualified_name"]
+            indexer.merge_pending_values()
+            self.assertEqual(indexer.sorted_values, ["Map", "java.lang.List", "java.util.ArrayList",
+                                                     "java.util.Map", "java.util.Set"])
+            self.assertEqual(indexer.find_node_ids_by_prefix("java.util."), [2, 4, 5])
+
+            graph_data.refresh_indexer()
+            self.assertEqual(graph_data.index_collection.find_ids_by_prefix("qualified_name", "java."), [1, 2, 4, 5])
+            sub_graph_data = graph_data.subgraph([1, 5])
+            self.assertEqual(sub_graph_data.index_collection.find_ids_by_prefix("qualified_name", "java."), [1, 5])
+
+    def test_range_index(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            graph_data.add_node({"project"}, {"name": "a", "sourcerank": 12, "created": "2015-01-11 23:56:18 UTC"})
+            graph_data.add_node({"project"}, {"name": "b", "sourcerank": 3.5, "created": "2016-09-28 19:34:22 UTC"})
+            graph_data.create_range_index_on_property("sourcerank", "created")
+            graph_data.add_node({"project"}, {"name": "c", "sourcerank": 7, "created": "2014-12-06 21:23:52 UTC"})
+            graph_data.add_nodes_bulk([{"labels": ["project"], "properties": {"name": "d", "sourcerank": 20}},
+                                       {"labels": ["project"], "properties": {"name": "e", "sourcerank": "high"}}])
+
+            def ids(nodes):
+                return [node["id"] for node in nodes]
+
+            self.assertEqual(ids(graph_data.find_nodes_by_property_range("sourcerank", 3.5, 12)), [2, 3, 1])
+            self.assertEqual(ids(graph_data.find_nodes_by_property_range("sourcerank", low=8)), [1, 4])
+            self.assertEqual(ids(graph_data.find_top_k_nodes_by_property("sourcerank", 2)), [4, 1])
+            self.assertEqual(ids(graph_data.find_top_k_nodes_by_property("sourcerank", 10, largest=False)),
+                             [2, 3, 1, 4])
+            self.assertEqual(ids(graph_data.find_nodes_by_property_range("created", high="2015-12-31")), [3, 1])
+            self.assertEqual(ids(graph_data.find_nodes_by_property_range("name", "b", "d")), [2, 3, 4])
+
+            indexer = graph_data.index_collection.get_range_index("sourcerank")
+            indexer.merge_pending()
+            self.assertEqual(indexer.sorted_ids.tolist(), [2, 3, 1, 4])
+            graph_data.update_node_property_value_by_node_id(2, "sourcerank", 30)
+            graph_data.remove_node(1)
+            self.assertEqual(ids(graph_data.find_nodes_by_property_range("sourcerank", 0, 100)), [3, 4, 2])
+            self.assertEqual(ids(graph_data.find_top_k_nodes_by_property("sourcerank", 2)), [2, 4])
+            indexer.merge_pending()
+            self.assertEqual(indexer.sorted_ids.tolist(), [3, 4, 2])
+            self.assertEqual(len(indexer), 3)
+
+            graph_data.refresh_indexer()
+            self.assertEqual(ids(graph_data.find_top_k_nodes_by_property("sourcerank", 1)), [2])
+            sub_graph_data = graph_data.subgraph([3, 4])
+            self.assertEqual(ids(sub_graph_data.find_top_k_nodes_by_property("created", 1)), [3])
+            self.assertIn("sourcerank (range)", sub_graph_data.memory_report()["indexes"])
+
+            # the same results by a scan without the range index
+            graph_data = GraphData(backend=backend)
+            for name, stars in (("a", 12), ("b", 3.5), ("c", "many"), ("d", 7), ("e", float("nan")), ("f", 20)):
+                graph_data.add_node({"project"}, {"name": name, "stars": stars})
+            self.assertEqual(ids(graph_data.find_nodes_by_property_range("stars", 3.5, 12)), [2, 4, 1])
+            self.assertEqual(ids(graph_data.find_nodes_by_property_range("stars", low=8)), [1, 6])
+            self.assertEqual(ids(graph_data.find_top_k_nodes_by_property("stars", 2)), [6, 1])
+            self.assertEqual(ids(graph_data.find_top_k_nodes_by_property("stars", 10, largest=False)), [2, 4, 1, 6])
+            self.assertEqual(graph_data.index_collection.get_range_index("stars"), None)
+
+    def test_normalized_index(self):
+        graph_data = GraphData()
+        graph_data.add_node({"class"}, {"name": "StringBuffer"})
+        graph_data.add_node({"class"}, {"name": ["StringBuilder", " string builder "]})
+        graph_data.create_normalized_index_on_property("name", "lowercase")
+        graph_data.create_normalized_index_on_property("name", ["camel_case_split", "lowercase"])
+        graph_data.add_node({"class"}, {"name": "HashMap"})
+        graph_data.add_nodes_bulk([{"labels": ["class"], "properties": {"name": "STRINGBUFFER"}},
+                                   {"labels": ["class"], "properties": {"name": 3}}])
+
+        def ids(nodes):
+            return sorted(node["id"] for node in nodes)
+
+        self.assertEqual(ids(graph_data.find_nodes_by_normalized_property("name", "stringBuffer")), [1, 4])
+        self.assertEqual(ids(graph_data.find_nodes_by_normalized_property(
+            "name", "string", ["camel_case_split", "lowercase"])), [1, 2])
+        self.assertEqual(ids(graph_data.find_nodes_by_normalized_property(
+            "name", "mapHash", ["camel_case_split", "lowercase"])), [3])
+        self.assertEqual(ids(graph_data.find_nodes_by_normalized_property("name", "STRING BUILDER", "strip")), [])
+        self.assertEqual(ids(graph_data.find_nodes_by_normalized_property("name", " string builder", "strip")), [2])
+        self.assertEqual(graph_data.find_one_node_by_normalized_property("name", "hashmap")["id"], 3)
+
+        indexer = graph_data.index_collection.get_normalized_index("name", "lowercase")
+        self.assertEqual(set(indexer.property_value_to_ids_map.keys()),
+                         {"stringbuffer", "stringbuilder", " string builder ", "hashmap"})
+        graph_data.update_node_property_value_by_node_id(4, "name", "StringJoiner")
+        graph_data.remove_node(1)
+        self.assertEqual(ids(graph_data.find_nodes_by_normalized_property("name", "stringbuffer")), [])
+        self.assertEqual(ids(graph_data.find_nodes_by_normalized_property(
+            "name", "string", ["camel_case_split", "lowercase"])), [2, 4])
+
+        graph_data.refresh_indexer()
+        sub_graph_data = graph_data.subgraph([2, 3])
+        self.assertEqual(ids(sub_graph_data.find_nodes_by_normalized_property("name", "StringBuilder")), [2])
+        self.assertIn("name (camel_case_split+lowercase)", sub_graph_data.memory_report()["indexes"])
+
+    def test_traversal(self):
+        from networkx import NetworkXNoPath, NodeNotFound
+
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            for i in range(6):
+                graph_data.add_node({"class"}, {"name": "C%d" % i})
+            graph_data.add_relation(1, "extends", 2)
+            graph_data.add_relation(2, "extends", 3)
+            graph_data.add_relation(1, "call", 4)
+            graph_data.add_relation(4, "call", 3)
+            graph_data.add_relation(5, "extends", 3)
+
+            node_ids, distances = graph_data.bfs_distances([1])
+            self.assertEqual(dict(zip(node_ids.tolist(), distances.tolist())), {1: 0, 2: 1, 4: 1, 3: 2})
+            node_ids, distances = graph_data.bfs_distances([3], relation_types="extends", direction="in")
+            self.assertEqual(dict(zip(node_ids.tolist(), distances.tolist())), {3: 0, 2: 1, 5: 1, 1: 2})
+            node_ids, distances = graph_data.bfs_distances([1, 5], direction="both", max_depth=1)
+            self.assertEqual(dict(zip(node_ids.tolist(), distances.tolist())), {1: 0, 5: 0, 2: 1, 4: 1, 3: 1})
+
+            self.assertEqual(graph_data.shortest_path_lengths([1, 5, 100], [3, 1, 6]).tolist(),
+                             [[2, 0, -1], [1, -1, -1], [-1, -1, -1]])
+            self.assertEqual(graph_data.shortest_path_lengths([1], [3], relation_types=["call"], max_depth=1).tolist(),
+                             [[-1]])
+
+            self.assertEqual(sorted(graph_data.find_all_shortest_paths(1, 3)), [[1, 2, 3], [1, 4, 3]])
+            self.assertEqual(graph_data.find_shortest_path(1, 3, relation_types=["call"]), [1, 4, 3])
+            self.assertEqual(graph_data.find_shortest_path(5, 1, direction="both"), [5, 3, 2, 1])
+            with self.assertRaises(NetworkXNoPath):
+                graph_data.find_shortest_path(3, 1)
+            with self.assertRaises(NodeNotFound):
+                graph_data.find_all_shortest_paths(1, 100)
+
+            adjacency = graph_data.get_adjacency()
+            self.assertIs(graph_data.get_adjacency(), adjacency)
+            graph_data.update_node_property_value_by_node_id(1, "name", "D1")
+            self.assertIs(graph_data.get_adjacency(), adjacency)
+            graph_data.add_relation(3, "call", 6)
+            self.assertIsNot(graph_data.get_adjacency(), adjacency)
+            self.assertEqual(graph_data.find_shortest_path(1, 6), [1, 2, 3, 6])
+            graph_data.remove_node(3)
+            self.assertEqual(graph_data.shortest_path_lengths([1], [6]).tolist(), [[-1]])
+
+    def test_expand(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            for i in range(7):
+                graph_data.add_node({"class"} if i % 2 == 0 else {"method"}, {"name": "N%d" % (i + 1)})
+            graph_data.add_relation(1, "has", 2)
+            graph_data.add_relation(1, "has", 4)
+            graph_data.add_relation(3, "call", 4)
+            graph_data.add_relation(4, "call", 5)
+            graph_data.add_relation(5, "call", 6)
+            graph_data.add_relation(6, "has", 7)
+
+            node_ids, node_hops, (start_ids, relation_types, end_ids) = graph_data.expand([1], hops=2)
+            self.assertEqual(node_ids.tolist(), [1, 2, 4, 5])
+            self.assertEqual(node_hops.tolist(), [0, 1, 1, 2])
+            self.assertEqual(sorted(zip(start_ids.tolist(), relation_types.tolist(), end_ids.tolist())),
+                             [(1, "has", 2), (1, "has", 4), (4, "call", 5)])
+
+            node_ids, node_hops, relations = graph_data.expand([4], hops=2, relation_types="call", direction="both")
+            self.assertEqual(node_ids.tolist(), [4, 3, 5, 6])
+            self.assertEqual(node_hops.tolist(), [0, 1, 1, 2])
+            self.assertEqual(len(relations[0]), 3)
+
+            node_ids, node_hops, relations = graph_data.expand([4], hops=3, direction="both", label_filter="class")
+            self.assertEqual(node_ids.tolist(), [4, 1, 3, 5])
+            self.assertEqual(sorted(zip(relations[0].tolist(), relations[2].tolist())), [(1, 4), (3, 4), (4, 5)])
+            self.assertEqual(graph_data.expand([4], direction="both", label_filter=["method"])[0].tolist(), [4])
+
+            node_ids, node_hops, relations = graph_data.expand([1, 3], hops=1, limit_per_hop=1)
+            self.assertEqual(node_ids.tolist(), [1, 3, 4])
+            self.assertEqual(sorted(zip(relations[0].tolist(), relations[2].tolist())), [(1, 4), (3, 4)])
+
+            sub_graph_data = graph_data.expand([5], hops=1, direction="both", as_subgraph=True)
+            self.assertEqual(sorted(sub_graph_data.get_node_ids()), [4, 5, 6])
+            self.assertEqual(sub_graph_data.get_relation_num(), 2)
+            self.assertEqual(graph_data.expand([100])[0].tolist(), [])
+
+    def test_to_sparse_adjacency(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            for i in range(4):
+                graph_data.add_node({"entity"}, {"name": "N%d" % (i + 1)})
+            graph_data.add_relation_with_property(1, "call", 2, weight=2.5)
+            graph_data.add_relation(1, "has", 2)
+            graph_data.add_relation(2, "call", 3)
+            graph_data.add_relation(3, "call", 3)
+
+            matrix, node_ids = graph_data.to_sparse_adjacency()
+            self.assertEqual(node_ids.tolist(), [1, 2, 3, 4])
+            self.assertEqual(matrix.toarray().tolist(), [[0, 2, 0, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 0, 0]])
+            self.assertIs(graph_data.to_sparse_adjacency()[0], matrix)
+
+            matrix, node_ids = graph_data.to_sparse_adjacency(relation_types="call", directed=False, weight="weight")
+            self.assertEqual(matrix.toarray().tolist(), [[0, 2.5, 0, 0], [2.5, 0, 1, 0], [0, 1, 1, 0], [0, 0, 0, 0]])
+            self.assertEqual(graph_data.to_sparse_adjacency(relation_types="not exist")[0].nnz, 0)
+
+            graph_data.add_relation(4, "call", 1)
+            matrix, node_ids = graph_data.to_sparse_adjacency(relation_types="call")
+            self.assertEqual(matrix[3].indices.tolist(), [0])
+
+            graph_data.save("test.graph")
+            graph_data = GraphData.load("test.graph")
+            self.assertEqual(graph_data.to_sparse_adjacency(relation_types="call")[0].toarray().tolist(),
+                             matrix.toarray().tolist())
+
+    def test_to_sparse_adjacency_weight_compact(self):
+        graph_data = GraphData(backend=GraphData.BACKEND_COMPACT)
+        for i in range(4):
+            graph_data.add_node({"entity"}, {"name": "N%d" % (i + 1)})
+        graph_data.add_relation(1, "call", 2)
+        graph_data.add_relation_with_property(1, "has", 2, weight=3)
+        graph_data.add_relation_with_property(1, "call", 4, weight=0.5)
+        graph_data.add_relation_with_property(3, "call", 1, size=7)
+        graph_data.add_relation_with_property(4, "has", 3, weight=-2)
+        graph_data.add_relation(4, "call", 4)
+
+        matrix, node_ids = graph_data.to_sparse_adjacency(weight="weight")
+        self.assertEqual(matrix.toarray().tolist(), [[0, 4, 0, 0.5], [0, 0, 0, 0], [1, 0, 0, 0], [0, 0, -2, 1]])
+        matrix, node_ids = graph_data.to_sparse_adjacency(relation_types="call", weight="weight")
+        self.assertEqual(matrix.toarray().tolist(), [[0, 1, 0, 0.5], [0, 0, 0, 0], [1, 0, 0, 0], [0, 0, 0, 1]])
+
+        graph_data.remove_relation(1, "has", 2)
+        matrix, node_ids = graph_data.to_sparse_adjacency(weight="weight")
+        self.assertEqual(matrix.toarray().tolist(), [[0, 1, 0, 0.5], [0, 0, 0, 0], [1, 0, 0, 0], [0, 0, -2, 1]])
+
+    def test_journal(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = GraphData(backend=backend)
+            graph_data.add_node({"entity"}, {"name": "N1"})
+            with self.assertRaises(ValueError):
+                graph_data.changes_since(0)
+
+            seq = graph_data.enable_journal(max_size=100)
+            graph_data.add_node({"entity"}, {"name": "N2"})
+            graph_data.update_node_property_value_by_node_id(1, "name", "N1.1")
+            graph_data.add_relation(1, "call", 2)
+            graph_data.add_relations_bulk([2, 2], "call", [1, 3])
+            graph_data.remove_node(2)
+            seqs, ops, start_ids, relation_types, end_ids = graph_data.changes_since(seq)
+            self.assertEqual(seqs.tolist(), list(range(seq + 1, seq + 8)))
+            self.assertEqual(ops.tolist(), [GraphJournal.OP_ADD_NODE, GraphJournal.OP_UPDATE_NODE,
+                                            GraphJournal.OP_ADD_RELATION, GraphJournal.OP_ADD_RELATION,
+                                            GraphJournal.OP_REMOVE_RELATION, GraphJournal.OP_REMOVE_RELATION,
+                                            GraphJournal.OP_REMOVE_NODE])
+            self.assertEqual(start_ids.tolist()[:4] + start_ids.tolist()[-1:], [2, 1, 1, 2, 2])
+            self.assertEqual(relation_types.tolist()[:4], [None, None, "call", "call"])
+            self.assertEqual(sorted(zip(start_ids.tolist()[4:6], end_ids.tolist()[4:6])), [(1, 2), (2, 1)])
+
+            seq = int(seqs[-1])
+            graph_data.add_nodes_bulk([{"id": 1, "properties": {"name": "N1.2"}}, {"properties": {"name": "N3"}}])
+            self.assertEqual(graph_data.changes_since(seq)[1].tolist(),
+                             [GraphJournal.OP_UPDATE_NODE, GraphJournal.OP_ADD_NODE])
+
+            graph_data.save("test.graph")
+            graph_data = GraphData.load("test.graph")
+            self.assertEqual(len(graph_data.changes_since(seq)[0]), 2)
+            graph_data.clear()
+            self.assertEqual(graph_data.changes_since(seq)[1].tolist()[-1], GraphJournal.OP_CLEAR)
+
+    def test_diff(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            old_graph_data = GraphData(backend=backend)
+            new_graph_data = GraphData(backend=GraphData.BACKEND_MULTI_DI_GRAPH)
+            for graph_data in (old_graph_data, new_graph_data):
+                for i in range(4):
+                    graph_data.add_node({"entity"}, {"name": "N%d" % (i + 1), "aliases": ["n%d" % (i + 1)]})
+                graph_data.add_relation(1, "call", 2)
+                graph_data.add_relation(2, "call", 3)
+            self.assertTrue(old_graph_data.diff(new_graph_data).is_empty())
+
+            new_graph_data.remove_node(4)
+            new_graph_data.add_node({"entity"}, {"name": "N5"})
+            new_graph_data.update_node_property_value_by_node_id(1, "aliases", ["n1", "n1.1"])
+            new_graph_data.add_label_by_node_id(2, "method")
+            new_graph_data.remove_relation(2, "call", 3)
+            new_graph_data.add_relation(3, "has", 1)
+            graph_diff = old_graph_data.diff(new_graph_data)
+            self.assertEqual(graph_diff.added_node_ids.tolist(), [5])
+            self.assertEqual(graph_diff.removed_node_ids.tolist(), [4])
+            self.assertEqual(graph_diff.changed_node_ids.tolist(), [1, 2])
+            self.assertEqual([array.tolist() for array in graph_diff.added_relations], [[3], ["has"], [1]])
+            self.assertEqual([array.tolist() for array in graph_diff.removed_relations], [[2], ["call"], [3]])
+
+    def test_merge_from(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            shards = []
+            for names, first_id in ((["x", "y", "z"], 1), (["z", "w"], 10)):
+                shard = GraphData(backend=backend)
+                for i, name in enumerate(names):
+                    shard.add_node({"entity"}, {"name": name}, node_id=first_id + 2 * i)
+                    if i:
+                        shard.add_relation(first_id + 2 * i - 2, "call", first_id + 2 * i)
+                shard.add_relation_with_property(first_id, "has", first_id + 2, weight=3)
+                shards.append(shard)
+            shards[1].add_node({"entity"}, {"title": "no name"})
+
+            graph_data = GraphData(backend=backend)
+            graph_data.add_node({"base"}, {"name": "x"})
+            id_maps = graph_data.merge_from(shards, id_strategy=GraphData.ID_STRATEGY_OFFSET)
+            self.assertEqual([(old_ids.tolist(), new_ids.tolist()) for old_ids, new_ids in id_maps],
+                             [([1, 3, 5], [2, 4, 6]), ([10, 12, 13], [7, 9, 10])])
+            self.assertEqual(graph_data.get_node_num(), 7)
+            self.assertEqual(graph_data.get_relation_num(), 5)
+            self.assertEqual(graph_data.get_relation_type_to_num_map(), {"call": 3, "has": 2})
+            self.assertEqual(graph_data.get_edge_extra_info(7, 9, "has", "weight"), 3)
+
+            graph_data = GraphData(backend=backend)
+            graph_data.add_node({"base"}, {"name": "x"})
+            id_maps = graph_data.merge_from(shards, primary_property_names="name")
+            self.assertEqual([(old_ids.tolist(), new_ids.tolist()) for old_ids, new_ids in id_maps],
+                             [([1, 3, 5], [1, 2, 3]), ([10, 12, 13], [3, 4, 5])])
+            self.assertEqual(graph_data.get_node_info_dict(1)["labels"], {"base", "entity"})
+            self.assertEqual(sorted(graph_data.get_relations()),
+                             [(1, "call", 2), (1, "has", 2), (2, "call", 3), (3, "call", 4), (3, "has", 4)])
+            self.assertEqual(graph_data.max_node_id, 5)
+            # the shards are not changed
+            self.assertEqual(shards[0].get_node_info_dict(1)["labels"], {"entity"})
+            self.assertEqual(shards[1].get_node_num(), 3)
+
+            with self.assertRaises(ValueError):
+                graph_data.merge_from(shards, id_strategy="unknown")
+            with self.assertRaises(ValueError):
+                graph_data.merge_from(graph_data)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+"""
+from unittest import TestCase
+
+from kgdt.models.journal import GraphJournal
+
+
+class TestGraphJournal(TestCase):
+
+    def test_record(self):
+        journal = GraphJournal()
+        journal.record(GraphJournal.OP_ADD_NODE, 1)
+        journal.record_many(GraphJournal.OP_ADD_RELATION, [1, 2], [0, 1], [2, 3])
+        seqs, ops, start_ids, codes, end_ids = journal.changes_since(0)
+        self.assertEqual(seqs.tolist(), [1, 2, 3])
+        self.assertEqual(ops.tolist(), [GraphJournal.OP_ADD_NODE, GraphJournal.OP_ADD_RELATION,
+                                        GraphJournal.OP_ADD_RELATION])
+        self.assertEqual(start_ids.tolist(), [1, 1, 2])
+        self.assertEqual(codes.tolist(), [GraphJournal.NO_CODE, 0, 1])
+        self.assertEqual(end_ids.tolist(), [GraphJournal.NO_ID, 2, 3])
+        self.assertEqual(journal.changes_since(2)[0].tolist(), [3])
+        self.assertEqual(journal.changes_since(3)[0].tolist(), [])
+
+    def test_max_size(self):
+        journal = GraphJournal(max_size=10)
+        for node_id in range(100):
+            journal.record(GraphJournal.OP_ADD_NODE, node_id)
+        self.assertEqual(len(journal), 10)
+        self.assertEqual(journal.changes_since(90)[2].tolist(), list(range(90, 100)))
+        with self.assertRaises(ValueError):
+            journal.changes_since(89)
+        with self.assertRaises(ValueError):
+            GraphJournal(max_size=0)
+
+    def test_pause(self):
+        journal = GraphJournal()
+        journal.record(GraphJournal.OP_ADD_NODE, 1)
+        journal.pause()
+        self.assertEqual(len(journal), 0)
+        journal.resume()
+        journal.record(GraphJournal.OP_ADD_NODE, 2)
+        self.assertEqual(journal.changes_since(2)[2].tolist(), [2])
+        with self.assertRaises(ValueError):
+            journal.changes_since(1)
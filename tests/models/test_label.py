@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+"""
+from unittest import TestCase
+
+from kgdt.models.label import LabelPool, NodeIdSet
+
+
+class TestLabelPool(TestCase):
+
+    def test_intern(self):
+        pool = LabelPool()
+        labels = pool.intern({"entity", "class"})
+        self.assertIs(pool.intern(["class", "entity"]), labels)
+        self.assertEqual(pool.add(labels, "class"), labels)
+        self.assertEqual(pool.add(labels, "method"), {"entity", "class", "method"})
+        self.assertIs(pool.add(labels, "method"), pool.intern({"entity", "class", "method"}))
+        self.assertEqual(len(pool), 2)
+
+
+class TestNodeIdSet(TestCase):
+
+    def test_set_operations(self):
+        node_ids = NodeIdSet([3, 1, 2])
+        node_ids.add(5)
+        node_ids.discard(1)
+        node_ids.add("a")
+        self.assertEqual(node_ids, {2, 3, 5, "a"})
+        self.assertIn(3, node_ids)
+        self.assertNotIn(1, node_ids)
+        self.assertEqual(len(node_ids), 4)
+        self.assertEqual(node_ids & {2, 5, 7}, {2, 5})
+        node_ids.remove("a")
+        self.assertRaises(KeyError, node_ids.remove, "a")
+        self.assertEqual(node_ids.to_array().tolist(), [2, 3, 5])
+
+    def test_set_methods(self):
+        node_ids = NodeIdSet([3, 1, 2])
+        node_ids.add("a")
+        for result in (node_ids.copy(), node_ids.union([7]), node_ids.intersection([1, "a", 9], {1, 9}),
+                       node_ids.difference([1]), node_ids.symmetric_difference([1, 9])):
+            self.assertIs(type(result), set)
+        self.assertEqual(node_ids.copy(), {1, 2, 3, "a"})
+        self.assertEqual(node_ids.union([7], {8}), {1, 2, 3, 7, 8, "a"})
+        self.assertEqual(node_ids.intersection([1, "a", 9], {1, 9}), {1})
+        self.assertEqual(node_ids.intersection(), {1, 2, 3, "a"})
+        self.assertEqual(node_ids.difference([1], {"a"}), {2, 3})
+        self.assertEqual(node_ids.symmetric_difference([1, 9]), {2, 3, 9, "a"})
+        self.assertFalse(node_ids.issubset(range(5)))
+        self.assertTrue(NodeIdSet([1, 2]).issubset(range(5)))
+        self.assertTrue(node_ids.issuperset([1, "a"]))
+        self.assertFalse(node_ids.issuperset([1, 9]))
+        copied = node_ids.copy()
+        copied.add(10)
+        self.assertNotIn(10, node_ids)
+
+    def test_compact(self):
+        node_ids = NodeIdSet(range(0, 4000, 2))
+        self.assertEqual(len(node_ids.sorted_ids), 2000)
+        for node_id in range(0, 4000, 4):
+            node_ids.discard(node_id)
+        for node_id in range(1, 2000, 2):
+            node_ids.add(node_id)
+        expected = set(range(2, 4000, 4)) | set(range(1, 2000, 2))
+        self.assertEqual(node_ids, expected)
+        self.assertEqual(node_ids.to_array().tolist(), sorted(expected))
+        self.assertFalse(node_ids.added)
+        self.assertFalse(node_ids.removed)
+        self.assertFalse(node_ids.to_array().flags.writeable)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+"""
+from unittest import TestCase
+
+from kgdt.models.normalizer import PropertyValueNormalizer, split_camel_case
+
+
+def remove_dots(value):
+    return value.replace(".", "")
+
+
+class TestPropertyValueNormalizer(TestCase):
+
+    def test_split_camel_case(self):
+        self.assertEqual(split_camel_case("java.util.ArrayList"), ["java", "util", "Array", "List"])
+        self.assertEqual(split_camel_case("HTTPServerError2"), ["HTTP", "Server", "Error", "2"])
+        self.assertEqual(split_camel_case("getURL"), ["get", "URL"])
+        self.assertEqual(split_camel_case(""), [])
+
+    def test_normalize(self):
+        normalizer = PropertyValueNormalizer(["camel_case_split", "lowercase"])
+        self.assertEqual(normalizer.name, "camel_case_split+lowercase")
+        self.assertEqual(normalizer("StringBuffer"), {"string", "buffer"})
+        self.assertEqual(PropertyValueNormalizer(["strip", "lowercase"])(" String "), {"string"})
+
+        normalizer = PropertyValueNormalizer([remove_dots, "lowercase"])
+        self.assertEqual(normalizer.name, "remove_dots+lowercase")
+        self.assertEqual(normalizer("Java.Util"), {"javautil"})
+        self.assertIs(PropertyValueNormalizer.of(normalizer), normalizer)
+        with self.assertRaises(ValueError):
+            PropertyValueNormalizer("upper")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+"""
+from unittest import TestCase
+
+from kgdt.models.property_store import ColumnarPropertyStore, NumericColumn, StrColumn, ObjectColumn
+
+
+class TestColumnarPropertyStore(TestCase):
+
+    def test_columns(self):
+        store = ColumnarPropertyStore()
+        first = store.add_row(1, {"name": "String", "line": 12, "score": 0.5})
+        second = store.add_row(2, {"name": "Buffer", "line": 12, "alias": ["b"]})
+
+        self.assertIsInstance(store.columns["name"], StrColumn)
+        self.assertIsInstance(store.columns["line"], NumericColumn)
+        self.assertIsInstance(store.columns["alias"], ObjectColumn)
+        self.assertEqual(first, {"name": "String", "line": 12, "score": 0.5})
+        self.assertEqual(dict(second), {"name": "Buffer", "line": 12, "alias": ["b"]})
+        self.assertNotIn("score", second)
+        self.assertEqual(store.find_rows("line", 12).tolist(), [0, 1])
+        self.assertEqual(store.find_rows("line", 12.0).tolist(), [0, 1])
+        self.assertEqual(store.find_rows("name", "Buffer").tolist(), [1])
+        self.assertEqual(store.find_rows_by_str_prefix("name", "Str").tolist(), [0])
+        self.assertEqual(store.find_rows("alias", ["b"]).tolist(), [1])
+
+    def test_change_values(self):
+        store = ColumnarPropertyStore()
+        first = store.add_row(1, {"line": 12})
+        second = store.add_row(2, {"line": 13})
+
+        second["line"] = "unknown"
+        self.assertIsInstance(store.columns["line"], ObjectColumn)
+        self.assertEqual(first["line"], 12)
+        self.assertEqual(second["line"], "unknown")
+
+        del first["line"]
+        self.assertEqual(len(first), 0)
+        with self.assertRaises(KeyError):
+            first["line"]
+
+        store.remove_row(second.row)
+        self.assertEqual(store.find_rows("line", "unknown").tolist(), [])
+        self.assertEqual(store.alive_row_num, 1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+"""
+
+from unittest import TestCase
+
+from kgdt.models.graph import GraphData
+from kgdt.models.storage import CompactGraphStorage, MultiDiGraphStorage
+
+RELATED_TO = 0
+CALL = 1
+
+
+class TestCompactGraphStorage(TestCase):
+
+    def get_storage(self, buffer_size=CompactGraphStorage.DEFAULT_BUFFER_SIZE):
+        storage = CompactGraphStorage(buffer_size=buffer_size)
+        for node_id in range(1, 5):
+            storage.add_node(node_id, {GraphData.DEFAULT_KEY_NODE_ID: node_id})
+        storage.add_relation(1, RELATED_TO, 2)
+        storage.add_relation(1, RELATED_TO, 3)
+        storage.add_relation(1, CALL, 3, weight=2)
+        storage.add_relation(3, RELATED_TO, 4)
+        return storage
+
+    def test_relations_before_and_after_flush(self):
+        storage = self.get_storage()
+        expected = {(1, RELATED_TO, 2), (1, RELATED_TO, 3), (1, CALL, 3)}
+        self.assertEqual(set(storage.out_relations(1)), expected)
+        self.assertEqual(storage.buffer_num, 4)
+
+        storage.flush()
+        self.assertEqual(storage.buffer_num, 0)
+        self.assertEqual(set(storage.out_relations(1)), expected)
+        self.assertEqual(set(storage.in_relations(3)), {(1, RELATED_TO, 3), (1, CALL, 3)})
+        self.assertTrue(storage.has_relation(1, CALL, 3))
+        self.assertFalse(storage.has_relation(3, CALL, 1))
+        self.assertEqual(storage.get_relation_properties(1, CALL, 3), {"weight": 2})
+
+    def test_remove(self):
+        storage = self.get_storage(buffer_size=2)
+        self.assertTrue(storage.remove_relation(1, RELATED_TO, 3))
+        self.assertFalse(storage.remove_relation(1, RELATED_TO, 3))
+        self.assertEqual(storage.relation_num(), 3)
+
+        node_json, out_relations, in_relations = storage.remove_node(3)
+        self.assertEqual(node_json, {GraphData.DEFAULT_KEY_NODE_ID: 3})
+        self.assertEqual(out_relations, {(3, RELATED_TO, 4)})
+        self.assertEqual(in_relations, {(1, CALL, 3)})
+        self.assertEqual(set(storage.relations()), {(1, RELATED_TO, 2)})
+        self.assertEqual(storage.relation_num(), 1)
+        self.assertEqual(storage.node_num(), 3)
+
+    def test_has_any_relation(self):
+        storage = self.get_storage()
+        for node_id in range(5, 50):
+            storage.add_node(node_id, {GraphData.DEFAULT_KEY_NODE_ID: node_id})
+            storage.add_relation(1, node_id % 3, node_id)
+        for flush in (False, True):
+            if flush:
+                storage.flush()
+            self.assertTrue(storage.has_any_relation(1, 3))
+            self.assertTrue(storage.has_any_relation(1, 48))
+            self.assertTrue(storage.has_any_relation(3, 4))
+            self.assertFalse(storage.has_any_relation(3, 1))
+            self.assertFalse(storage.has_any_relation(1, 4))
+            self.assertFalse(storage.has_any_relation(1, 100))
+        storage.remove_relation(1, 48 % 3, 48)
+        self.assertFalse(storage.has_any_relation(1, 48))
+
+    def test_reuse_removed_slots(self):
+        storage = self.get_storage(buffer_size=3)
+        for node_id in range(5, 105):
+            storage.add_node(node_id, {GraphData.DEFAULT_KEY_NODE_ID: node_id})
+            storage.add_relation(node_id, CALL, 1)
+            storage.add_relation(2, RELATED_TO, node_id)
+            if node_id % 2:
+                storage.remove_node(node_id)
+            else:
+                storage.remove_nodes([node_id, 4])
+                storage.add_node(4, {GraphData.DEFAULT_KEY_NODE_ID: 4})
+            self.assertLessEqual(len(storage.slot_to_node), 6)
+        # the dead relations of the removed nodes are not on the new nodes in the same slots
+        self.assertEqual(set(storage.relations()), {(1, RELATED_TO, 2), (1, RELATED_TO, 3), (1, CALL, 3)})
+        self.assertEqual(set(storage.in_relations(4)), set())
+        self.assertEqual(storage.relation_num(), 3)
+        self.assertEqual(sorted(storage.node_ids()), [1, 2, 3, 4])
+        self.assertEqual(storage.get_node(4), {GraphData.DEFAULT_KEY_NODE_ID: 4})
+
+    def test_reject_not_int_node_id(self):
+        storage = CompactGraphStorage()
+        with self.assertRaises(TypeError):
+            storage.add_node("a", {})
+
+
+class TestRelationTypeIndex(TestCase):
+
+    def test_relations_of_type(self):
+        for storage in (MultiDiGraphStorage(), CompactGraphStorage(buffer_size=3)):
+            for node_id in range(1, 5):
+                storage.add_node(node_id, {GraphData.DEFAULT_KEY_NODE_ID: node_id})
+            storage.add_relation(1, RELATED_TO, 2)
+            storage.add_relation(1, RELATED_TO, 3)
+            storage.add_relation(1, CALL, 3)
+            storage.add_relation(2, CALL, 3)
+            storage.add_relation(4, CALL, 3)
+
+            self.assertEqual(set(storage.relations_of_type(CALL)), {(1, CALL, 3), (2, CALL, 3), (4, CALL, 3)})
+            self.assertEqual(set(storage.out_relations_of_type(1, RELATED_TO)),
+                             {(1, RELATED_TO, 2), (1, RELATED_TO, 3)})
+            self.assertEqual(set(storage.in_relations_of_type(3, CALL)), {(1, CALL, 3), (2, CALL, 3), (4, CALL, 3)})
+
+            storage.remove_relation(1, RELATED_TO, 2)
+            storage.remove_node(4)
+            self.assertEqual(set(storage.relations_of_type(CALL)), {(1, CALL, 3), (2, CALL, 3)})
+            self.assertEqual(set(storage.out_relations_of_type(1, RELATED_TO)), {(1, RELATED_TO, 3)})
+            self.assertEqual(set(storage.in_relations_of_type(3, CALL)), {(1, CALL, 3), (2, CALL, 3)})
+            self.assertEqual(set(storage.in_relations_of_type(2, RELATED_TO)), set())
@@ -39,3 +39,9 @@ class TestStrPropertySearcher(TestCase):
         self.assertEqual(set([2]), searcher.search_by_value_exactly("ArrayList.add(int)"))
         self.assertEqual(set([1, 2]), searcher.search_by_value_exactly("ArrayList.add"))
         self.assertEqual(set([2]), searcher.search_by_value_exactly("ArrayList.add2"))
+
+    def test_memory_report(self):
+        searcher: StrPropertySearcher = StrPropertySearcher.train(self.get_graph(), "name", "qualified_name", "alias")
+        report = searcher.memory_report()
+        self.assertGreater(report["value_keyword_2_ids_map"], 0)
+        self.assertEqual(report["total"], sum(value for name, value in report.items() if name != "total"))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+-----------------------------------------
+@Author: isky
+@Email: 19110240019@fudan.edu.cn
+@Created: 2026/10/17
+------------------------------------------
+@Modify: 2026/10/17
+------------------------------------------
+@Description:
+"""
+from unittest import TestCase
+
+import networkx as nx
+import numpy as np
+
+from kgdt.analytics import GraphAnalytics
+from kgdt.models.graph import GraphData
+
+
+class TestGraphAnalytics(TestCase):
+
+    def create_graph_data(self, backend):
+        graph_data = GraphData(backend=backend)
+        for i in range(6):
+            graph_data.add_node({"entity"}, {"name": "N%d" % (i + 1)})
+        graph_data.add_relation_with_property(1, "call", 2, weight=3)
+        graph_data.add_relation(2, "call", 3)
+        graph_data.add_relation(3, "call", 1)
+        graph_data.add_relation(3, "has", 4)
+        graph_data.add_relation(1, "has", 4)
+        graph_data.add_relation(5, "has", 6)
+        return graph_data
+
+    def test_pagerank(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = self.create_graph_data(backend)
+            graph = nx.MultiDiGraph(graph_data.graph)
+            analytics = GraphAnalytics(graph_data, weight="weight")
+            node_ids, scores = analytics.pagerank(tol=1e-12)
+            expected_scores = nx.pagerank(graph, tol=1e-12)
+            self.assertEqual(node_ids.tolist(), [1, 2, 3, 4, 5, 6])
+            self.assertTrue(np.allclose(scores, [expected_scores[node_id] for node_id in node_ids.tolist()]))
+
+            node_ids, scores = analytics.personalized_pagerank({1: 1, 100: 1}, tol=1e-12)
+            expected_scores = nx.pagerank(graph, personalization={1: 1}, tol=1e-12)
+            self.assertTrue(np.allclose(scores, [expected_scores[node_id] for node_id in node_ids.tolist()]))
+            self.assertEqual(scores[4], 0)
+            with self.assertRaises(ValueError):
+                analytics.personalized_pagerank([100])
+
+            graph_data.add_relation(6, "call", 5)
+            node_ids, scores = analytics.personalized_pagerank([5])
+            self.assertGreater(scores[5], 0)
+
+    def test_degree_centrality(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            analytics = GraphAnalytics(self.create_graph_data(backend), relation_types="has")
+            node_ids, centralities = analytics.degree_centrality(direction="in")
+            self.assertEqual((centralities * 5).tolist(), [0, 0, 0, 2, 0, 1])
+            node_ids, centralities = analytics.degree_centrality()
+            self.assertEqual((centralities * 5).tolist(), [1, 0, 1, 2, 1, 1])
+
+            graph_data = GraphData(backend=backend)
+            self.assertEqual(GraphAnalytics(graph_data).degree_centrality()[1].tolist(), [])
+            graph_data.add_node({"entity"}, {"name": "N1"})
+            # the same as networkx, the only node has the centrality 1, not 0
+            for direction in ("in", "out", "both"):
+                node_ids, centralities = GraphAnalytics(graph_data).degree_centrality(direction)
+                self.assertEqual(centralities.tolist(), [1.0])
+
+    def test_connected_components(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            graph_data = self.create_graph_data(backend)
+            graph_data.add_node({"entity"}, {"name": "N7"})
+            analytics = GraphAnalytics(graph_data)
+            node_ids, component_ids = analytics.connected_components()
+            self.assertEqual(component_ids.tolist(), [0, 0, 0, 0, 1, 1, 2])
+            node_ids, component_ids = analytics.connected_components(strong=True)
+            self.assertEqual(component_ids.tolist(), [0, 0, 0, 1, 2, 3, 4])
+
+    def test_degree_histograms(self):
+        for backend in GraphData.BACKEND_TO_STORAGE_CLASS.keys():
+            analytics = GraphAnalytics(self.create_graph_data(backend))
+            histograms = analytics.degree_histograms()
+            self.assertEqual(sorted(histograms.keys()), ["call", "has"])
+            self.assertEqual(histograms["call"].tolist(), [3, 3])
+            self.assertEqual(histograms["has"].tolist(), [3, 3])
+            self.assertEqual(analytics.degree_histograms(direction="in")["has"].tolist(), [4, 1, 1])
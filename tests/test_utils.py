@@ -2,7 +2,11 @@
 
 """Tests for `kgdt` package."""
 
-from kgdt.utils import SaveLoad
+import sys
+
+import numpy as np
+
+from kgdt.utils import SaveLoad, estimate_size
 
 
 class ABC(SaveLoad):
@@ -19,3 +23,14 @@ def test_save_load():
     abc = ABC.load("abc.abc")
     assert abc.id == 3
     abc.print()
+
+
+def test_estimate_size():
+    shared = "a shared string"
+    value = {"a": [shared, shared], "b": list(range(10000))}
+    size = estimate_size(value)
+    assert size > sys.getsizeof(value["b"]) + sys.getsizeof(shared)
+    assert estimate_size([shared, shared]) == sys.getsizeof([shared, shared]) + sys.getsizeof(shared)
+    sampled_size = estimate_size(value, sample_size=100)
+    assert 0.9 * size < sampled_size < 1.1 * size
+    assert estimate_size(np.zeros(100, dtype=np.int64)) >= 800